@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from app import config
+
+
+class CachedBalance(NamedTuple):
+    name: str
+    balance: int
+    expires_at: float
+
+
+class BalanceCache:
+    """Bounded LRU of player balances keyed by ``player_id``, with a TTL per entry.
+
+    Writers call ``put``/``update_balance``/``invalidate`` after their
+    transaction commits, so the cache never holds an uncommitted balance.
+
+    Readers fill a miss with ``begin_fill``/``fill``: a write to the player
+    between the two means the row read may predate it, so it is not cached.
+    Writes are only remembered for players with a fill in progress.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[int, CachedBalance]" = OrderedDict()
+        self._generation = 0
+        self._fills: Dict[int, int] = {}
+        self._written: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, player_id: int) -> Optional[CachedBalance]:
+        entry = self._entries.get(player_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[player_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(player_id)
+        self.hits += 1
+        return entry
+
+    def put(self, player_id: int, name: str, balance: int):
+        self._write(player_id)
+        self._store(player_id, name, balance)
+
+    def begin_fill(self, player_id: int) -> int:
+        """Registers a read of the player's row and returns its generation."""
+        self._fills[player_id] = self._fills.get(player_id, 0) + 1
+        return self._generation
+
+    def fill(self, player_id: int, generation: int, row=None):
+        """Ends a read started by ``begin_fill``, caching ``row`` if no write happened since.
+
+        ``row`` has ``name`` and ``balance``; pass ``None`` when the read
+        failed or found no player.
+        """
+        readers = self._fills[player_id] - 1
+        stale = self._written.get(player_id, 0) > generation
+        if readers:
+            self._fills[player_id] = readers
+        else:
+            del self._fills[player_id]
+            self._written.pop(player_id, None)
+        if row is not None and not stale:
+            self._store(player_id, row.name, row.balance)
+
+    def _write(self, player_id: int):
+        self._generation += 1
+        if player_id in self._fills:
+            self._written[player_id] = self._generation
+
+    def _store(self, player_id: int, name: str, balance: int):
+        if self.max_size <= 0:
+            return
+        self._entries[player_id] = CachedBalance(name, balance, self._clock() + self.ttl_seconds)
+        self._entries.move_to_end(player_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def update_balance(self, player_id: int, balance: int):
+        entry = self._entries.get(player_id)
+        self._write(player_id)
+        if entry is not None:
+            self._store(player_id, entry.name, balance)
+
+    def invalidate(self, player_id: int):
+        self._write(player_id)
+        self._entries.pop(player_id, None)
+
+    def clear(self):
+        for player_id in self._fills:
+            self._write(player_id)
+        self._entries.clear()
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+player_balance_cache = BalanceCache(
+    max_size=config.BALANCE_CACHE_SIZE,
+    ttl_seconds=config.BALANCE_CACHE_TTL_SECONDS,
+)
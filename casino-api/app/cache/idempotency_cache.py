@@ -0,0 +1,129 @@
+import hashlib
+import math
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from app import config
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings using double hashing.
+
+    Once ``capacity`` items have been added the filter starts over, so the
+    false-positive rate stays near ``error_rate``. Forgetting items is safe
+    for callers that only use the filter to decide whether a lookup is
+    worth doing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hash_count))
+
+    def add(self, item: str):
+        if self.count >= self.capacity:
+            self.clear()
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+
+class IdempotentResult(NamedTuple):
+    transaction_id: int
+    player_id: int
+    balance: int
+
+
+class IdempotencyCache:
+    """Answers retried ``txn_uuid``s from memory and tells first attempts apart.
+
+    ``get`` returns the stored outcome of a recent transaction. When it
+    misses, ``might_exist`` consults the bloom filter: ``False`` means the
+    uuid was never seen by this worker, so the caller can write straight
+    away and leave any race to the unique constraint on ``txn_uuid``.
+    """
+
+    def __init__(self, max_size: int, bloom_capacity: int, bloom_error_rate: float):
+        self.max_size = max_size
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._results: "OrderedDict[str, IdempotentResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bloom_negatives = 0
+        self.bloom_positives = 0
+        self.false_positives = 0
+
+    def get(self, txn_uuid: str) -> Optional[IdempotentResult]:
+        result = self._results.get(txn_uuid)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(txn_uuid)
+        self.hits += 1
+        return result
+
+    def might_exist(self, txn_uuid: str) -> bool:
+        if txn_uuid in self.bloom:
+            self.bloom_positives += 1
+            return True
+        self.bloom_negatives += 1
+        return False
+
+    def record_false_positive(self):
+        self.false_positives += 1
+
+    def remember(self, txn_uuid: str, transaction_id: int, player_id: int, balance: int):
+        self.bloom.add(txn_uuid)
+        if self.max_size <= 0:
+            return
+        self._results[txn_uuid] = IdempotentResult(transaction_id, player_id, balance)
+        self._results.move_to_end(txn_uuid)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def mark_seen(self, txn_uuid: str):
+        self.bloom.add(txn_uuid)
+
+    def forget(self, txn_uuid: str):
+        self._results.pop(txn_uuid, None)
+
+    def clear(self):
+        self._results.clear()
+        self.bloom.clear()
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._results),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bloom_items": self.bloom.count,
+            "bloom_negatives": self.bloom_negatives,
+            "bloom_positives": self.bloom_positives,
+            "false_positives": self.false_positives,
+            "false_positive_rate": self.false_positives / self.bloom_positives if self.bloom_positives else 0.0,
+        }
+
+
+txn_idempotency_cache = IdempotencyCache(
+    max_size=config.IDEMPOTENCY_CACHE_SIZE,
+    bloom_capacity=config.IDEMPOTENCY_BLOOM_CAPACITY,
+    bloom_error_rate=config.IDEMPOTENCY_BLOOM_ERROR_RATE,
+)
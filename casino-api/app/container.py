@@ -0,0 +1,113 @@
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.services.balance_service import BalanceService
+    from app.services.player_bulk_service import PlayerBulkService
+    from app.services.player_service import PlayerService
+    from app.services.player_stats_service import PlayerStatsService
+    from app.services.report_service import ReportService
+    from app.services.transaction_service import TransactionService
+    from app.services.wallet_service import WalletService
+    from app.services.wallet_writer import WalletWriter
+
+
+class Container:
+    """Services shared by every request of a worker.
+
+    Built once per process by :func:`get_container`, normally from the
+    lifespan, instead of by each route module at import time. Each service is
+    imported and built on first use, so importing the container stays cheap.
+    """
+
+    @cached_property
+    def player_service(self) -> "PlayerService":
+        from app.repositories.player_repository import PlayerRepository
+        from app.services.player_service import PlayerService
+        return PlayerService(PlayerRepository())
+
+    @cached_property
+    def player_stats_service(self) -> "PlayerStatsService":
+        from app.repositories.player_stats_repository import PlayerStatsRepository
+        from app.services.player_stats_service import PlayerStatsService
+        return PlayerStatsService(PlayerStatsRepository())
+
+    @cached_property
+    def player_bulk_service(self) -> "PlayerBulkService":
+        from app.repositories.player_bulk_repository import PlayerBulkRepository
+        from app.services.player_bulk_service import PlayerBulkService
+        return PlayerBulkService(PlayerBulkRepository())
+
+    @cached_property
+    def transaction_service(self) -> "TransactionService":
+        from app.repositories.transaction_repository import TransactionRepository
+        from app.services.transaction_service import TransactionService
+        return TransactionService(TransactionRepository())
+
+    @cached_property
+    def wallet_service(self) -> "WalletService":
+        from app.repositories.wallet_repository import WalletRepository
+        from app.services.wallet_service import WalletService
+        return WalletService(WalletRepository())
+
+    @cached_property
+    def balance_service(self) -> "BalanceService":
+        from app.repositories.balance_repository import BalanceRepository
+        from app.services.balance_service import BalanceService
+        return BalanceService(BalanceRepository())
+
+    @cached_property
+    def report_service(self) -> "ReportService":
+        from app.repositories.rollup_repository import RollupRepository
+        from app.services.report_service import ReportService
+        return ReportService(RollupRepository())
+
+    @cached_property
+    def wallet_writer(self) -> "WalletWriter":
+        from app.services.wallet_writer import WalletWriter
+        return WalletWriter(self.wallet_service)
+
+
+_container: Optional[Container] = None
+
+
+def get_container() -> Container:
+    global _container
+    if _container is None:
+        _container = Container()
+    return _container
+
+
+# Route dependencies. They are coroutines so FastAPI calls them inline
+# rather than in its thread pool.
+
+async def get_player_service() -> "PlayerService":
+    return get_container().player_service
+
+
+async def get_player_bulk_service() -> "PlayerBulkService":
+    return get_container().player_bulk_service
+
+
+async def get_player_stats_service() -> "PlayerStatsService":
+    return get_container().player_stats_service
+
+
+async def get_transaction_service() -> "TransactionService":
+    return get_container().transaction_service
+
+
+async def get_wallet_service() -> "WalletService":
+    return get_container().wallet_service
+
+
+async def get_balance_service() -> "BalanceService":
+    return get_container().balance_service
+
+
+async def get_report_service() -> "ReportService":
+    return get_container().report_service
+
+
+async def get_wallet_writer() -> "WalletWriter":
+    return get_container().wallet_writer
@@ -0,0 +1,8 @@
+from fastapi import HTTPException
+
+class InsufficientBalanceException(HTTPException):
+    def __init__(self, player_id: int):
+        super().__init__(
+            status_code=400, 
+            detail="Insufficient balance for this operation."
+            )
@@ -0,0 +1,8 @@
+from fastapi import HTTPException
+
+class InvalidImportFileException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=422, 
+            detail=detail
+            )
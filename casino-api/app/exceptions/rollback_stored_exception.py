@@ -0,0 +1,8 @@
+from fastapi import HTTPException
+
+class RollbackStoredException(HTTPException):
+    def __init__(self, transaction_id: int):
+        super().__init__(
+            status_code=404, 
+            detail=f"Transaction not found, but stored with id: {transaction_id}"
+            )
@@ -0,0 +1,66 @@
+"""Imports players from, or exports them to, a CSV or NDJSON file::
+
+    python -m app.jobs.player_bulk_job import partner_players.csv
+    python -m app.jobs.player_bulk_job export players.ndjson
+
+The format follows the file extension unless ``--format`` is given. Files
+are read and written in chunks, through ``COPY`` on PostgreSQL, so memory
+stays flat whatever their size. An import prints its report as JSON and
+exits with status 1 when any row was rejected.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+import orjson
+from app.db import SessionLocal
+from app.exceptions.invalid_import_file_exception import InvalidImportFileException
+from app.repositories.player_bulk_repository import PlayerBulkRepository
+from app.services.player_bulk_service import BULK_FORMATS, PlayerBulkService
+
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+async def read_file(path: Path) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_BYTES):
+            yield chunk
+
+
+async def import_file(path: Path, format: str, session_factory=SessionLocal, service: Optional[PlayerBulkService] = None):
+    service = service or PlayerBulkService(PlayerBulkRepository())
+    async with session_factory() as db:
+        return await service.import_players(db=db, chunks=read_file(path), format=format)
+
+
+async def export_file(path: Path, format: str, session_factory=SessionLocal, service: Optional[PlayerBulkService] = None):
+    service = service or PlayerBulkService(PlayerBulkRepository())
+    with open(path, "wb") as f:
+        async for chunk in service.export_players(db=session_factory(), format=format):
+            f.write(chunk)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk player import and export.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file to read or write")
+    parser.add_argument("--format", choices=BULK_FORMATS, help="Defaults to the file extension")
+    args = parser.parse_args(argv)
+    format = args.format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv")
+
+    if args.command == "export":
+        asyncio.run(export_file(args.path, format))
+        return 0
+    try:
+        report = asyncio.run(import_file(args.path, format))
+    except InvalidImportFileException as e:
+        print(e.detail, file=sys.stderr)
+        return 2
+    print(orjson.dumps(report.model_dump(), option=orjson.OPT_INDENT_2).decode())
+    return 1 if report.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Checks every player's balance against the sum of their ledger entries::
+
+    python -m app.jobs.reconciliation_job          # entries since the last run
+    python -m app.jobs.reconciliation_job --full   # the whole ledger
+
+The ledger is streamed in chunks into NumPy arrays and summed per player with
+a grouped reduction, so memory grows with the number of players rather than
+the number of entries. The sums are saved with a checkpoint; the next run
+starts from them and only reads the entries added since. Exits with status 1
+when any balance differs from its ledger.
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from app import config
+from app.db import SessionLocal
+from app.repositories.reconciliation_repository import ReconciliationRepository
+
+
+CHECKPOINT = "reconciliation"
+
+
+def as_array(rows: Sequence, columns: int) -> np.ndarray:
+    """Integer rows as an ``(n, columns)`` int64 array, without a Python object per value."""
+    values = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * columns)
+    return values.reshape(-1, columns)
+
+
+def group_sums(player_ids: np.ndarray, amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct player ids, ascending, and the exact int64 sum of each one's amounts."""
+    if len(player_ids) == 0:
+        return player_ids, amounts
+    order = np.argsort(player_ids, kind="stable")
+    sorted_ids = player_ids[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1])))
+    return sorted_ids[starts], np.add.reduceat(amounts[order], starts)
+
+
+class BalanceTotals:
+    """Running sums indexed by player id, in one int64 array.
+
+    Player ids are a sequence, so the array stays about as long as the
+    players table; ``touched`` marks the players that received amounts.
+    """
+
+    def __init__(self):
+        self.values = np.zeros(0, dtype=np.int64)
+        self.touched = np.zeros(0, dtype=bool)
+
+    def _grow(self, size: int):
+        if size > len(self.values):
+            size = max(size, 2 * len(self.values))
+            self.values = np.concatenate((self.values, np.zeros(size - len(self.values), dtype=np.int64)))
+            self.touched = np.concatenate((self.touched, np.zeros(size - len(self.touched), dtype=bool)))
+
+    def set(self, player_ids: np.ndarray, balances: np.ndarray):
+        if len(player_ids):
+            self._grow(int(player_ids.max()) + 1)
+            self.values[player_ids] = balances
+
+    def add(self, player_ids: np.ndarray, amounts: np.ndarray):
+        ids, sums = group_sums(player_ids, amounts)
+        if len(ids):
+            self._grow(int(ids[-1]) + 1)
+            self.values[ids] += sums
+            self.touched[ids] = True
+
+    def get(self, player_ids: np.ndarray) -> np.ndarray:
+        known = player_ids < len(self.values)
+        result = np.zeros(len(player_ids), dtype=np.int64)
+        result[known] = self.values[player_ids[known]]
+        return result
+
+
+class ReconciliationReport:
+
+    def __init__(self):
+        self.entries = 0
+        self.players = 0
+        self.position = 0
+        self.seconds = 0.0
+        # (player_id, balance, ledger balance), in minor units.
+        self.mismatches: List[Tuple[int, int, int]] = []
+
+
+async def reconcile_balances(
+    session_factory=SessionLocal,
+    repository: Optional[ReconciliationRepository] = None,
+    chunk_size: int = config.RECONCILIATION_CHUNK_SIZE,
+    gap_timeout_seconds: float = config.LEDGER_GAP_TIMEOUT_SECONDS,
+    full: bool = False,
+) -> ReconciliationReport:
+    """Compares ``players.balance`` with the sum of each player's ledger entries.
+
+    Every scan runs in one snapshot, so a balance and its entries are read as
+    of the same commit. Ledger ids are assigned before commit, so ids below
+    the new checkpoint may belong to entries not committed yet: they are saved
+    as gaps and their entries added by the run that first sees them.
+    """
+    repository = repository or ReconciliationRepository()
+    report = ReconciliationReport()
+    started = time.perf_counter()
+    expired = datetime.now(timezone.utc) - timedelta(seconds=gap_timeout_seconds)
+    totals = BalanceTotals()
+
+    async with session_factory() as db:
+        await repository.use_snapshot(db)
+        position = await repository.lock_checkpoint(db=db, job=CHECKPOINT)
+        if full:
+            position = 0
+            await repository.clear_gaps(db=db, job=CHECKPOINT)
+        else:
+            async for rows in repository.scan_reconciled_balances(db=db, chunk_size=chunk_size):
+                chunk = as_array(rows, 2)
+                totals.set(chunk[:, 0], chunk[:, 1])
+            gaps = await repository.get_gaps(db=db, job=CHECKPOINT)
+            if gaps:
+                chunk = as_array(await repository.get_entries_in(db=db, ids=gaps), 3)
+                totals.add(chunk[:, 1], chunk[:, 2])
+                await repository.remove_gaps(db=db, job=CHECKPOINT, ids=chunk[:, 0].tolist())
+                report.entries += len(chunk)
+
+        report.position = position
+        async for rows in repository.scan_ledger(db=db, position=position, chunk_size=chunk_size):
+            chunk = as_array(rows, 3)
+            totals.add(chunk[:, 1], chunk[:, 2])
+            report.position = max(report.position, int(chunk[:, 0].max()))
+            report.entries += len(chunk)
+        gaps = await repository.find_gaps(db=db, position=position, up_to=report.position)
+        await repository.add_gaps(db=db, job=CHECKPOINT, ids=gaps)
+        await repository.expire_gaps(db=db, job=CHECKPOINT, before=expired)
+
+        async for rows in repository.scan_player_balances(db=db, chunk_size=chunk_size):
+            chunk = as_array(rows, 2)
+            player_ids, balances = chunk[:, 0], chunk[:, 1]
+            expected = totals.get(player_ids)
+            wrong = np.flatnonzero(balances != expected)
+            report.mismatches.extend(
+                zip(player_ids[wrong].tolist(), balances[wrong].tolist(), expected[wrong].tolist())
+            )
+            report.players += len(chunk)
+
+        changed = np.flatnonzero(totals.touched)
+        for start in range(0, len(changed), chunk_size):
+            player_ids = changed[start:start + chunk_size]
+            await repository.save_reconciled_balances(db=db, rows=[
+                {"player_id": player_id, "balance": balance}
+                for player_id, balance in zip(player_ids.tolist(), totals.values[player_ids].tolist())
+            ])
+        await repository.move_checkpoint(db=db, job=CHECKPOINT, position=report.position)
+        await db.commit()
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check player balances against the ledger.")
+    parser.add_argument("--full", action="store_true", help="Sum the whole ledger instead of the entries since the last run")
+    parser.add_argument("--chunk-size", type=int, default=config.RECONCILIATION_CHUNK_SIZE, help="Rows fetched per chunk")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(reconcile_balances(chunk_size=args.chunk_size, full=args.full))
+    logging.info(
+        f"Reconciled {report.players} players with {report.entries} new ledger entries "
+        f"in {report.seconds:.1f}s, up to entry {report.position}"
+    )
+    for player_id, balance, expected in report.mismatches:
+        logging.error(f"Player {player_id} balance is {balance}, ledger says {expected} ({balance - expected:+d})")
+    return 1 if report.mismatches else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
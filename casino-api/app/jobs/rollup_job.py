@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from app import config
+from app.db import SessionLocal
+from app.models.ggr_rollup_model import ALL_PLAYERS, GRANULARITIES
+from app.repositories.rollup_repository import ROLLUP_SUMS, RollupRepository
+from app.rollups import bucket_start
+
+
+CHECKPOINT = "ggr_rollups"
+
+# Ledger entry type -> (sum column, count column, sign making the sum positive).
+ROLLED_UP_ENTRIES = {
+    "bet": ("bet_sum", "bet_count", -1),
+    "win": ("win_sum", "win_count", 1),
+    "rollback": ("rollback_sum", "rollback_count", 1),
+}
+
+
+def rollup_rows(entries) -> List[dict]:
+    """Sums ledger entries into one row per granularity, bucket and player,
+    plus the same rows for all players. Adjustments are not rolled up."""
+    rows: Dict[Tuple[str, int, datetime], dict] = {}
+    for entry in entries:
+        rolled_up = ROLLED_UP_ENTRIES.get(entry.entry_type)
+        if rolled_up is None:
+            continue
+        sum_column, count_column, sign = rolled_up
+        for granularity in GRANULARITIES:
+            start = bucket_start(entry.created_at, granularity)
+            for player_id in (entry.player_id, ALL_PLAYERS):
+                key = (granularity, player_id, start)
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = {"granularity": granularity, "player_id": player_id, "bucket_start": start}
+                    row.update(dict.fromkeys(ROLLUP_SUMS, 0))
+                row[sum_column] += sign * entry.amount
+                row[count_column] += 1
+    return [rows[key] for key in sorted(rows)]
+
+
+def skipped_ids(position: int, ids: List[int]) -> List[int]:
+    """Ids after ``position`` missing from the ascending ``ids`` read, up to the last one."""
+    skipped = []
+    for ledger_id in ids:
+        skipped.extend(range(position + 1, ledger_id))
+        position = ledger_id
+    return skipped
+
+
+async def roll_up_ggr(
+    session_factory=SessionLocal,
+    rollup_repository: Optional[RollupRepository] = None,
+    batch_size: int = config.ROLLUP_BATCH_SIZE,
+    gap_timeout_seconds: float = config.LEDGER_GAP_TIMEOUT_SECONDS,
+) -> int:
+    """Adds the ledger entries past the checkpoint to the rollups, one batch per
+    transaction, until it has read them all.
+
+    Ledger ids are assigned before commit, so ids skipped by a batch may belong
+    to entries not committed yet: they are saved as gaps and their entries
+    rolled up by the run that first sees them. The gaps come from the ids the
+    batch read, so an entry committing during the batch cannot fall between
+    the read and the gap list. Returns the number of entries read.
+    """
+    rollup_repository = rollup_repository or RollupRepository()
+    processed = 0
+    while True:
+        expired = datetime.now(timezone.utc) - timedelta(seconds=gap_timeout_seconds)
+        async with session_factory() as db:
+            position = await rollup_repository.lock_checkpoint(db=db, job=CHECKPOINT)
+            gaps = await rollup_repository.get_gaps(db=db, job=CHECKPOINT)
+            late = await rollup_repository.get_entries_in(db=db, ids=gaps) if gaps else []
+            await rollup_repository.remove_gaps(db=db, job=CHECKPOINT, ids=[entry.id for entry in late])
+            entries = await rollup_repository.get_entries_after(db=db, position=position, limit=batch_size)
+            rows = rollup_rows([*late, *entries])
+            if rows:
+                await rollup_repository.add_to_rollups(db=db, rows=rows)
+            if entries:
+                gaps = skipped_ids(position, [entry.id for entry in entries])
+                await rollup_repository.add_gaps(db=db, job=CHECKPOINT, ids=gaps)
+                await rollup_repository.move_checkpoint(db=db, job=CHECKPOINT, position=entries[-1].id)
+            await rollup_repository.expire_gaps(db=db, job=CHECKPOINT, before=expired)
+            await db.commit()
+        processed += len(late) + len(entries)
+        if len(entries) < batch_size:
+            return processed
+
+
+async def run_ggr_rollups(interval_seconds: float = config.ROLLUP_INTERVAL_SECONDS):
+    """Rolls up new ledger entries every ``interval_seconds`` until cancelled."""
+    while True:
+        try:
+            count = await roll_up_ggr()
+            logging.info(f"Rolled up {count} ledger entries")
+        except Exception as e:
+            logging.error(f"Failed to roll up ledger entries: {str(e)}")
+        await asyncio.sleep(interval_seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(roll_up_ggr())
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+from app import config
+from app.db import SessionLocal
+from app.repositories.ledger_repository import LedgerRepository
+
+
+async def take_balance_snapshots(session_factory=SessionLocal, ledger_repository: Optional[LedgerRepository] = None) -> int:
+    """Creates upcoming ledger partitions and checkpoints player balances once."""
+    ledger_repository = ledger_repository or LedgerRepository()
+    async with session_factory() as db:
+        await ledger_repository.ensure_partitions(
+            db=db, today=date.today(), months_ahead=config.LEDGER_PARTITION_MONTHS_AHEAD
+        )
+        count = await ledger_repository.take_snapshots(db=db)
+        await db.commit()
+    return count
+
+
+async def run_balance_snapshots(interval_seconds: float = config.SNAPSHOT_INTERVAL_SECONDS):
+    """Takes snapshots every ``interval_seconds`` until cancelled."""
+    while True:
+        try:
+            count = await take_balance_snapshots()
+            logging.info(f"Took balance snapshots for {count} players")
+        except Exception as e:
+            logging.error(f"Failed to take balance snapshots: {str(e)}")
+        await asyncio.sleep(interval_seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(take_balance_snapshots())
@@ -1,8 +1,59 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from app import config
+from app.container import get_container
+from app.db import engine, read_engine
+from app.middleware import MetricsMiddleware, QueryGuardMiddleware
 from app.routes.player_route import router as player_router 
 from app.routes.balance_route import router as balance_router
 from app.routes.transaction_route import router as transaction_router
-from fastapi.responses import RedirectResponse
+from app.routes.metrics_route import router as metrics_router
+from app.routes.report_route import router as report_router
+from app.startup import startup_timings
+from fastapi.responses import ORJSONResponse, RedirectResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    container = get_container()
+    snapshot_task = None
+    if config.SNAPSHOT_INTERVAL_SECONDS > 0:
+        # Imported here: the ledger job is not needed to serve requests.
+        from app.jobs.snapshot_job import run_balance_snapshots
+        snapshot_task = asyncio.create_task(run_balance_snapshots(config.SNAPSHOT_INTERVAL_SECONDS))
+    rollup_task = None
+    if config.ROLLUP_INTERVAL_SECONDS > 0:
+        from app.jobs.rollup_job import run_ggr_rollups
+        rollup_task = asyncio.create_task(run_ggr_rollups(config.ROLLUP_INTERVAL_SECONDS))
+    if config.WALLET_GROUP_COMMIT:
+        container.wallet_writer.start()
+    if config.STARTUP_WARMUP:
+        from app.warmup import warm_up
+        warmup_started = time.perf_counter()
+        await warm_up()
+        startup_timings.warmup_seconds = time.perf_counter() - warmup_started
+    startup_timings.startup_seconds = time.perf_counter() - started
+    logging.info(
+        f"Imported the app in {startup_timings.import_seconds:.3f}s, "
+        f"started in {startup_timings.startup_seconds:.3f}s (warm-up {startup_timings.warmup_seconds:.3f}s)"
+    )
+    yield
+    # The server has stopped accepting requests; apply what is still queued
+    # before the pools go away.
+    await container.wallet_writer.stop()
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+    if rollup_task is not None:
+        rollup_task.cancel()
+    await engine.dispose()
+    await read_engine.dispose()
 
 
 app = FastAPI(
@@ -18,8 +69,13 @@ app = FastAPI(
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
     },
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+app.add_middleware(QueryGuardMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/", include_in_schema=False)
 async def root():
     return RedirectResponse(url="/docs")
@@ -28,3 +84,7 @@ async def root():
 app.include_router(player_router, prefix="/players", tags=["players"])
 app.include_router(balance_router, prefix="/balance", tags=["balance"])
 app.include_router(transaction_router, prefix="/transactions", tags=["transactions"])
+app.include_router(report_router, prefix="/reports", tags=["reports"])
+app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+
+startup_timings.import_seconds = time.perf_counter() - IMPORT_STARTED
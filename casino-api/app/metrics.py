@@ -0,0 +1,201 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic counter, one value per combination of label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        return self.values.get(labelvalues, 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, labelvalues)} {value}"
+            for labelvalues, value in self.values.items()
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per combination of label values.
+
+    Each series keeps a count per bucket and the running sum; the cumulative
+    ``_bucket`` samples Prometheus expects are only computed when rendering.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self.series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        labelnames = self.labelnames + ("le",)
+        for labelvalues, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(labelnames, labelvalues + (bound,))} {cumulative}")
+            labels = format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text exposition format.
+
+    Besides counters and histograms, collectors expose the ``metrics()``
+    dicts the pools and caches already keep as gauges, read at scrape time.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors: List[Tuple[str, str, Sequence[str], Callable[[], Dict[Tuple[str, ...], dict]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(
+        self,
+        prefix: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], dict]],
+    ):
+        """``collect`` maps label values to a ``metrics()`` dict; every numeric
+        key becomes the gauge ``<prefix>_<key>``."""
+        self.collectors.append((prefix, documentation, tuple(labelnames), collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+
+        for prefix, documentation, labelnames, collect in self.collectors:
+            gauges: Dict[str, List[str]] = {}
+            for labelvalues, values in collect().items():
+                for key, value in values.items():
+                    if isinstance(value, (int, float)):
+                        gauges.setdefault(key, []).append(
+                            f"{prefix}_{key}{format_labels(labelnames, labelvalues)} {float(value)}"
+                        )
+            for key, samples in gauges.items():
+                lines.append(f"# HELP {prefix}_{key} {documentation}")
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class RequestDbStats:
+    """Database work done while serving the current request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time spent serving HTTP requests.", ("method", "route", "status")
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request.", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per HTTP request.", ("route",)
+)
+db_queries = registry.counter("db_queries_total", "Database queries executed.", ("engine",))
+db_query_duration = registry.counter("db_query_duration_seconds_total", "Time spent executing database queries.", ("engine",))
+db_commits = registry.counter("db_commits_total", "Database transactions committed.", ("engine",))
+wallet_idempotent_replays = registry.counter(
+    "wallet_idempotent_replays_total", "Retried txn_uuids answered with the stored result.", ("operation",)
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+    """Counts queries, query time and commits of ``engine`` and adds them to
+    the stats of the request being served."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        db_queries.inc(name)
+        db_query_duration.inc(name, amount=elapsed)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started_at") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    @event.listens_for(sync_engine, "commit")
+    def commit(conn):
+        db_commits.inc(name)
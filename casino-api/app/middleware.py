@@ -0,0 +1,95 @@
+import time
+from app import config
+from app.metrics import (
+    RequestDbStats,
+    http_request_db_duration,
+    http_request_db_queries,
+    http_request_duration,
+    request_db_stats,
+)
+from app.query_guard import QueryLog, current_query_log, recorders, report
+
+
+class MetricsMiddleware:
+    """Records the latency and database work of every HTTP request.
+
+    A plain ASGI middleware: it only wraps ``send`` to catch the status code,
+    so the per-request cost is a few counter updates. Requests are labelled
+    with the matched route template, never the raw path, to keep the number
+    of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            http_request_duration.observe(elapsed, scope["method"], route_path, str(status_code))
+            http_request_db_queries.observe(stats.queries, route_path)
+            http_request_db_duration.observe(stats.seconds, route_path)
+
+
+class QueryGuardMiddleware:
+    """Checks the statements of each request against its query budget.
+
+    With ``QUERY_GUARD_MODE`` set to ``warn`` requests over budget or running
+    the same query twice are logged; with ``raise`` the request fails with a
+    500, which is how the test suite catches query regressions. The check
+    runs before the response starts, so it covers the queries made up to
+    then; queries of a streamed body can only be logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (config.QUERY_GUARD_MODE == "off" and not recorders):
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog(method=scope["method"])
+        checked_count = None
+
+        def set_route():
+            route = scope.get("route")
+            log.route = route.path if route is not None else "unmatched"
+
+        async def send_checked(message):
+            nonlocal checked_count
+            if message["type"] == "http.response.start":
+                set_route()
+                checked_count = log.count
+                report(log, config.QUERY_GUARD_MODE)
+            await send(message)
+
+        token = current_query_log.set(log)
+        try:
+            await self.app(scope, receive, send_checked)
+        finally:
+            current_query_log.reset(token)
+            set_route()
+            for logs in recorders:
+                logs.append(log)
+        if checked_count is not None and log.count != checked_count:
+            report(log, "warn")
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, func
+from app.db import Base
+
+
+class BalanceSnapshot(Base):
+    """Latest checkpoint of a player's balance in the ledger.
+
+    ``balance`` is the balance right after ledger entry ``ledger_entry_id``,
+    so the current balance is it plus the amounts of the later entries.
+    """
+
+    __tablename__ = "balance_snapshots"
+
+    player_id = Column(Integer, primary_key=True)
+    balance = Column(BigInteger, nullable=False)
+    ledger_entry_id = Column(BigInteger, nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
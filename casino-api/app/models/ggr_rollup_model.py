@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from app.db import Base
+
+
+# Bucket sizes kept by the rollup job, from finest to coarsest.
+GRANULARITIES = ("minute", "hour", "day")
+
+# player_id of the buckets summing every player.
+ALL_PLAYERS = 0
+
+
+class GgrRollup(Base):
+    """Bets, wins and rollbacks of one player, or of all of them, in one time bucket.
+
+    Filled from the ledger by ``app.jobs.rollup_job``. The primary key leads
+    with the granularity and player, so a report reads one index range with
+    one row per bucket however many transactions the buckets hold.
+    """
+
+    __tablename__ = "ggr_rollups"
+
+    granularity = Column(String(8), primary_key=True)
+    player_id = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    # Sums are positive minor units; GGR is bet_sum - win_sum - rollback_sum.
+    bet_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    win_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rollback_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    bet_count = Column(Integer, nullable=False, default=0, server_default="0")
+    win_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rollback_count = Column(Integer, nullable=False, default=0, server_default="0")
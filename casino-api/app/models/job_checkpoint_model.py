@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+from app.db import Base
+
+
+class JobCheckpoint(Base):
+    """How far a background job has read an append-only table.
+
+    ``position`` is the id of the last row the job has processed; the job
+    moves it in the same transaction as the writes derived from those rows.
+    Ids missing below it when it moved are kept in ``ledger_gaps``.
+    """
+
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+    position = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, func
+from app.db import Base
+
+
+class LedgerEntry(Base):
+    """Append-only record of every balance change.
+
+    On PostgreSQL the table is range-partitioned by ``created_at`` (see
+    initdb/init.sql), which makes its primary key ``(id, created_at)``.
+    """
+
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        Index("ix_ledger_entries_player_id_id", "player_id", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    player_id = Column(Integer, nullable=False)
+    txn_uuid = Column(String, nullable=True)
+    # bet, win, rollback or adjustment
+    entry_type = Column(String, nullable=False)
+    # Signed change and the balance it produced, in minor units.
+    amount = Column(BigInteger, nullable=False)
+    balance = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
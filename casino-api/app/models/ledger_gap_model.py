@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+from app.db import Base
+
+
+class LedgerGap(Base):
+    """A ledger id missing below a job's checkpoint when the job moved it.
+
+    Ledger ids are assigned before commit, so the id may belong to a
+    transaction still in progress. The job reads the entry once it commits
+    and forgets the gap after LEDGER_GAP_TIMEOUT_SECONDS, taking the id as
+    rolled back.
+    """
+
+    __tablename__ = "ledger_gaps"
+
+    job = Column(String(64), primary_key=True)
+    ledger_id = Column(BigInteger, primary_key=True)
+    seen_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import BigInteger, Column, Integer, String
 from sqlalchemy.orm import relationship
 from app.db import Base
 
@@ -7,6 +7,8 @@ class Player(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    balance = Column(Float, default=0.0)
+    # Amounts are integer minor units (cents); see app.money.
+    balance = Column(BigInteger, default=0)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     transactions = relationship("Transaction", back_populates="player")
@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, desc
+from app.db import Base
+
+
+# Running totals a leaderboard can be ranked by.
+STATS_METRICS = ("total_wagered", "total_won", "bet_count", "net_ggr")
+
+
+class PlayerStats(Base):
+    """Running wagering totals of a player, kept up to date by the wallet writes.
+
+    Each bet, win and rollback adds its change in the same transaction as the
+    balance update. ``net_ggr`` is wagered minus won, the house's gross gaming
+    revenue from the player. Every metric has a descending index, so a top-N
+    leaderboard reads the first N index entries instead of sorting the table.
+    """
+
+    __tablename__ = "player_stats"
+    __table_args__ = tuple(
+        Index(f"ix_player_stats_{metric}", desc(metric), "player_id") for metric in STATS_METRICS
+    )
+
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    # Money totals are integer minor units (cents); see app.money.
+    total_wagered = Column(BigInteger, nullable=False, default=0, server_default="0")
+    total_won = Column(BigInteger, nullable=False, default=0, server_default="0")
+    bet_count = Column(Integer, nullable=False, default=0, server_default="0")
+    net_ggr = Column(BigInteger, nullable=False, default=0, server_default="0")
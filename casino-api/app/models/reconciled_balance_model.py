@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, Integer
+from app.db import Base
+
+
+class ReconciledBalance(Base):
+    """Sum of a player's ledger amounts up to the reconciliation checkpoint.
+
+    Kept by ``app.jobs.reconciliation_job`` so an incremental run only reads
+    the ledger entries added since the previous one.
+    """
+
+    __tablename__ = "reconciled_balances"
+
+    player_id = Column(Integer, primary_key=True)
+    # Minor units, like players.balance.
+    balance = Column(BigInteger, nullable=False)
@@ -1,15 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, ForeignKey, Boolean, Index, desc, func
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_player_id_id", "player_id", desc("id")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     txn_uuid = Column(String, unique=True, index=True, nullable=False)
     player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
-    value_bet = Column(Float, default=0.0)
-    value_win = Column(Float, default=0.0)
+    # Amounts are integer minor units (cents); see app.money.
+    value_bet = Column(BigInteger, default=0)
+    value_win = Column(BigInteger, default=0)
     rolled_back = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     player = relationship("Player", back_populates="transactions")
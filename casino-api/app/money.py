@@ -0,0 +1,31 @@
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+MINOR_UNITS_PER_MAJOR = 100
+
+
+def to_minor_units(value: float) -> int:
+    """Converts an API amount to the integer minor units stored in the database.
+
+    Raises ``ValueError`` for amounts with a fraction of a minor unit, which
+    would otherwise be rounded away.
+    """
+    amount = Decimal(str(value)).scaleb(2)
+    if not amount.is_finite() or amount != amount.to_integral_value():
+        raise ValueError("Amounts must be finite and have at most 2 decimal places.")
+    return int(amount)
+
+
+def to_major_units(value: int) -> float:
+    return value / MINOR_UNITS_PER_MAJOR
+
+
+def check_amount(value: float) -> float:
+    to_minor_units(value)
+    return value
+
+
+# Request field for money; sub-cent amounts fail validation with a 422.
+Amount = Annotated[float, AfterValidator(check_amount)]
@@ -0,0 +1,29 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Iterable
+from app import config
+
+
+class PlayerLocks:
+    """Striped asyncio locks serializing balance writes per player.
+
+    Players share one of ``stripes`` locks, so memory stays bounded however
+    many players write. Locks only exist in this process: the mode built on
+    them is correct with a single worker.
+    """
+
+    def __init__(self, stripes: int):
+        self.locks = [asyncio.Lock() for _ in range(stripes)]
+
+    @asynccontextmanager
+    async def hold(self, player_ids: Iterable[int]):
+        # Stripes are always taken in ascending order so that two holders of
+        # several players cannot deadlock each other.
+        stripes = sorted({player_id % len(self.locks) for player_id in player_ids})
+        async with AsyncExitStack() as stack:
+            for stripe in stripes:
+                await stack.enter_async_context(self.locks[stripe])
+            yield
+
+
+player_locks = PlayerLocks(stripes=config.PLAYER_LOCK_STRIPES)
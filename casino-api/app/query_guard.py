@@ -0,0 +1,157 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+QUERY_GUARD_MODES = ("off", "warn", "raise")
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+# Most statements each endpoint may send to the database, keyed by method and
+# route template. Endpoints without an entry are only checked for duplicates.
+QUERY_BUDGETS: Dict[str, int] = {
+    "POST /players": 2,
+    "GET /players": 1,
+    "GET /players/{player_id}": 1,
+    "PUT /players/{player_id}": 4,
+    "DELETE /players/{player_id}": 3,
+    "GET /players/{player_id}/history": 2,
+    "GET /players/{player_id}/stats": 1,
+    "GET /players/leaderboard": 1,
+    "GET /balance": 1,
+    "POST /transactions/bet": 4,
+    "POST /transactions/win": 4,
+    "POST /transactions/rollback": 4,
+    "POST /transactions/batch": 6,
+    "GET /transactions": 1,
+    "GET /transactions/{txn_uuid}": 1,
+    "DELETE /transactions/{transaction_id}": 2,
+    "GET /reports/ggr": 1,
+}
+
+# Bulk endpoints run the same statements once per batch of rows, so their
+# statement count and repeats grow with the data and are not checked.
+UNCHECKED_ENDPOINTS = ("POST /players/import", "GET /players/export")
+
+
+class QueryGuardViolation(Exception):
+
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        super().__init__("; ".join(problems))
+
+
+class QueryLog:
+    """Statements sent to the database while serving one request."""
+
+    def __init__(self, method: str = "", route: str = ""):
+        self.method = method
+        self.route = route
+        self.statements: List[Tuple[str, str]] = []
+        self.rollbacks: List[int] = []
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.route}"
+
+    @property
+    def count(self) -> int:
+        """Statements sent, not counting transaction control."""
+        return sum(1 for statement, _ in self.statements if not statement.startswith(TRANSACTION_CONTROL))
+
+    def record(self, statement: str, parameters):
+        self.statements.append((statement, repr(parameters)))
+
+    def duplicates(self) -> Dict[Tuple[str, str], int]:
+        """Identical statements run more than once with identical parameters.
+
+        Transaction control statements are ignored, and a rollback resets the
+        comparison so a transaction retried after a conflict is not reported.
+        """
+        seen: Dict[Tuple[str, str], int] = {}
+        repeated: Dict[Tuple[str, str], int] = {}
+        for position, statement in enumerate(self.statements):
+            if position in self.rollbacks:
+                seen.clear()
+            if statement[0].startswith(TRANSACTION_CONTROL):
+                continue
+            seen[statement] = seen.get(statement, 0) + 1
+            if seen[statement] > 1:
+                repeated[statement] = seen[statement]
+        return repeated
+
+    def problems(self, budget: Optional[int] = None) -> List[str]:
+        if self.endpoint in UNCHECKED_ENDPOINTS:
+            return []
+        if budget is None:
+            budget = QUERY_BUDGETS.get(self.endpoint)
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f"{self.endpoint} ran {self.count} queries, budget is {budget}")
+        for (statement, parameters), times in self.duplicates().items():
+            problems.append(f"{self.endpoint} ran the same query {times} times: {statement} {parameters}")
+        return problems
+
+
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+# Lists receiving the QueryLog of every request while record_queries() is active.
+recorders: List[List[QueryLog]] = []
+
+
+@contextmanager
+def capture_queries():
+    """Collects the statements run inside the block in the current context."""
+    log = QueryLog()
+    token = current_query_log.set(log)
+    try:
+        yield log
+    finally:
+        current_query_log.reset(token)
+
+
+@contextmanager
+def record_queries():
+    """Collects one QueryLog per HTTP request served inside the block.
+
+    Works with clients that run the application on another thread, such as
+    the TestClient, since the logs are handed over by the middleware.
+    """
+    logs: List[QueryLog] = []
+    recorders.append(logs)
+    try:
+        yield logs
+    finally:
+        recorders.remove(logs)
+
+
+def report(log: QueryLog, mode: str):
+    problems = log.problems()
+    if not problems:
+        return
+    if mode == "raise":
+        raise QueryGuardViolation(problems)
+    for problem in problems:
+        logging.warning(f"Query guard: {problem}")
+
+
+def install_query_guard():
+    """Records the statements of every engine into the active QueryLog."""
+    if event.contains(Engine, "before_cursor_execute", _record_statement):
+        return
+    event.listen(Engine, "before_cursor_execute", _record_statement)
+    event.listen(Engine, "rollback", _record_rollback)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    log = current_query_log.get()
+    if log is not None:
+        log.record(statement, parameters)
+
+
+def _record_rollback(conn):
+    log = current_query_log.get()
+    if log is not None:
+        log.rollbacks.append(len(log.statements))
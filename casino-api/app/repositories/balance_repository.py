@@ -0,0 +1,15 @@
+from typing import Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.models.player_model import Player
+
+
+class BalanceRepository:
+    """Primary-key balance lookups on a read-only connection, without ORM loading."""
+
+    balance_by_id = select(Player.name, Player.balance).where(Player.id == bindparam("player_id"))
+
+    async def get_balance(self, conn: AsyncConnection, player_id: int) -> Optional[Row]:
+        result = await conn.execute(self.balance_by_id, {"player_id": player_id})
+        return result.first()
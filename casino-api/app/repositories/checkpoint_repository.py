@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import BigInteger, bindparam, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.job_checkpoint_model import JobCheckpoint
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.ledger_gap_model import LedgerGap
+
+
+def ledger_gaps_between():
+    """``(first, last)`` of each run of ids missing from the ledger after
+    ``position`` and up to ``up_to``."""
+    previous = func.lag(LedgerEntry.id, 1, bindparam("position", type_=BigInteger)).over(order_by=LedgerEntry.id)
+    entries = (
+        select(LedgerEntry.id, previous.label("previous"))
+        .where(LedgerEntry.id > bindparam("position"), LedgerEntry.id <= bindparam("up_to"))
+        .subquery()
+    )
+    return select(entries.c.previous + 1, entries.c.id - 1).where(entries.c.id > entries.c.previous + 1)
+
+
+class CheckpointRepository:
+    """Positions of the background jobs that read the ledger incrementally,
+    and the ids each one found missing below its position."""
+
+    create_checkpoint_stmts = {
+        "postgresql": postgresql.insert(JobCheckpoint).on_conflict_do_nothing(index_elements=["name"]),
+        "sqlite": sqlite.insert(JobCheckpoint).on_conflict_do_nothing(index_elements=["name"]),
+    }
+    checkpoint_for_update = (
+        select(JobCheckpoint.position).where(JobCheckpoint.name == bindparam("job")).with_for_update()
+    )
+    move_checkpoint_stmt = (
+        update(JobCheckpoint)
+        .where(JobCheckpoint.name == bindparam("job"))
+        .values(position=bindparam("position"), updated_at=func.now())
+    )
+    ledger_gaps_between = ledger_gaps_between()
+    add_gaps_stmts = {
+        "postgresql": postgresql.insert(LedgerGap).on_conflict_do_nothing(index_elements=["job", "ledger_id"]),
+        "sqlite": sqlite.insert(LedgerGap).on_conflict_do_nothing(index_elements=["job", "ledger_id"]),
+    }
+    gaps_of_job = select(LedgerGap.ledger_id).where(LedgerGap.job == bindparam("job"))
+    remove_gaps_stmt = delete(LedgerGap).where(
+        LedgerGap.job == bindparam("job"), LedgerGap.ledger_id.in_(bindparam("ids", expanding=True))
+    )
+    expire_gaps_stmt = delete(LedgerGap).where(LedgerGap.job == bindparam("job"), LedgerGap.seen_at < bindparam("before"))
+    clear_gaps_stmt = delete(LedgerGap).where(LedgerGap.job == bindparam("job"))
+
+    def _dialect(self, db: AsyncSession) -> str:
+        return "postgresql" if db.bind.dialect.name == "postgresql" else "sqlite"
+
+
+    async def lock_checkpoint(self, db: AsyncSession, job: str) -> int:
+        """Returns the job's position, holding its row locked until the caller
+        commits so concurrent runs of the job take turns."""
+        await db.execute(self.create_checkpoint_stmts[self._dialect(db)], {"name": job, "position": 0})
+        result = await db.execute(self.checkpoint_for_update, {"job": job})
+        return result.scalar_one()
+
+
+    async def move_checkpoint(self, db: AsyncSession, job: str, position: int) -> None:
+        await db.execute(self.move_checkpoint_stmt, {"job": job, "position": position})
+
+
+    async def find_gaps(self, db: AsyncSession, position: int, up_to: int) -> List[int]:
+        """Ids after ``position`` and up to ``up_to`` with no ledger entry
+        visible to this transaction."""
+        if up_to <= position:
+            return []
+        result = await db.execute(self.ledger_gaps_between, {"position": position, "up_to": up_to})
+        return [ledger_id for first, last in result.all() for ledger_id in range(first, last + 1)]
+
+
+    async def add_gaps(self, db: AsyncSession, job: str, ids: List[int]) -> None:
+        if ids:
+            await db.execute(self.add_gaps_stmts[self._dialect(db)], [{"job": job, "ledger_id": ledger_id} for ledger_id in ids])
+
+
+    async def get_gaps(self, db: AsyncSession, job: str) -> List[int]:
+        result = await db.execute(self.gaps_of_job, {"job": job})
+        return result.scalars().all()
+
+
+    async def remove_gaps(self, db: AsyncSession, job: str, ids: List[int]) -> None:
+        if ids:
+            await db.execute(self.remove_gaps_stmt, {"job": job, "ids": ids})
+
+
+    async def expire_gaps(self, db: AsyncSession, job: str, before: datetime) -> None:
+        await db.execute(self.expire_gaps_stmt, {"job": job, "before": before})
+
+
+    async def clear_gaps(self, db: AsyncSession, job: str) -> None:
+        await db.execute(self.clear_gaps_stmt, {"job": job})
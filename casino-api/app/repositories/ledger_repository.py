@@ -0,0 +1,76 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.balance_snapshot_model import BalanceSnapshot
+
+
+class LedgerRepository:
+    """Snapshots of the append-only ledger and balances replayed from them."""
+
+    async def take_snapshots(self, db: AsyncSession) -> int:
+        """Checkpoints every player with entries past the newest snapshot.
+
+        Only entries after the snapshots' high-water mark are scanned, and a
+        snapshot is never moved back to an older entry. Returns the number of
+        players checkpointed; the caller commits.
+        """
+        high_water = select(func.coalesce(func.max(BalanceSnapshot.ledger_entry_id), 0)).scalar_subquery()
+        latest = (
+            select(func.max(LedgerEntry.id).label("id"))
+            .where(LedgerEntry.id > high_water)
+            .group_by(LedgerEntry.player_id)
+            .subquery()
+        )
+        entries = select(LedgerEntry.player_id, LedgerEntry.balance, LedgerEntry.id).where(LedgerEntry.id == latest.c.id)
+
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(BalanceSnapshot).from_select(["player_id", "balance", "ledger_entry_id"], entries)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["player_id"],
+            set_={
+                "balance": stmt.excluded.balance,
+                "ledger_entry_id": stmt.excluded.ledger_entry_id,
+                "taken_at": func.now(),
+            },
+            where=BalanceSnapshot.ledger_entry_id < stmt.excluded.ledger_entry_id,
+        )
+        result = await db.execute(stmt)
+        return result.rowcount
+
+
+    async def replay_balance(self, db: AsyncSession, player_id: int) -> Optional[int]:
+        """Recomputes a balance from the player's snapshot and the entries after it.
+
+        Returns None for a player without any ledger history.
+        """
+        snapshot = await db.get(BalanceSnapshot, player_id)
+        since, balance = (snapshot.ledger_entry_id, snapshot.balance) if snapshot else (0, 0)
+        result = await db.execute(
+            select(func.count(), func.coalesce(func.sum(LedgerEntry.amount), 0))
+            .where(LedgerEntry.player_id == player_id, LedgerEntry.id > since)
+        )
+        count, total = result.one()
+        if snapshot is None and count == 0:
+            return None
+        return balance + total
+
+
+    async def ensure_partitions(self, db: AsyncSession, today: date, months_ahead: int) -> None:
+        """Creates the monthly ledger partitions from this month on (PostgreSQL only).
+
+        Partitions must exist before rows for their month arrive: rows that
+        land in the default partition block creating that month's partition.
+        """
+        if db.bind.dialect.name != "postgresql":
+            return
+        year, month = today.year, today.month
+        for _ in range(months_ahead + 1):
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS ledger_entries_y{year}m{month:02d} PARTITION OF ledger_entries "
+                f"FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{next_year}-{next_month:02d}-01')"
+            ))
+            year, month = next_year, next_month
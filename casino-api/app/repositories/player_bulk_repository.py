@@ -0,0 +1,93 @@
+import asyncio
+from typing import AsyncIterator, List, Tuple
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.player_model import Player
+
+
+class PlayerBulkRepository:
+    """Batch writes and full-table reads of players for imports and exports.
+
+    On PostgreSQL rows go through ``COPY`` on the session's asyncpg
+    connection; other databases use executemany inserts and a streamed
+    ``SELECT``.
+    """
+
+    # Ids are taken from the sequence up front so the players and their
+    # opening ledger entries can be copied in without reading anything back.
+    allocate_ids_stmt = text("SELECT nextval(pg_get_serial_sequence('players', 'id')) FROM generate_series(1, :count)")
+    insert_players_stmt = insert(Player).returning(Player.id, sort_by_parameter_order=True)
+    all_players = select(Player.id, Player.name, Player.balance).order_by(Player.id)
+    # Balances leave as fixed two-decimal major units, like the fallback's.
+    copy_out_query = "SELECT id, name, (balance::numeric / 100)::numeric(20, 2) AS balance FROM players ORDER BY id"
+
+    def supports_copy(self, db: AsyncSession) -> bool:
+        return db.bind.dialect.name == "postgresql"
+
+
+    async def insert_players(self, db: AsyncSession, players: List[Tuple[str, int]]) -> None:
+        """Inserts ``(name, balance)`` rows with an adjustment ledger entry
+        each, like a player created through the API. The caller commits."""
+        if self.supports_copy(db):
+            await self._copy_players(db, players)
+            return
+        result = await db.execute(self.insert_players_stmt, [{"name": name, "balance": balance} for name, balance in players])
+        await db.execute(insert(LedgerEntry), [
+            {"player_id": player_id, "entry_type": "adjustment", "amount": balance, "balance": balance}
+            for player_id, (_, balance) in zip(result.scalars(), players)
+        ])
+
+
+    async def _copy_players(self, db: AsyncSession, players: List[Tuple[str, int]]) -> None:
+        result = await db.execute(self.allocate_ids_stmt, {"count": len(players)})
+        ids = result.scalars().all()
+        driver = await self._driver_connection(db)
+        await driver.copy_records_to_table(
+            "players",
+            records=[(player_id, name, balance, 0) for player_id, (name, balance) in zip(ids, players)],
+            columns=["id", "name", "balance", "version"],
+        )
+        await driver.copy_records_to_table(
+            "ledger_entries",
+            records=[(player_id, "adjustment", balance, balance) for player_id, (_, balance) in zip(ids, players)],
+            columns=["player_id", "entry_type", "amount", "balance"],
+        )
+
+
+    async def stream_players(self, db: AsyncSession) -> AsyncIterator[Row]:
+        result = await db.stream(self.all_players.execution_options(yield_per=config.STREAM_YIELD_PER))
+        async for player in result:
+            yield player
+
+
+    async def copy_players_csv(self, db: AsyncSession) -> AsyncIterator[bytes]:
+        """Yields the players table as CSV produced by ``COPY ... TO STDOUT``.
+
+        asyncpg pushes the output to a callback; a small queue hands it to the
+        caller and makes the copy wait while the caller is still sending.
+        """
+        driver = await self._driver_connection(db)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=config.EXPORT_QUEUE_CHUNKS)
+
+        async def copy():
+            try:
+                await driver.copy_from_query(self.copy_out_query, output=queue.put, format="csv", header=True)
+            finally:
+                await queue.put(None)
+
+        task = asyncio.create_task(copy())
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            await task
+        finally:
+            task.cancel()
+
+
+    async def _driver_connection(self, db: AsyncSession):
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        return raw.driver_connection
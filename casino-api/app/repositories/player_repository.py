@@ -1,55 +1,99 @@
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.player_model import Player
+from app.models.ledger_entry_model import LedgerEntry
 from app.schemas.player_schema import PlayerCreate, PlayerUpdateRequest
 from app.exceptions.player_not_found_exception import PlayerNotFoundException
+from app.cache.balance_cache import BalanceCache, player_balance_cache
+from app import config
+from app.money import to_minor_units
 import logging
 
 
 class PlayerRepository:
+
+    player_by_id = select(Player).where(Player.id == bindparam("player_key"))
+
+    def __init__(self, balance_cache: BalanceCache = player_balance_cache):
+        self.balance_cache = balance_cache
     
-    def create_player(self, db: Session, player: PlayerCreate) -> Player:
-        db_player = Player(**player.dict())
+    async def create_player(self, db: AsyncSession, player: PlayerCreate) -> Player:
+        db_player = Player(name=player.name, balance=to_minor_units(player.balance))
         db.add(db_player)
-        db.commit()
-        db.refresh(db_player)
+        await db.flush()
+        db.add(self._adjustment(db_player.id, db_player.balance, db_player.balance))
+        await db.commit()
+        self.balance_cache.put(db_player.id, db_player.name, db_player.balance)
         return db_player
 
 
-    def get_player(self, db: Session, player_id: int) -> Player:
-        db_player = db.query(Player).filter(Player.id == player_id).first()
+    async def get_player(self, db: AsyncSession, player_id: int) -> Player:
+        result = await db.execute(self.player_by_id, {"player_key": player_id})
+        db_player = result.scalar_one_or_none()
         if not db_player:
             raise PlayerNotFoundException(player_id)
         return db_player
 
 
-    def get_players(self, db: Session):
-        return db.query(Player).all()
+    def _players_page(self, limit: Optional[int], after: Optional[int]):
+        # Plain rows: listing players needs neither identity tracking nor relationships.
+        stmt = select(Player.id, Player.name, Player.balance).order_by(Player.id)
+        if after is not None:
+            stmt = stmt.where(Player.id > after)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+
+    async def get_players(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> List[Row]:
+        result = await db.execute(self._players_page(limit=limit, after=after))
+        return result.all()
 
 
-    def delete_player(self, db: Session, player_id: int) -> Player:
-        db_player = db.query(Player).filter(Player.id == player_id).first()
+    async def stream_players(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> AsyncIterator[Row]:
+        stmt = self._players_page(limit=limit, after=after).execution_options(yield_per=config.STREAM_YIELD_PER)
+        result = await db.stream(stmt)
+        async for player in result:
+            yield player
+
+
+    async def delete_player(self, db: AsyncSession, player_id: int) -> Player:
+        db_player = await db.get(Player, player_id)
         if not db_player:
             raise PlayerNotFoundException(player_id)
-        db.delete(db_player)
-        db.commit()
+        await db.delete(db_player)
+        await db.commit()
+        self.balance_cache.invalidate(player_id)
         return db_player
 
 
-    def update_player(self, db: Session, player_id: int, player: PlayerUpdateRequest) -> Player:
-        db_player = db.query(Player).filter(Player.id == player_id).first()
+    async def update_player(self, db: AsyncSession, player_id: int, player: PlayerUpdateRequest) -> Player:
+        # Locked so the ledger adjustment is computed from the current balance.
+        db_player = await db.get(Player, player_id, with_for_update=True, populate_existing=True)
         if not db_player:
             raise PlayerNotFoundException(player_id=player_id)
         
+        balance = to_minor_units(player.balance)
+        if balance != db_player.balance:
+            db.add(self._adjustment(player_id, balance - db_player.balance, balance))
         db_player.name = player.name
-        db_player.balance = player.balance
+        db_player.balance = balance
+        db_player.version = Player.version + 1
        
         try:
-            db.commit()
-            db.refresh(db_player)
+            await db.commit()
+            await db.refresh(db_player)
         except Exception as e:
             logging.error(f"Failed to update player {player_id}: {str(e)}")
-            db.rollback()
+            await db.rollback()
             raise e
         
+        self.balance_cache.put(db_player.id, db_player.name, db_player.balance)
         return db_player
 
+
+    def _adjustment(self, player_id: int, amount: int, balance: int) -> LedgerEntry:
+        """Ledger entry for a balance set through the player endpoints."""
+        return LedgerEntry(player_id=player_id, entry_type="adjustment", amount=amount, balance=balance)
@@ -0,0 +1,40 @@
+from typing import List, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.player_model import Player
+from app.models.player_stats_model import STATS_METRICS, PlayerStats
+
+
+stats_columns = (PlayerStats.total_wagered, PlayerStats.total_won, PlayerStats.bet_count, PlayerStats.net_ggr)
+
+
+def leaderboard_stmt(metric: str):
+    """Top players by ``metric``: reads the metric's descending index in order."""
+    return (
+        select(PlayerStats.player_id, Player.name, *stats_columns)
+        .join(Player, Player.id == PlayerStats.player_id)
+        .order_by(getattr(PlayerStats, metric).desc(), PlayerStats.player_id)
+        .limit(bindparam("row_limit"))
+    )
+
+
+class PlayerStatsRepository:
+    """Reads of the ``player_stats`` aggregates, one indexed statement each."""
+
+    # Players without any bet or win yet have no stats row.
+    stats_by_player = (
+        select(Player.id, *stats_columns)
+        .outerjoin(PlayerStats, PlayerStats.player_id == Player.id)
+        .where(Player.id == bindparam("player_key"))
+    )
+    leaderboard_stmts = {metric: leaderboard_stmt(metric) for metric in STATS_METRICS}
+
+    async def get_player_stats(self, db: AsyncSession, player_id: int) -> Optional[Row]:
+        result = await db.execute(self.stats_by_player, {"player_key": player_id})
+        return result.first()
+
+
+    async def get_leaderboard(self, db: AsyncSession, metric: str, limit: int) -> List[Row]:
+        result = await db.execute(self.leaderboard_stmts[metric], {"row_limit": limit})
+        return result.all()
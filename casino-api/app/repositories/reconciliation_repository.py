@@ -0,0 +1,73 @@
+from typing import AsyncIterator, List, Sequence
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.player_model import Player
+from app.models.reconciled_balance_model import ReconciledBalance
+from app.repositories.checkpoint_repository import CheckpointRepository
+
+
+def save_reconciled_balances(dialect):
+    stmt = dialect.insert(ReconciledBalance)
+    return stmt.on_conflict_do_update(index_elements=["player_id"], set_={"balance": stmt.excluded.balance})
+
+
+class ReconciliationRepository(CheckpointRepository):
+    """Chunked scans of the ledger, the players and the reconciled balances.
+
+    The scans stream rows through a server-side cursor, so memory is bounded
+    by ``chunk_size`` whatever the size of the table.
+    """
+
+    save_reconciled_balances_stmts = {
+        "postgresql": save_reconciled_balances(postgresql),
+        "sqlite": save_reconciled_balances(sqlite),
+    }
+    # Unordered: the sums do not depend on the order rows arrive in, and
+    # PostgreSQL can then read the partitions sequentially.
+    ledger_after = (
+        select(LedgerEntry.id, LedgerEntry.player_id, LedgerEntry.amount)
+        .where(LedgerEntry.id > bindparam("position"))
+    )
+    ledger_in = (
+        select(LedgerEntry.id, LedgerEntry.player_id, LedgerEntry.amount)
+        .where(LedgerEntry.id.in_(bindparam("ids", expanding=True)))
+    )
+    player_balances = select(Player.id, func.coalesce(Player.balance, 0))
+    reconciled_balances = select(ReconciledBalance.player_id, ReconciledBalance.balance)
+
+    async def use_snapshot(self, db: AsyncSession) -> None:
+        """Makes every scan of this transaction see the same committed data
+        (PostgreSQL; SQLite transactions are already serializable)."""
+        if self._dialect(db) == "postgresql":
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+    async def get_entries_in(self, db: AsyncSession, ids: List[int]) -> Sequence:
+        """``(id, player_id, amount)`` of the entries among ``ids`` that exist."""
+        result = await db.execute(self.ledger_in, {"ids": ids})
+        return result.all()
+
+
+    async def _scan(self, db: AsyncSession, stmt, params: dict, chunk_size: int) -> AsyncIterator[Sequence]:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size), params)
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+
+    def scan_ledger(self, db: AsyncSession, position: int, chunk_size: int) -> AsyncIterator[Sequence]:
+        """Chunks of ``(id, player_id, amount)`` of the entries past ``position``."""
+        return self._scan(db, self.ledger_after, {"position": position}, chunk_size)
+
+
+    def scan_player_balances(self, db: AsyncSession, chunk_size: int) -> AsyncIterator[Sequence]:
+        return self._scan(db, self.player_balances, {}, chunk_size)
+
+
+    def scan_reconciled_balances(self, db: AsyncSession, chunk_size: int) -> AsyncIterator[Sequence]:
+        return self._scan(db, self.reconciled_balances, {}, chunk_size)
+
+
+    async def save_reconciled_balances(self, db: AsyncSession, rows: List[dict]) -> None:
+        await db.execute(self.save_reconciled_balances_stmts[self._dialect(db)], rows)
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.models.ggr_rollup_model import GgrRollup
+from app.models.ledger_entry_model import LedgerEntry
+from app.repositories.checkpoint_repository import CheckpointRepository
+
+
+ROLLUP_SUMS = ("bet_sum", "win_sum", "rollback_sum", "bet_count", "win_count", "rollback_count")
+
+
+def add_to_rollups(dialect):
+    """``INSERT ... ON CONFLICT DO UPDATE`` adding the inserted sums to a
+    bucket's existing ones."""
+    stmt = dialect.insert(GgrRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=["granularity", "player_id", "bucket_start"],
+        set_={column: getattr(GgrRollup, column) + getattr(stmt.excluded, column) for column in ROLLUP_SUMS},
+    )
+
+
+class RollupRepository(CheckpointRepository):
+    """Ledger reads and bucket writes of the GGR rollup job, and the report reads."""
+
+    add_to_rollups_stmts = {
+        "postgresql": add_to_rollups(postgresql),
+        "sqlite": add_to_rollups(sqlite),
+    }
+    entry_columns = select(
+        LedgerEntry.id, LedgerEntry.player_id, LedgerEntry.entry_type, LedgerEntry.amount, LedgerEntry.created_at
+    )
+    entries_after = (
+        entry_columns
+        .where(LedgerEntry.id > bindparam("position"))
+        .order_by(LedgerEntry.id)
+        .limit(bindparam("row_limit"))
+    )
+    entries_in = entry_columns.where(LedgerEntry.id.in_(bindparam("ids", expanding=True)))
+    buckets_between = (
+        select(GgrRollup.bucket_start, *(getattr(GgrRollup, column) for column in ROLLUP_SUMS))
+        .where(
+            GgrRollup.granularity == bindparam("granularity"),
+            GgrRollup.player_id == bindparam("player_key"),
+            GgrRollup.bucket_start >= bindparam("start"),
+            GgrRollup.bucket_start < bindparam("end"),
+        )
+        .order_by(GgrRollup.bucket_start)
+    )
+
+    async def get_entries_after(self, db: AsyncSession, position: int, limit: int) -> List[Row]:
+        result = await db.execute(self.entries_after, {"position": position, "row_limit": limit})
+        return result.all()
+
+
+    async def get_entries_in(self, db: AsyncSession, ids: List[int]) -> List[Row]:
+        """The entries among ``ids`` that exist."""
+        result = await db.execute(self.entries_in, {"ids": ids})
+        return result.all()
+
+
+    async def add_to_rollups(self, db: AsyncSession, rows: List[dict]) -> None:
+        await db.execute(self.add_to_rollups_stmts[self._dialect(db)], rows)
+
+
+    async def get_buckets(
+        self, conn: AsyncConnection, granularity: str, player_id: int, start: datetime, end: datetime
+    ) -> List[Row]:
+        result = await conn.execute(
+            self.buckets_between, {"granularity": granularity, "player_key": player_id, "start": start, "end": end}
+        )
+        return result.all()
@@ -1,68 +1,119 @@
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import and_, bindparam, case, false, lambda_stmt, literal, not_, select, true
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transaction_model import Transaction
-from app.schemas.transaction_schema import TransactionCreate
 from app.exceptions.transaction_not_found_exception import TransactionNotFoundException
-import logging
+from app.cache.idempotency_cache import IdempotencyCache, txn_idempotency_cache
+from app import config
+
+
+# A history row is a bet when it only carries a stake; rollbacks only apply to bets.
+is_bet = and_(Transaction.value_bet > 0, Transaction.value_win == 0)
+is_rolled_back = and_(is_bet, Transaction.rolled_back.is_(True))
+history_columns = (
+    Transaction.id,
+    Transaction.txn_uuid,
+    case((is_bet, literal("bet")), else_=literal("win")).label("type"),
+    case((is_bet, Transaction.value_bet), else_=Transaction.value_win).label("value"),
+    case((is_rolled_back, true()), else_=false()).label("rolled_back"),
+)
 
 
 class TransactionRepository:
-    def create_transaction(self, db: Session, transaction: TransactionCreate) -> Transaction:
-        db_transaction = Transaction(**transaction.dict())
-        db.add(db_transaction)
-        db.commit()
-        db.refresh(db_transaction)
-        return db_transaction
-    
 
-    def get_transaction(self, db: Session, transaction_id: int) -> Transaction:
-        db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    transaction_by_uuid = select(Transaction).where(Transaction.txn_uuid == bindparam("uuid"))
+
+    def __init__(self, idempotency_cache: IdempotencyCache = txn_idempotency_cache):
+        self.idempotency_cache = idempotency_cache
+
+    async def get_transaction(self, db: AsyncSession, transaction_id: int) -> Transaction:
+        db_transaction = await db.get(Transaction, transaction_id)
         if not db_transaction:
             raise TransactionNotFoundException(transaction_id)
         return db_transaction
     
 
-    def get_transactions(self, db: Session):
-        return db.query(Transaction).all()
+    def _transactions_page(self, limit: Optional[int], after: Optional[int]):
+        # Plain rows with only the listed columns, no ORM entities.
+        stmt = select(
+            Transaction.id, Transaction.txn_uuid, Transaction.player_id, Transaction.value_bet, Transaction.value_win
+        ).order_by(Transaction.id)
+        if after is not None:
+            stmt = stmt.where(Transaction.id > after)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+
+    async def get_transactions(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> List[Row]:
+        result = await db.execute(self._transactions_page(limit=limit, after=after))
+        return result.all()
+
 
+    async def stream_transactions(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> AsyncIterator[Row]:
+        stmt = self._transactions_page(limit=limit, after=after).execution_options(yield_per=config.STREAM_YIELD_PER)
+        result = await db.stream(stmt)
+        async for transaction in result:
+            yield transaction
 
-    def delete_transaction(self, db: Session, transaction_id: int) -> Transaction:
-        db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+
+    async def delete_transaction(self, db: AsyncSession, transaction_id: int) -> Transaction:
+        db_transaction = await db.get(Transaction, transaction_id)
         if not db_transaction:
             raise TransactionNotFoundException(transaction_id)
-        db.delete(db_transaction)
-        db.commit()
+        await db.delete(db_transaction)
+        await db.commit()
+        self.idempotency_cache.forget(db_transaction.txn_uuid)
         return db_transaction
     
     
-    def get_transaction_by_uuid(self, db: Session, txn_uuid: str) -> Transaction:
-        return db.query(Transaction).filter(Transaction.txn_uuid == txn_uuid).first()
-
-
-    def mark_transaction_rolled_back(self, db: Session, txn_uuid: str) -> Transaction:
-        db_transaction = self.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)
-        db_transaction.rolled_back = True
-        try:
-            db.commit()
-            db.refresh(db_transaction)
-        except Exception as e:
-            logging.error(f"Failed to set 'rolled_back' status to txn_uuid: {txn_uuid}")
-            db.rollback()
-            raise e
-        return db_transaction
-    
-    def create_transaction_marked_rolledback(self, db: Session, transaction: Transaction) -> Transaction:
-        db_transaction = Transaction(**transaction.dict())
-        db_transaction.rolled_back = True
-        try:
-            db.commit()
-            db.add(db_transaction)
-            db.commit()
-            db.refresh(db_transaction)
-        except Exception as e:
-            logging.error(f"Failed to set 'rolled_back' status to txn_uuid: {transaction.txn_uuid}")
-            db.rollback()
-            raise e
-        return db_transaction
+    async def get_transaction_by_uuid(self, db: AsyncSession, txn_uuid: str) -> Transaction:
+        result = await db.execute(self.transaction_by_uuid, {"uuid": txn_uuid})
+        return result.scalars().first()
+
+
+    async def get_player_history(
+        self,
+        db: AsyncSession,
+        player_id: int,
+        limit: int,
+        after: Optional[int] = None,
+        descending: bool = False,
+        type: Optional[str] = None,
+        rolled_back: Optional[bool] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ):
+        """Reads one keyset page of a player's history, classified in SQL.
+
+        The ``(player_id, id DESC)`` index serves both orders. The query is a
+        lambda statement: each combination of filters is analysed and
+        compiled once, later calls only bind the new values.
+        """
+        stmt = lambda_stmt(lambda: select(*history_columns).where(Transaction.player_id == player_id))
+
+        if after is not None:
+            if descending:
+                stmt += lambda s: s.where(Transaction.id < after)
+            else:
+                stmt += lambda s: s.where(Transaction.id > after)
+        if min_id is not None:
+            stmt += lambda s: s.where(Transaction.id >= min_id)
+        if max_id is not None:
+            stmt += lambda s: s.where(Transaction.id <= max_id)
+        if type == "bet":
+            stmt += lambda s: s.where(is_bet)
+        elif type == "win":
+            stmt += lambda s: s.where(not_(is_bet))
+        if rolled_back is True:
+            stmt += lambda s: s.where(is_rolled_back)
+        elif rolled_back is False:
+            stmt += lambda s: s.where(not_(is_rolled_back))
 
-    def get_transactions_by_player_id(self, db: Session, player_id: int):
-        return db.query(Transaction).filter(Transaction.player_id == player_id).all()
+        if descending:
+            stmt += lambda s: s.order_by(Transaction.id.desc()).limit(limit)
+        else:
+            stmt += lambda s: s.order_by(Transaction.id).limit(limit)
+        result = await db.execute(stmt)
+        return result.all()
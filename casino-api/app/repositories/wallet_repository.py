@@ -0,0 +1,227 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.player_model import Player
+from app.models.transaction_model import Transaction
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.player_stats_model import STATS_METRICS, PlayerStats
+
+
+def insert_ignoring_conflicts(db: AsyncSession, table, index_elements):
+    """Builds an ``INSERT ... ON CONFLICT DO NOTHING`` for the session's dialect."""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def add_to_player_stats(dialect):
+    """``INSERT ... ON CONFLICT DO UPDATE`` adding the inserted values to a
+    player's existing totals."""
+    stmt = dialect.insert(PlayerStats)
+    return stmt.on_conflict_do_update(
+        index_elements=["player_id"],
+        set_={metric: getattr(PlayerStats, metric) + getattr(stmt.excluded, metric) for metric in STATS_METRICS},
+    )
+
+
+
+class WalletRepository:
+    """Single-statement balance and ledger writes used by the wallet operations.
+
+    None of these methods commit: the caller owns the transaction so a bet,
+    win or rollback is applied as one unit of work. Amounts and balances are
+    integer minor units.
+
+    The per-operation statements are built once with bound parameters, so a
+    call skips statement construction and cache key generation and reuses
+    the compiled SQL (and, on asyncpg, the server-side prepared statement).
+    """
+
+    debit_stmt = (
+        update(Player)
+        .where(Player.id == bindparam("player_key"), Player.balance >= bindparam("amount"))
+        .values(balance=Player.balance - bindparam("amount"), version=Player.version + 1)
+        .returning(Player.balance)
+        .execution_options(synchronize_session=False)
+    )
+    credit_stmt = (
+        update(Player)
+        .where(Player.id == bindparam("player_key"))
+        .values(balance=Player.balance + bindparam("amount"), version=Player.version + 1)
+        .returning(Player.balance)
+        .execution_options(synchronize_session=False)
+    )
+    balance_version_stmt = select(Player.balance, Player.version).where(Player.id == bindparam("player_key"))
+    balance_version_for_update_stmt = balance_version_stmt.with_for_update()
+    set_balance_stmt = (
+        update(Player)
+        .where(Player.id == bindparam("player_key"))
+        .values(balance=bindparam("new_balance"), version=Player.version + 1)
+        .returning(Player.balance)
+        .execution_options(synchronize_session=False)
+    )
+    set_balance_if_version_stmt = set_balance_stmt.where(Player.version == bindparam("expected_version"))
+    mark_rolled_back_stmt = (
+        update(Transaction)
+        .where(Transaction.txn_uuid == bindparam("uuid"), Transaction.rolled_back.is_not(True))
+        .values(rolled_back=True)
+        .returning(Transaction.player_id, Transaction.value_bet)
+        .execution_options(synchronize_session=False)
+    )
+    transaction_id_stmt = select(Transaction.id).where(Transaction.txn_uuid == bindparam("uuid"))
+    transaction_players_stmt = select(Transaction.player_id).where(
+        Transaction.txn_uuid.in_(bindparam("uuids", expanding=True))
+    )
+    player_balance_stmt = select(Player.balance).where(Player.id == bindparam("player_key"))
+    # The inserted columns come from the parameters passed at execution.
+    insert_transaction_stmts = {
+        "postgresql": postgresql.insert(Transaction).on_conflict_do_nothing(index_elements=["txn_uuid"]).returning(Transaction.id),
+        "sqlite": sqlite.insert(Transaction).on_conflict_do_nothing(index_elements=["txn_uuid"]).returning(Transaction.id),
+    }
+    add_to_player_stats_stmts = {
+        "postgresql": add_to_player_stats(postgresql),
+        "sqlite": add_to_player_stats(sqlite),
+    }
+
+    async def debit_player(self, db: AsyncSession, player_id: int, amount: int) -> Optional[int]:
+        result = await db.execute(self.debit_stmt, {"player_key": player_id, "amount": amount})
+        return result.scalar_one_or_none()
+
+
+    async def credit_player(self, db: AsyncSession, player_id: int, amount: int) -> Optional[int]:
+        result = await db.execute(self.credit_stmt, {"player_key": player_id, "amount": amount})
+        return result.scalar_one_or_none()
+
+
+    async def get_player_balance_version(
+        self, db: AsyncSession, player_id: int, for_update: bool = False
+    ) -> Optional[Tuple[int, int]]:
+        stmt = self.balance_version_for_update_stmt if for_update else self.balance_version_stmt
+        result = await db.execute(stmt, {"player_key": player_id})
+        return result.one_or_none()
+
+
+    async def set_player_balance(
+        self, db: AsyncSession, player_id: int, balance: int, expected_version: Optional[int] = None
+    ) -> Optional[int]:
+        """Writes a balance computed by the caller.
+
+        With ``expected_version`` the write only happens if nobody changed the
+        player since it was read; None is returned otherwise.
+        """
+        params = {"player_key": player_id, "new_balance": balance}
+        stmt = self.set_balance_stmt
+        if expected_version is not None:
+            params["expected_version"] = expected_version
+            stmt = self.set_balance_if_version_stmt
+        result = await db.execute(stmt, params)
+        return result.scalar_one_or_none()
+
+
+    async def insert_transaction(self, db: AsyncSession, values: dict) -> Optional[int]:
+        stmt = self.insert_transaction_stmts["postgresql" if db.bind.dialect.name == "postgresql" else "sqlite"]
+        result = await db.execute(stmt, values)
+        return result.scalar_one_or_none()
+
+
+    async def insert_ledger_entries(self, db: AsyncSession, entries: List[dict]) -> None:
+        await db.execute(insert(LedgerEntry), entries)
+
+
+    async def add_player_stats(self, db: AsyncSession, rows: List[dict]) -> None:
+        """Adds one row of totals per player to ``player_stats``, creating
+        the rows of players seen for the first time."""
+        stmt = self.add_to_player_stats_stmts["postgresql" if db.bind.dialect.name == "postgresql" else "sqlite"]
+        await db.execute(stmt, rows)
+
+
+    async def mark_rolled_back(self, db: AsyncSession, txn_uuid: str) -> Optional[Tuple[int, int]]:
+        result = await db.execute(self.mark_rolled_back_stmt, {"uuid": txn_uuid})
+        return result.one_or_none()
+
+
+    async def get_transaction_id(self, db: AsyncSession, txn_uuid: str) -> Optional[int]:
+        result = await db.execute(self.transaction_id_stmt, {"uuid": txn_uuid})
+        return result.scalar_one_or_none()
+
+
+    async def get_transaction_players(self, db: AsyncSession, txn_uuids: List[str]) -> List[int]:
+        """Players of the stored transactions among ``txn_uuids``."""
+        result = await db.execute(self.transaction_players_stmt, {"uuids": txn_uuids})
+        return result.scalars().all()
+
+
+    async def get_player_balance(self, db: AsyncSession, player_id: int) -> Optional[int]:
+        result = await db.execute(self.player_balance_stmt, {"player_key": player_id})
+        return result.scalar_one_or_none()
+
+
+    async def lock_players(self, db: AsyncSession, player_ids: Iterable[int]) -> Dict[int, int]:
+        """Locks the players in id order, so concurrent batches cannot deadlock."""
+        stmt = (
+            select(Player.id, Player.balance)
+            .where(Player.id.in_(set(player_ids)))
+            .order_by(Player.id)
+            .with_for_update()
+        )
+        result = await db.execute(stmt)
+        return {player_id: balance for player_id, balance in result.all()}
+
+
+    async def lock_transactions(self, db: AsyncSession, txn_uuids: Iterable[str]):
+        stmt = (
+            select(
+                Transaction.id,
+                Transaction.txn_uuid,
+                Transaction.player_id,
+                Transaction.value_bet,
+                Transaction.rolled_back,
+            )
+            .where(Transaction.txn_uuid.in_(set(txn_uuids)))
+            .order_by(Transaction.id)
+            .with_for_update()
+        )
+        result = await db.execute(stmt)
+        return result.all()
+
+
+    async def insert_transactions(self, db: AsyncSession, rows: List[dict]) -> Dict[str, int]:
+        """Inserts all rows in one statement and maps each stored txn_uuid to its id.
+
+        Rows whose txn_uuid already exists are skipped and missing from the result.
+        """
+        stmt = (
+            insert_ignoring_conflicts(db, Transaction, ["txn_uuid"])
+            .values(rows)
+            .returning(Transaction.id, Transaction.txn_uuid)
+        )
+        result = await db.execute(stmt)
+        return {txn_uuid: transaction_id for transaction_id, txn_uuid in result.all()}
+
+
+    async def mark_many_rolled_back(self, db: AsyncSession, txn_uuids: Iterable[str]) -> Set[str]:
+        stmt = (
+            update(Transaction)
+            .where(Transaction.txn_uuid.in_(set(txn_uuids)), Transaction.rolled_back.is_not(True))
+            .values(rolled_back=True)
+            .returning(Transaction.txn_uuid)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        return set(result.scalars().all())
+
+
+    async def apply_balance_deltas(self, db: AsyncSession, deltas: Dict[int, int]) -> Dict[int, int]:
+        """Adds each player's net change in a single grouped ``UPDATE``."""
+        stmt = (
+            update(Player)
+            .where(Player.id.in_(deltas.keys()))
+            .values(
+                balance=Player.balance + case(deltas, value=Player.id, else_=0),
+                version=Player.version + 1,
+            )
+            .returning(Player.id, Player.balance)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        return {player_id: balance for player_id, balance in result.all()}
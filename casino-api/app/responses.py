@@ -0,0 +1,18 @@
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class ModelResponse(ORJSONResponse):
+    """Encodes a response model the route built from trusted values.
+
+    Returned as is, FastAPI would validate the model against the route's
+    ``response_model`` a second time and run it through ``jsonable_encoder``
+    before encoding; here it is dumped once and encoded by orjson. Routes
+    keep their ``response_model`` for the OpenAPI schema.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        return orjson.dumps(content)
@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+
+def as_utc(moment: datetime) -> datetime:
+    """SQLite hands back naive UTC timestamps, PostgreSQL aware ones."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    moment = as_utc(moment).replace(second=0, microsecond=0)
+    if granularity == "minute":
+        return moment
+    moment = moment.replace(minute=0)
+    if granularity == "hour":
+        return moment
+    return moment.replace(hour=0)
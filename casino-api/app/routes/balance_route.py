@@ -1,26 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from app.db import get_db_session
-from app.services.player_service import PlayerService
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.db import get_read_db_connection
+from app.services.balance_service import BalanceService
 from app.schemas.player_schema import PlayerResponse
 from app.exceptions.player_not_found_exception import PlayerNotFoundException
-from app.repositories.player_repository import PlayerRepository
+from app.container import get_balance_service
 
 router = APIRouter()
 
-def get_player_service(db: Session = Depends(get_db_session)) -> PlayerService:
-    return PlayerService(PlayerRepository())
-
-player_service = get_player_service()
-
 
 @router.get("", response_model=PlayerResponse, tags=["balance"])
-def get_balance(player: int = Query(..., description="Player ID")):
-    db = next(get_db_session())
+async def get_balance(
+    player: int = Query(..., description="Player ID"),
+    conn: AsyncConnection = Depends(get_read_db_connection),
+    balance_service: BalanceService = Depends(get_balance_service),
+):
     try:
-        player = player_service.get_player(db=db, player_id=player)
+        content = await balance_service.get_balance_json(conn=conn, player_id=player)
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
-    finally:
-        db.close()
-    return PlayerResponse(id=player.id, name=player.name, balance=player.balance)
\ No newline at end of file
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,72 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.db import engine, read_engine
+from app.cache.balance_cache import player_balance_cache
+from app.cache.idempotency_cache import txn_idempotency_cache
+from app.metrics import registry
+from app.container import get_container
+from app.startup import startup_timings
+from app.schemas.metrics_schema import (
+    DbPoolMetricsResponse,
+    BalanceCacheMetricsResponse,
+    IdempotencyMetricsResponse,
+    GroupCommitMetricsResponse,
+    StartupMetricsResponse,
+)
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry.register_collector(
+    "db_pool", "Database connection pool usage.", ("pool",),
+    lambda: {("write",): engine.pool.metrics(), ("read",): read_engine.pool.metrics()},
+)
+registry.register_collector(
+    "balance_cache", "Balance cache usage.", (), lambda: {(): player_balance_cache.metrics()}
+)
+registry.register_collector(
+    "idempotency_cache", "Idempotency cache and bloom filter usage.", (), lambda: {(): txn_idempotency_cache.metrics()}
+)
+registry.register_collector(
+    "group_commit", "Group commit writer activity.", (), lambda: {(): get_container().wallet_writer.metrics()}
+)
+registry.register_collector(
+    "app_startup", "Import and startup time of this worker.", (), lambda: {(): startup_timings.metrics()}
+)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+
+@router.get("/db-pool", response_model=DbPoolMetricsResponse)
+async def get_db_pool_metrics():
+    return DbPoolMetricsResponse(**engine.pool.metrics())
+
+
+@router.get("/db-pool/read", response_model=DbPoolMetricsResponse)
+async def get_read_db_pool_metrics():
+    return DbPoolMetricsResponse(**read_engine.pool.metrics())
+
+
+@router.get("/balance-cache", response_model=BalanceCacheMetricsResponse)
+async def get_balance_cache_metrics():
+    return BalanceCacheMetricsResponse(**player_balance_cache.metrics())
+
+
+@router.get("/idempotency", response_model=IdempotencyMetricsResponse)
+async def get_idempotency_metrics():
+    return IdempotencyMetricsResponse(**txn_idempotency_cache.metrics())
+
+
+@router.get("/group-commit", response_model=GroupCommitMetricsResponse)
+async def get_group_commit_metrics():
+    return GroupCommitMetricsResponse(**get_container().wallet_writer.metrics())
+
+
+@router.get("/startup", response_model=StartupMetricsResponse)
+async def get_startup_metrics():
+    return StartupMetricsResponse(**startup_timings.metrics())
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
+from app import config
 from app.db import get_db_session
 from app.services.player_service import PlayerService
 from app.schemas.player_schema import PlayerCreate
@@ -10,93 +12,177 @@ from app.schemas.player_schema import (
     PlayerResponse, 
     PlayersResponse, 
     PlayerUpdateResponse, 
-    PlayerUpdateRequest
+    PlayerUpdateRequest,
+    PlayerStatsResponse,
+    LeaderboardResponse,
+    PlayerImportResponse,
 )
-from app.repositories.player_repository import PlayerRepository
-from app.repositories.transaction_repository import TransactionRepository
+from app.schemas.transaction_schema import PlayerHistoryResponse
 from app.services.transaction_service import TransactionService
+from app.services.player_stats_service import PlayerStatsService
+from app.services.player_bulk_service import PlayerBulkService
+from app.exceptions.invalid_import_file_exception import InvalidImportFileException
+from app.models.player_stats_model import STATS_METRICS
+from app.container import get_player_bulk_service, get_player_service, get_player_stats_service, get_transaction_service
+from app.money import to_minor_units
+from app.responses import ModelResponse
 
 
 router = APIRouter()
 
-def get_player_service(db: Session = Depends(get_db_session)) -> PlayerService:
-    return PlayerService(PlayerRepository())
-
-def get_transaction_service(db: Session = Depends(get_db_session)) -> TransactionService:
-    return TransactionService(TransactionRepository())
-
-player_service = get_player_service()
-transaction_service = get_transaction_service()
-
 
 @router.post("", response_model=PlayerResponse, status_code=201)
-def create_player(player: PlayerCreate, db: Session = Depends(get_db_session)):
+async def create_player(
+    player: PlayerCreate,
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+):
     try:
-        if player.balance < 0:
+        if to_minor_units(player.balance) < 0:
             raise InvalidBalanceException(balance=player.balance)
-        return player_service.create_player(db=db, player=player)
+        return await player_service.create_player(db=db, player=player)
     except InvalidBalanceException as e:
         raise HTTPException(status_code=e.status_code, detail=(str(e.detail)))
 
 
 @router.get("", response_model=PlayersResponse)
-def read_players(db: Session = Depends(get_db_session)):
-    players = player_service.get_players(db=db)
-    return PlayersResponse(players=players)
+async def read_players(
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX, description="Page size; NDJSON streams everything when omitted"),
+    after: Optional[int] = Query(None, description="Return players with an id greater than this cursor"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+):
+    if format == "ndjson":
+        return StreamingResponse(
+            player_service.stream_players(db=db, limit=limit, after=after),
+            media_type="application/x-ndjson",
+        )
+
+    content = await player_service.get_players_json(db=db, limit=limit or config.PAGE_SIZE_DEFAULT, after=after)
+    return Response(content=content, media_type="application/json")
+
+
+@router.post("/import", response_model=PlayerImportResponse)
+async def import_players(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="CSV with a name,balance header, or NDJSON objects"),
+    db: AsyncSession = Depends(get_db_session),
+    player_bulk_service: PlayerBulkService = Depends(get_player_bulk_service),
+):
+    try:
+        report = await player_bulk_service.import_players(db=db, chunks=request.stream(), format=format)
+    except InvalidImportFileException as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+    return ModelResponse(report)
+
+
+@router.get("/export")
+async def export_players(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db_session),
+    player_bulk_service: PlayerBulkService = Depends(get_player_bulk_service),
+):
+    return StreamingResponse(
+        player_bulk_service.export_players(db=db, format=format),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+    )
+
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def read_leaderboard(
+    metric: str = Query("net_ggr", pattern=f"^({'|'.join(STATS_METRICS)})$"),
+    limit: int = Query(10, ge=1, le=config.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_db_session),
+    player_stats_service: PlayerStatsService = Depends(get_player_stats_service),
+):
+    return ModelResponse(await player_stats_service.get_leaderboard(db=db, metric=metric, limit=limit))
 
 
 @router.get("/{player_id}", response_model=PlayerResponse)
-def read_player(player_id: int, db: Session = Depends(get_db_session)):
+async def read_player(
+    player_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+):
     try:
-        return player_service.get_player(db=db, player_id=player_id)
+        return ModelResponse(await player_service.get_player(db=db, player_id=player_id))
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
 
 
 @router.delete("/{player_id}", response_model=PlayerResponse)
-def delete_player(player_id: int, db: Session = Depends(get_db_session)):
+async def delete_player(
+    player_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+):
     try:
-        return player_service.delete_player(db=db, player_id=player_id)
+        return await player_service.delete_player(db=db, player_id=player_id)
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     
 
 @router.put("/{player_id}", response_model=PlayerUpdateResponse)
-def update_player(player_id: int, player: PlayerUpdateRequest, db: Session = Depends(get_db_session)):
-    player_service = get_player_service(db)
+async def update_player(
+    player_id: int,
+    player: PlayerUpdateRequest,
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+):
     try:
-        updated_player = player_service.update_player(db=db, player_id=player_id, player=player)
+        updated_player = await player_service.update_player(db=db, player_id=player_id, player=player)
         return updated_player
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     
 
-@router.get("/{player_id}/history")
-def get_player_transaction_history(player_id: int, db: Session = Depends(get_db_session)):
-    transaction_service = get_transaction_service(db)
-    player_service = get_player_service(db)
-    
+@router.get("/{player_id}/stats", response_model=PlayerStatsResponse)
+async def read_player_stats(
+    player_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    player_stats_service: PlayerStatsService = Depends(get_player_stats_service),
+):
     try:
-        player = player_service.get_player(db=db, player_id=player_id)
+        return ModelResponse(await player_stats_service.get_player_stats(db=db, player_id=player_id))
+    except PlayerNotFoundException as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+
+
+@router.get("/{player_id}/history", response_model=PlayerHistoryResponse)
+async def get_player_transaction_history(
+    player_id: int,
+    limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX),
+    after: Optional[int] = Query(None, description="Return entries past this id in the requested order"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    type: Optional[str] = Query(None, pattern="^(bet|win)$"),
+    rolled_back: Optional[bool] = Query(None),
+    min_id: Optional[int] = Query(None),
+    max_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_db_session),
+    player_service: PlayerService = Depends(get_player_service),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    try:
+        player = await player_service.get_player(db=db, player_id=player_id)
         if player is None:
             raise PlayerNotFoundException(player_id=player_id)
         
-        transactions_by_player_id = transaction_service.get_transactions_by_player_id(db=db, player_id=player_id)
-        
-        history = []
-        for transaction in transactions_by_player_id:
-            history.append({
-                "txn_uuid": transaction.txn_uuid,
-                "type": "bet" if transaction.value_bet > 0 and transaction.value_win == 0 else "win",
-                "value": transaction.value_bet if transaction.value_bet > 0 and transaction.value_win == 0 else transaction.value_win,
-                "rolled_back": transaction.rolled_back if transaction.value_bet > 0 and transaction.value_win == 0 else False
-            })
+        history = await transaction_service.get_player_history(
+            db=db,
+            player_id=player_id,
+            limit=limit,
+            after=after,
+            descending=order == "desc",
+            type=type,
+            rolled_back=rolled_back,
+            min_id=min_id,
+            max_id=max_id,
+        )
+        next_after = history[-1].id if len(history) == limit else None
         
-        return {
-            "player": player_id,
-            "history": history
-        }
+        return ModelResponse(PlayerHistoryResponse(player=player_id, history=history, next_after=next_after))
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal Server Error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal Server Error")
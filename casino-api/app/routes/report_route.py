@@ -0,0 +1,31 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import Optional
+from app.db import get_read_db_connection
+from app.services.report_service import ReportService
+from app.schemas.report_schema import GgrReportResponse
+from app.exceptions.invalid_report_range_exception import InvalidReportRangeException
+from app.models.ggr_rollup_model import GRANULARITIES
+from app.container import get_report_service
+from app.responses import ModelResponse
+
+router = APIRouter()
+
+
+@router.get("/ggr", response_model=GgrReportResponse)
+async def get_ggr_report(
+    start: datetime = Query(..., alias="from", description="Start of the first bucket, ISO 8601"),
+    end: datetime = Query(..., alias="to", description="End of the report, exclusive"),
+    granularity: str = Query("hour", pattern=f"^({'|'.join(GRANULARITIES)})$"),
+    player_id: Optional[int] = Query(None, ge=1, description="Report on one player instead of all of them"),
+    conn: AsyncConnection = Depends(get_read_db_connection),
+    report_service: ReportService = Depends(get_report_service),
+):
+    try:
+        report = await report_service.get_ggr_report(
+            conn=conn, start=start, end=end, granularity=granularity, player_id=player_id
+        )
+    except InvalidReportRangeException as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+    return ModelResponse(report)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
+from app import config
 from app.schemas.transaction_schema import (
     TransactionCreate, 
     TransactionResponse, 
@@ -8,99 +10,110 @@ from app.schemas.transaction_schema import (
     TransactionBalanceResponse,
     TransactionWin,
     TransactionCancelled,
-    TransactionBalanceUpdate
+    TransactionBalanceUpdate,
+    TransactionBatchOperation,
+    TransactionBatchRequest,
+    TransactionBatchResponse,
+    TransactionBatchResult,
 )
-from app.schemas.player_schema import PlayerUpdateRequest
 from app.services.transaction_service import TransactionService
-from app.repositories.transaction_repository import TransactionRepository
-from app.repositories.player_repository import PlayerRepository
-from app.services.player_service import PlayerService
+from app.services.wallet_service import WalletService
+from app.services.wallet_writer import WalletWriter
+from app.container import get_transaction_service, get_wallet_service, get_wallet_writer
 from app.db import get_db_session
+from app.money import to_major_units, to_minor_units
+from app.responses import ModelResponse
 from app.exceptions.transaction_not_found_exception import TransactionNotFoundException
 from app.exceptions.player_not_found_exception import PlayerNotFoundException
 from app.exceptions.invalid_bet_exception import InvalidBetException
 from app.exceptions.invalid_win_exception import InvalidWinException
 from app.exceptions.already_cancelled_exception import AlreadyCancelledException
+from app.exceptions.insufficient_balance_exception import InsufficientBalanceException
+from app.exceptions.rollback_stored_exception import RollbackStoredException
 from fastapi import HTTPException
 
 
 router = APIRouter()
 
 
-def get_transaction_service(db: Session = Depends(get_db_session)) -> TransactionService:
-    return TransactionService(TransactionRepository())
-
-def get_player_service(db: Session = Depends(get_db_session)) -> PlayerService:
-    return PlayerService(PlayerRepository())
-
-
-transaction_service = get_transaction_service()
-player_service = get_player_service()
+async def submit_to_wallet_writer(wallet_writer: WalletWriter, operation: TransactionBatchOperation) -> TransactionBatchResult:
+    """Group-commits one operation and fails like the direct call would."""
+    result = await wallet_writer.submit(operation)
+    if result.status_code != 200:
+        raise HTTPException(status_code=result.status_code, detail=result.detail)
+    return result
 
 
 @router.post("/bet", response_model=TransactionBalanceResponse, status_code=200)
-def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db_session)):
-    if transaction.value_bet < 0:
+async def create_transaction(
+    transaction: TransactionCreate,
+    db: AsyncSession = Depends(get_db_session),
+    wallet_service: WalletService = Depends(get_wallet_service),
+    wallet_writer: WalletWriter = Depends(get_wallet_writer),
+):
+    if to_minor_units(transaction.value_bet) < 0:
         raise InvalidBetException(value_bet=transaction.value_bet)
 
-    transaction_service = get_transaction_service(db)
-    player_service = get_player_service(db)
-
-    existing_transaction = transaction_service.get_transaction_by_uuid(db, transaction.txn_uuid)
-    existing_player = player_service.get_player(db=db, player_id=transaction.player_id)
-
-    if existing_transaction:
-        return TransactionBalanceResponse(
-            id=existing_transaction.id,
-            player_id=existing_player.id,
-            balance=existing_player.balance,
-            txn_uuid=existing_transaction.txn_uuid
-        )
+    if config.WALLET_GROUP_COMMIT:
+        result = await submit_to_wallet_writer(wallet_writer, TransactionBatchOperation(type="bet", **transaction.model_dump()))
+        return ModelResponse(TransactionBalanceResponse(
+            id=result.id, player_id=result.player_id, balance=result.balance, txn_uuid=result.txn_uuid
+        ))
 
     try:
-        db_player = player_service.get_player(db, transaction.player_id)
-        if db_player.balance < transaction.value_bet:
-            raise HTTPException(status_code=400, detail="Insufficient balance for this operation.")
-
-        db_player.balance -= transaction.value_bet
-        player_update = PlayerUpdateRequest(name=db_player.name, balance=db_player.balance)
-        player_id = db_player.id
-
-        player_service.update_player(db=db, player_id=player_id, player=player_update)
-
-        db_transaction = transaction_service.create_transaction(db=db, transaction=transaction)
-        return TransactionBalanceResponse(
-            id=db_transaction.id,
-            player_id=player_id,
-            balance=player_update.balance,
-            txn_uuid=db_transaction.txn_uuid
-        )
-    except InvalidBetException as e:
+        return ModelResponse(await wallet_service.bet(db=db, transaction=transaction))
+    except InsufficientBalanceException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
 
 
+@router.post("/batch", response_model=TransactionBatchResponse, status_code=200)
+async def batch_transactions(
+    batch: TransactionBatchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    wallet_service: WalletService = Depends(get_wallet_service),
+):
+    results = await wallet_service.batch(db=db, operations=batch.operations)
+    return ModelResponse(TransactionBatchResponse(results=results))
+
+
 @router.get("", response_model=TransactionsResponse)
-def read_transactions(db: Session = Depends(get_db_session)):
-    transactions = transaction_service.get_transactions(db=db)
-    return TransactionsResponse(transactions=transactions)
+async def read_transactions(
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX, description="Page size; NDJSON streams everything when omitted"),
+    after: Optional[int] = Query(None, description="Return transactions with an id greater than this cursor"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_db_session),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
+    if format == "ndjson":
+        return StreamingResponse(
+            transaction_service.stream_transactions(db=db, limit=limit, after=after),
+            media_type="application/x-ndjson",
+        )
+
+    content = await transaction_service.get_transactions_json(db=db, limit=limit or config.PAGE_SIZE_DEFAULT, after=after)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{txn_uuid}", response_model=TransactionResponse)
-def get_transaction_by_uuid(txn_uuid: str, db: Session = Depends(get_db_session)):
+async def get_transaction_by_uuid(
+    txn_uuid: str,
+    db: AsyncSession = Depends(get_db_session),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
     try:
-        transaction = transaction_service.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)
+        transaction = await transaction_service.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)
         if transaction is None:
             raise TransactionNotFoundException(txn_uuid=txn_uuid)
         
-        return TransactionResponse(
+        return ModelResponse(TransactionResponse(
             id=transaction.id,
             txn_uuid=transaction.txn_uuid,
             player_id=transaction.player_id,
-            value_bet=transaction.value_bet,
-            value_win=transaction.value_win
-        )
+            value_bet=to_major_units(transaction.value_bet),
+            value_win=to_major_units(transaction.value_win)
+        ))
     except TransactionNotFoundException as e:
         raise e
     except Exception as e:
@@ -108,92 +121,61 @@ def get_transaction_by_uuid(txn_uuid: str, db: Session = Depends(get_db_session)
 
 
 @router.delete("/{transaction_id}", response_model=TransactionResponse)
-def delete_transaction(transaction_id: int, db: Session = Depends(get_db_session)):
+async def delete_transaction(
+    transaction_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    transaction_service: TransactionService = Depends(get_transaction_service),
+):
     try:
-        transaction = transaction_service.delete_transaction(db=db, transaction_id=transaction_id)
+        transaction = await transaction_service.delete_transaction(db=db, transaction_id=transaction_id)
         return transaction
     except TransactionNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
         
 
 @router.post("/win", response_model=TransactionBalanceResponse, status_code=200)
-def win_transaction(transaction: TransactionWin, db: Session = Depends(get_db_session)):
-    if transaction.value_win < 0:
+async def win_transaction(
+    transaction: TransactionWin,
+    db: AsyncSession = Depends(get_db_session),
+    wallet_service: WalletService = Depends(get_wallet_service),
+    wallet_writer: WalletWriter = Depends(get_wallet_writer),
+):
+    if to_minor_units(transaction.value_win) < 0:
         raise InvalidWinException(value_win=transaction.value_win)
 
-    transaction_service = get_transaction_service(db)
-    player_service = get_player_service(db)
-
-    existing_transaction = transaction_service.get_transaction_by_uuid(db, transaction.txn_uuid)
-    existing_player = player_service.get_player(db=db, player_id=transaction.player_id)
-
-    if existing_transaction:
-        return TransactionBalanceResponse(
-            id=existing_transaction.id,
-            player_id=existing_player.id,
-            balance=existing_player.balance,
-            txn_uuid=existing_transaction.txn_uuid
-        )
+    if config.WALLET_GROUP_COMMIT:
+        result = await submit_to_wallet_writer(wallet_writer, TransactionBatchOperation(type="win", **transaction.model_dump()))
+        return ModelResponse(TransactionBalanceResponse(
+            id=result.id, player_id=result.player_id, balance=result.balance, txn_uuid=result.txn_uuid
+        ))
 
     try:
-        db_player = player_service.get_player(db, transaction.player_id)
-        db_player.balance += transaction.value_win
-
-        player_update = PlayerUpdateRequest(name=db_player.name, balance=db_player.balance)
-        player_id = db_player.id
-
-        player_service.update_player(db=db, player_id=player_id, player=player_update)
-        db_transaction = transaction_service.create_transaction(db=db, transaction=transaction)
-
-        return TransactionBalanceResponse(
-            id=db_transaction.id,
-            player_id=player_id,
-            balance=player_update.balance,
-            txn_uuid=db_transaction.txn_uuid
-        )
-    except InvalidWinException as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+        return ModelResponse(await wallet_service.win(db=db, transaction=transaction))
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     
 
 @router.post("/rollback", response_model=TransactionBalanceUpdate, status_code=200)
-def rollback_transaction(transaction: TransactionCancelled, db: Session = Depends(get_db_session)):
-    transaction_service = get_transaction_service(db)
-    player_service = get_player_service(db)
-
+async def rollback_transaction(
+    transaction: TransactionCancelled,
+    db: AsyncSession = Depends(get_db_session),
+    wallet_service: WalletService = Depends(get_wallet_service),
+    wallet_writer: WalletWriter = Depends(get_wallet_writer),
+):
     try:
-        if transaction.value_bet == 0.0:
+        if to_minor_units(transaction.value_bet) == 0:
             raise InvalidBetException(value_bet=transaction.value_bet)
 
-        existing_transaction = transaction_service.get_transaction_by_uuid(db, transaction.txn_uuid)
-        if existing_transaction is None:
-            raise TransactionNotFoundException(txn_uuid=transaction.txn_uuid)
-
-        if existing_transaction.rolled_back is True:
-            raise AlreadyCancelledException(txn_uuid=transaction.txn_uuid)
-        
-        db_player = player_service.get_player(db, existing_transaction.player_id)
-        db_player.balance += existing_transaction.value_bet
-
-        player_update = PlayerUpdateRequest(name=db_player.name, balance=db_player.balance)
-        player_id = db_player.id
-
-        player_service.update_player(db=db, player_id=player_id, player=player_update)
-        transaction_service.mark_transaction_rolled_back(db=db, txn_uuid=existing_transaction.txn_uuid)
-
-        return TransactionBalanceUpdate(
-            player_id=player_id,
-            balance=db_player.balance,
-        )
+        if config.WALLET_GROUP_COMMIT:
+            result = await submit_to_wallet_writer(wallet_writer, TransactionBatchOperation(type="rollback", **transaction.model_dump()))
+            return ModelResponse(TransactionBalanceUpdate(player_id=result.player_id, balance=result.balance))
 
+        return ModelResponse(await wallet_service.rollback(db=db, transaction=transaction))
     except InvalidBetException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
-    except TransactionNotFoundException as e:
-        new_transaction = transaction_service.create_transaction_marked_rolledback(db=db, transaction=transaction)
-        raise HTTPException(status_code=e.status_code, detail=f"Transaction not found, but stored with id: {new_transaction.id}")
+    except RollbackStoredException as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     except AlreadyCancelledException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
     except PlayerNotFoundException as e:
         raise HTTPException(status_code=e.status_code, detail=str(e.detail))
-    
\ No newline at end of file
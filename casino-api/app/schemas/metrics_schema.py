@@ -0,0 +1,56 @@
+from pydantic import BaseModel
+
+
+class DbPoolMetricsResponse(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_avg_ms: float
+    checkout_wait_max_ms: float
+
+
+class BalanceCacheMetricsResponse(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    hit_ratio: float
+
+
+class IdempotencyMetricsResponse(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_rate: float
+    bloom_items: int
+    bloom_negatives: int
+    bloom_positives: int
+    false_positives: int
+    false_positive_rate: float
+
+
+class GroupCommitMetricsResponse(BaseModel):
+    enabled: bool
+    queue_depth: int
+    flushes: int
+    failed_flushes: int
+    operations: int
+    batch_size_avg: float
+    batch_size_last: int
+    batch_size_max: int
+    flush_latency_avg_ms: float
+    flush_latency_max_ms: float
+
+
+class StartupMetricsResponse(BaseModel):
+    import_seconds: float
+    startup_seconds: float
+    warmup_seconds: float
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+from app.money import Amount
 
 
 class PlayerResponse(BaseModel):
@@ -9,17 +10,18 @@ class PlayerResponse(BaseModel):
 
 class PlayerCreate(BaseModel):
     name: str
-    balance: float
+    balance: Amount
 
 class PlayersResponse(BaseModel):
     players: List[PlayerResponse]
+    next_after: Optional[int] = None
 
     class Config:
         orm_mode = True
 
 class PlayerUpdateRequest(BaseModel):
     name: str
-    balance: float
+    balance: Amount
 
 
 class PlayerUpdateResponse(BaseModel):
@@ -27,3 +29,38 @@ class PlayerUpdateResponse(BaseModel):
     name: str
     balance: float
 
+
+
+class PlayerStatsResponse(BaseModel):
+    player_id: int
+    total_wagered: float
+    total_won: float
+    bet_count: int
+    net_ggr: float
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player_id: int
+    name: str
+    total_wagered: float
+    total_won: float
+    bet_count: int
+    net_ggr: float
+
+
+class LeaderboardResponse(BaseModel):
+    metric: str
+    players: List[LeaderboardEntry]
+
+
+class PlayerImportError(BaseModel):
+    line: int
+    error: str
+
+
+class PlayerImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    # The first IMPORT_MAX_ERRORS rejected rows.
+    errors: List[PlayerImportError]
@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class GgrBucket(BaseModel):
+    start: datetime
+    bet_sum: float
+    win_sum: float
+    rollback_sum: float
+    bet_count: int
+    win_count: int
+    rollback_count: int
+    ggr: float
+
+
+class GgrReportResponse(BaseModel):
+    granularity: str
+    player_id: Optional[int] = None
+    buckets: List[GgrBucket]
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from app import config
+from app.money import Amount
 
 
 class TransactionCreate(BaseModel):
     player_id: int
-    value_bet: float
+    value_bet: Amount
     txn_uuid: str
 
 class TransactionBalanceResponse(BaseModel):
@@ -25,20 +27,55 @@ class TransactionResponse(BaseModel):
 
 class TransactionsResponse(BaseModel):
     transactions: List[TransactionResponse]
+    next_after: Optional[int] = None
 
     class Config:
         orm_mode = True
 
+class TransactionHistoryItem(BaseModel):
+    id: int
+    txn_uuid: str
+    type: str
+    value: float
+    rolled_back: bool
+
+class PlayerHistoryResponse(BaseModel):
+    player: int
+    history: List[TransactionHistoryItem]
+    next_after: Optional[int] = None
+
 class TransactionWin(BaseModel):
     player_id: int
-    value_win: float
+    value_win: Amount
     txn_uuid: str
 
 class TransactionCancelled(BaseModel):
     txn_uuid: str
     player_id: int
-    value_bet: float
+    value_bet: Amount
 
 class TransactionBalanceUpdate(BaseModel):
     player_id: int
     balance: float
+
+class TransactionBatchOperation(BaseModel):
+    type: Literal["bet", "win", "rollback"]
+    txn_uuid: str
+    player_id: int
+    value_bet: Amount = 0.0
+    value_win: Amount = 0.0
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[TransactionBatchOperation] = Field(..., min_length=1, max_length=config.BATCH_MAX_SIZE)
+
+class TransactionBatchResult(BaseModel):
+    txn_uuid: str
+    type: str
+    status_code: int
+    player_id: int
+    id: Optional[int] = None
+    balance: Optional[float] = None
+    detail: Optional[str] = None
+
+class TransactionBatchResponse(BaseModel):
+    results: List[TransactionBatchResult]
@@ -0,0 +1,76 @@
+"""Production entry point of the API::
+
+    python -m app.server
+
+Runs uvicorn with one worker process per available core, the uvloop event
+loop and the httptools HTTP parser. Worker count, keep-alive, backlog and the
+graceful shutdown timeout come from ``app.config``.
+"""
+import logging
+import math
+import os
+from typing import Optional
+import uvicorn
+from app import config
+
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def cgroup_cpu_limit(path: str = CGROUP_CPU_MAX) -> Optional[int]:
+    """Cores granted by the container's cgroup v2 CPU quota, rounded up, or
+    None when there is no quota."""
+    try:
+        with open(path) as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def available_cores() -> int:
+    """Cores this process may run on, capped by the container's CPU quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cores, limit) if limit is not None else cores
+
+
+def worker_count() -> int:
+    if config.WALLET_CONCURRENCY_MODE == "local_lock":
+        # The per-player locks live in one process; more workers would race.
+        if config.WEB_CONCURRENCY > 1:
+            logging.warning("WALLET_CONCURRENCY_MODE=local_lock serializes writes in one process, starting 1 worker")
+        return 1
+    if config.WEB_CONCURRENCY > 0:
+        return config.WEB_CONCURRENCY
+    return available_cores()
+
+
+def server_options() -> dict:
+    return {
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": worker_count(),
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "proxy_headers": True,
+        "server_header": False,
+        "access_log": False,
+    }
+
+
+def main():
+    uvicorn.run("app.main:app", **server_options())
+
+
+if __name__ == "__main__":
+    main()
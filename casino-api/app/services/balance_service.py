@@ -0,0 +1,28 @@
+import orjson
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.repositories.balance_repository import BalanceRepository
+from app.exceptions.player_not_found_exception import PlayerNotFoundException
+from app.cache.balance_cache import BalanceCache, player_balance_cache
+from app.money import to_major_units
+
+
+class BalanceService:
+
+    def __init__(self, balance_repository: BalanceRepository, balance_cache: BalanceCache = player_balance_cache):
+        self.balance_repository = balance_repository
+        self.balance_cache = balance_cache
+
+    async def get_balance_json(self, conn: AsyncConnection, player_id: int) -> bytes:
+        """Returns the ``PlayerResponse`` body for a player, already encoded."""
+        row = self.balance_cache.get(player_id)
+        if row is None:
+            generation = self.balance_cache.begin_fill(player_id)
+            try:
+                row = await self.balance_repository.get_balance(conn=conn, player_id=player_id)
+            finally:
+                self.balance_cache.fill(player_id, generation, row)
+            if row is None:
+                raise PlayerNotFoundException(player_id)
+        return orjson.dumps(
+            {"id": player_id, "name": row.name, "balance": to_major_units(row.balance)}
+        )
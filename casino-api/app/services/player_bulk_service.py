@@ -0,0 +1,197 @@
+import csv
+import io
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Tuple
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config
+from app.exceptions.invalid_balance_exception import InvalidBalanceException
+from app.exceptions.invalid_import_file_exception import InvalidImportFileException
+from app.money import to_major_units, to_minor_units
+from app.repositories.player_bulk_repository import PlayerBulkRepository
+from app.schemas.player_schema import PlayerCreate, PlayerImportError, PlayerImportResponse
+
+
+BULK_FORMATS = ("csv", "ndjson")
+CSV_COLUMNS = ("id", "name", "balance")
+
+
+async def read_rows(chunks: AsyncIterator[bytes], quoted: bool, max_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Splits a byte stream into rows and yields ``(lines spanned, row)``.
+
+    A row ends at a newline, unless ``quoted`` and the newline falls inside a
+    double-quoted CSV field. At most one partial row is held: one longer than
+    ``max_bytes`` is dropped and yielded as ``None``.
+    """
+    pending = bytearray()
+    lines, quotes, too_long = 1, 0, False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end + 1]
+            if quoted:
+                quotes += piece.count(b'"')
+            if not too_long:
+                pending += piece
+                if len(pending) > max_bytes:
+                    pending.clear()
+                    too_long = True
+            if end < 0:
+                break
+            start = end + 1
+            # A doubled quote inside a field keeps the count even.
+            if quotes % 2:
+                lines += 1
+                continue
+            yield lines, None if too_long else bytes(pending[:-1])
+            pending.clear()
+            lines, quotes, too_long = 1, 0, False
+    if pending or too_long:
+        yield lines, None if too_long else bytes(pending)
+
+
+def validate_player(values) -> Tuple[Optional[Tuple[str, int]], Optional[str]]:
+    """``(name, balance in minor units)`` of a row that POST /players would
+    accept, or the reason it would not."""
+    try:
+        player = PlayerCreate.model_validate(values)
+    except ValidationError as e:
+        error = e.errors()[0]
+        return None, f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+    balance = to_minor_units(player.balance)
+    if balance < 0:
+        return None, str(InvalidBalanceException(balance=player.balance).detail)
+    return (player.name, balance), None
+
+
+def format_balance(balance: int) -> str:
+    """Minor units as a fixed two-decimal amount, e.g. 150 -> "1.50"."""
+    return str(Decimal(balance).scaleb(-2))
+
+
+class PlayerBulkService:
+
+    def __init__(self, player_bulk_repository: PlayerBulkRepository):
+        self.player_bulk_repository = player_bulk_repository
+
+    async def import_players(self, db: AsyncSession, chunks: AsyncIterator[bytes], format: str) -> PlayerImportResponse:
+        """Creates a player per valid row of a CSV (``name,balance`` header) or
+        NDJSON body and reports the rows rejected, with their line numbers.
+
+        Rows are validated and written IMPORT_BATCH_SIZE at a time, each batch
+        in its own transaction, so memory does not grow with the file and a
+        failure keeps the batches already committed.
+        """
+        report = PlayerImportResponse(imported=0, rejected=0, errors=[])
+        batch: List[Tuple[str, int]] = []
+        async for line_number, values, error in self._parse(chunks, format):
+            if error is None:
+                player, error = validate_player(values)
+            if error is not None:
+                report.rejected += 1
+                if len(report.errors) < config.IMPORT_MAX_ERRORS:
+                    report.errors.append(PlayerImportError(line=line_number, error=error))
+                continue
+            batch.append(player)
+            if len(batch) >= config.IMPORT_BATCH_SIZE:
+                await self._write(db, batch, report)
+                batch = []
+        if batch:
+            await self._write(db, batch, report)
+        return report
+
+
+    async def _write(self, db: AsyncSession, batch: List[Tuple[str, int]], report: PlayerImportResponse):
+        await self.player_bulk_repository.insert_players(db=db, players=batch)
+        await db.commit()
+        report.imported += len(batch)
+
+
+    async def _parse(self, chunks: AsyncIterator[bytes], format: str) -> AsyncIterator[Tuple[int, dict, Optional[str]]]:
+        """Yields ``(line number, fields, None)`` per row, or ``(line number,
+        None, error)`` for a row that cannot be read. Blank lines are skipped.
+
+        CSV rows go through a single reader, handed one complete row at a
+        time, so quoted fields may span lines as they do in exports.
+        """
+        header = None
+        rows: List[str] = []
+        reader = csv.reader(iter(lambda: rows.pop() if rows else None, None))
+        next_line_number = 1
+        async for lines, raw in read_rows(chunks, format == "csv", config.IMPORT_MAX_ROW_BYTES):
+            line_number, next_line_number = next_line_number, next_line_number + lines
+            if raw is None:
+                yield line_number, None, f"Row is longer than {config.IMPORT_MAX_ROW_BYTES} bytes."
+                continue
+            try:
+                line = raw.decode("utf-8").rstrip("\r")
+            except UnicodeDecodeError:
+                yield line_number, None, "Line is not valid UTF-8."
+                continue
+            if not line.strip():
+                continue
+            if format == "ndjson":
+                try:
+                    values = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    yield line_number, None, "Line is not valid JSON."
+                    continue
+                if not isinstance(values, dict):
+                    yield line_number, None, "Line is not a JSON object."
+                    continue
+                yield line_number, values, None
+                continue
+            rows.append(line)
+            try:
+                fields = next(reader)
+            except csv.Error:
+                yield line_number, None, "Row is not valid CSV."
+                continue
+            if header is None:
+                # Spreadsheet exports may start with a byte order mark.
+                header = [field.strip().lstrip("\ufeff") for field in fields]
+                if not {"name", "balance"} <= set(header):
+                    raise InvalidImportFileException(detail="The CSV header must name the 'name' and 'balance' columns.")
+                continue
+            if len(fields) != len(header):
+                yield line_number, None, f"Expected {len(header)} fields, found {len(fields)}."
+                continue
+            yield line_number, dict(zip(header, fields)), None
+
+
+    async def export_players(self, db: AsyncSession, format: str) -> AsyncIterator[bytes]:
+        """Yields every player as CSV (``id,name,balance``) or NDJSON.
+
+        Like the NDJSON listing, the stream reuses the request's session after
+        its dependency has exited and closes it when done.
+        """
+        try:
+            if format == "csv" and self.player_bulk_repository.supports_copy(db):
+                async for chunk in self.player_bulk_repository.copy_players_csv(db=db):
+                    yield chunk
+                return
+            if format == "csv":
+                async for chunk in self._csv_chunks(db):
+                    yield chunk
+                return
+            async for player in self.player_bulk_repository.stream_players(db=db):
+                yield orjson.dumps({"id": player.id, "name": player.name, "balance": to_major_units(player.balance)}) + b"\n"
+        finally:
+            await db.close()
+
+
+    async def _csv_chunks(self, db: AsyncSession) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        rows = 0
+        async for player in self.player_bulk_repository.stream_players(db=db):
+            writer.writerow((player.id, player.name, format_balance(player.balance)))
+            rows += 1
+            if rows % config.STREAM_YIELD_PER == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
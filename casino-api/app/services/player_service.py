@@ -1,5 +1,5 @@
 from pydantic import UUID4
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.player_schema import (
     PlayerResponse, 
     PlayerCreate, 
@@ -8,7 +8,9 @@ from app.schemas.player_schema import (
 )
 from app.exceptions.player_not_found_exception import PlayerNotFoundException
 from app.repositories.player_repository import PlayerRepository
-from typing import List
+from app.money import to_major_units
+from typing import AsyncIterator, List, Optional
+import orjson
 
 
 class PlayerService:
@@ -16,33 +18,68 @@ class PlayerService:
     def __init__(self, player_repository: PlayerRepository):
         self.player_repository = player_repository
 
-    def create_player(self, db: Session, player: PlayerCreate) -> PlayerResponse:
-        return self.player_repository.create_player(db=db, player=player)
+    async def create_player(self, db: AsyncSession, player: PlayerCreate) -> PlayerResponse:
+        db_player = await self.player_repository.create_player(db=db, player=player)
+        return self._to_response(db_player)
 
 
-    def get_player(self, db: Session, player_id: int) -> PlayerResponse:
-        player = self.player_repository.get_player(db=db, player_id=player_id)
+    async def get_player(self, db: AsyncSession, player_id: int) -> PlayerResponse:
+        player = await self.player_repository.get_player(db=db, player_id=player_id)
         if not player:
             raise PlayerNotFoundException(player_id)
-        return player
+        return self._to_response(player)
 
 
-    def get_players(self, db: Session) -> List[PlayerResponse]:
-            players = self.player_repository.get_players(db=db)
-            return [PlayerResponse(id=player.id, name=player.name, balance=player.balance) for player in players]
+    async def get_players(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> List[PlayerResponse]:
+            players = await self.player_repository.get_players(db=db, limit=limit, after=after)
+            return [self._to_response(player) for player in players]
+
+
+    async def get_players_json(self, db: AsyncSession, limit: int, after: Optional[int] = None) -> bytes:
+        """Returns the ``PlayersResponse`` body for one page, already encoded.
+
+        The rows are serialized directly, without a response model per player.
+        """
+        players = await self.player_repository.get_players(db=db, limit=limit, after=after)
+        next_after = players[-1].id if len(players) == limit else None
+        return orjson.dumps(
+            {"players": [self._to_dict(player) for player in players], "next_after": next_after}
+        )
+
+
+    async def stream_players(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yields players as NDJSON lines.
+
+        The body is sent after the request's session dependency has exited,
+        so the stream reuses the session on its own and closes it when done.
+        """
+        try:
+            async for player in self.player_repository.stream_players(db=db, limit=limit, after=after):
+                yield orjson.dumps(self._to_dict(player)) + b"\n"
+        finally:
+            await db.close()
     
 
-    def delete_player(self, db: Session, player_id: int) -> PlayerResponse:
-        player = self.player_repository.delete_player(db=db, player_id=player_id)
+    async def delete_player(self, db: AsyncSession, player_id: int) -> PlayerResponse:
+        player = await self.player_repository.delete_player(db=db, player_id=player_id)
         if not player:
             raise PlayerNotFoundException(player_id)
-        return player
+        return self._to_response(player)
        
 
-    def update_player(self, db: Session, player_id: int, player: PlayerUpdateRequest) -> PlayerUpdateResponse:
-        db_player = self.player_repository.get_player(db=db, player_id=player_id)
-        if not db_player:
-            raise PlayerNotFoundException(player_id=player_id)
+    async def update_player(self, db: AsyncSession, player_id: int, player: PlayerUpdateRequest) -> PlayerUpdateResponse:
+        # The repository locks and loads the row itself and raises if it is missing.
+        updated_player = await self.player_repository.update_player(db=db, player_id=player_id, player=player)
+        return PlayerUpdateResponse(
+            id=updated_player.id,
+            name=updated_player.name,
+            balance=to_major_units(updated_player.balance)
+        )
+
+
+    def _to_response(self, player) -> PlayerResponse:
+        return PlayerResponse(id=player.id, name=player.name, balance=to_major_units(player.balance))
+
 
-        updated_player = self.player_repository.update_player(db=db, player_id=player_id, player=player)
-        return updated_player
+    def _to_dict(self, player) -> dict:
+        return {"id": player.id, "name": player.name, "balance": to_major_units(player.balance)}
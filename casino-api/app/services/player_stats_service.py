@@ -0,0 +1,41 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.player_stats_repository import PlayerStatsRepository
+from app.exceptions.player_not_found_exception import PlayerNotFoundException
+from app.money import to_major_units
+from app.schemas.player_schema import LeaderboardEntry, LeaderboardResponse, PlayerStatsResponse
+
+
+class PlayerStatsService:
+
+    def __init__(self, player_stats_repository: PlayerStatsRepository):
+        self.player_stats_repository = player_stats_repository
+
+    async def get_player_stats(self, db: AsyncSession, player_id: int) -> PlayerStatsResponse:
+        row = await self.player_stats_repository.get_player_stats(db=db, player_id=player_id)
+        if row is None:
+            raise PlayerNotFoundException(player_id=player_id)
+        return PlayerStatsResponse(
+            player_id=player_id,
+            total_wagered=to_major_units(row.total_wagered or 0),
+            total_won=to_major_units(row.total_won or 0),
+            bet_count=row.bet_count or 0,
+            net_ggr=to_major_units(row.net_ggr or 0),
+        )
+
+
+    async def get_leaderboard(self, db: AsyncSession, metric: str, limit: int) -> LeaderboardResponse:
+        rows = await self.player_stats_repository.get_leaderboard(db=db, metric=metric, limit=limit)
+        players: List[LeaderboardEntry] = [
+            LeaderboardEntry(
+                rank=rank,
+                player_id=row.player_id,
+                name=row.name,
+                total_wagered=to_major_units(row.total_wagered),
+                total_won=to_major_units(row.total_won),
+                bet_count=row.bet_count,
+                net_ggr=to_major_units(row.net_ggr),
+            )
+            for rank, row in enumerate(rows, start=1)
+        ]
+        return LeaderboardResponse(metric=metric, players=players)
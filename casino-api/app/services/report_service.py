@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app import config
+from app.exceptions.invalid_report_range_exception import InvalidReportRangeException
+from app.models.ggr_rollup_model import ALL_PLAYERS
+from app.money import to_major_units
+from app.repositories.rollup_repository import RollupRepository
+from app.rollups import as_utc, bucket_start
+from app.schemas.report_schema import GgrBucket, GgrReportResponse
+
+
+BUCKET_SIZES = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+class ReportService:
+
+    def __init__(self, rollup_repository: RollupRepository):
+        self.rollup_repository = rollup_repository
+
+    async def get_ggr_report(
+        self, conn: AsyncConnection, start: datetime, end: datetime, granularity: str, player_id: Optional[int] = None
+    ) -> GgrReportResponse:
+        """Buckets starting in ``[start, end)``, ``start`` rounded down to its
+        bucket. Buckets without any bet, win or rollback are left out."""
+        start, end = bucket_start(start, granularity), as_utc(end)
+        if end <= start:
+            raise InvalidReportRangeException(detail="'to' must be later than 'from'.")
+        if (end - start) / BUCKET_SIZES[granularity] > config.REPORT_MAX_BUCKETS:
+            raise InvalidReportRangeException(
+                detail=f"A report spans at most {config.REPORT_MAX_BUCKETS} buckets; use a coarser granularity."
+            )
+
+        rows = await self.rollup_repository.get_buckets(
+            conn=conn, granularity=granularity, player_id=player_id or ALL_PLAYERS, start=start, end=end
+        )
+        buckets = [
+            GgrBucket(
+                start=as_utc(row.bucket_start),
+                bet_sum=to_major_units(row.bet_sum),
+                win_sum=to_major_units(row.win_sum),
+                rollback_sum=to_major_units(row.rollback_sum),
+                bet_count=row.bet_count,
+                win_count=row.win_count,
+                rollback_count=row.rollback_count,
+                ggr=to_major_units(row.bet_sum - row.win_sum - row.rollback_sum),
+            )
+            for row in rows
+        ]
+        return GgrReportResponse(granularity=granularity, player_id=player_id, buckets=buckets)
@@ -1,11 +1,13 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
+import orjson
 from app.repositories.transaction_repository import TransactionRepository
+from app.money import to_major_units
 from app.models.transaction_model import Transaction
 from app.exceptions.transaction_not_found_exception import TransactionNotFoundException
 from app.schemas.transaction_schema import (
-    TransactionCreate,
+    TransactionHistoryItem,
     TransactionResponse,
 )
 
@@ -15,45 +17,100 @@ class TransactionService:
     def __init__(self, transaction_repository: TransactionRepository):
         self.transaction_repository = transaction_repository
 
-    def create_transaction(self, db: Session, transaction: TransactionCreate) -> Transaction:
-        return self.transaction_repository.create_transaction(db=db, transaction=transaction)
-
-
-    def get_transaction(self, db: Session, transaction_id: int) -> Transaction:
-        transaction = self.transaction_repository.get_transaction(db=db, transaction_id=transaction_id)
+    async def get_transaction(self, db: AsyncSession, transaction_id: int) -> Transaction:
+        transaction = await self.transaction_repository.get_transaction(db=db, transaction_id=transaction_id)
         if not transaction:
             raise TransactionNotFoundException(transaction_id)
         return transaction
     
 
-    def get_transactions(self, db: Session) -> List[TransactionResponse]:
-        transactions = self.transaction_repository.get_transactions(db=db)
-        return [TransactionResponse(
-            id=transaction.id, 
-            txn_uuid=transaction.txn_uuid,
-            player_id=transaction.player_id, 
-            value_bet=transaction.value_bet,
-            value_win=transaction.value_win) for transaction in transactions]
+    async def get_transactions(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> List[TransactionResponse]:
+        transactions = await self.transaction_repository.get_transactions(db=db, limit=limit, after=after)
+        return [self._to_response(transaction) for transaction in transactions]
+
+
+    async def get_transactions_json(self, db: AsyncSession, limit: int, after: Optional[int] = None) -> bytes:
+        """Returns the ``TransactionsResponse`` body for one page, already encoded.
+
+        The rows are serialized directly, without a response model per transaction.
+        """
+        transactions = await self.transaction_repository.get_transactions(db=db, limit=limit, after=after)
+        next_after = transactions[-1].id if len(transactions) == limit else None
+        return orjson.dumps(
+            {"transactions": [self._to_dict(transaction) for transaction in transactions], "next_after": next_after}
+        )
+
+
+    async def stream_transactions(self, db: AsyncSession, limit: Optional[int] = None, after: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yields transactions as NDJSON lines.
+
+        The body is sent after the request's session dependency has exited,
+        so the stream reuses the session on its own and closes it when done.
+        """
+        try:
+            async for transaction in self.transaction_repository.stream_transactions(db=db, limit=limit, after=after):
+                yield orjson.dumps(self._to_dict(transaction)) + b"\n"
+        finally:
+            await db.close()
     
 
-    def delete_transaction(self, db: Session, transaction_id: int) -> TransactionResponse:
-        transaction = self.transaction_repository.delete_transaction(db=db, transaction_id=transaction_id)
+    async def delete_transaction(self, db: AsyncSession, transaction_id: int) -> TransactionResponse:
+        transaction = await self.transaction_repository.delete_transaction(db=db, transaction_id=transaction_id)
         if not transaction:
             raise TransactionNotFoundException(transaction_id)
-        return transaction
+        return self._to_response(transaction)
 
 
-    def get_transaction_by_uuid(self, db: Session, txn_uuid: str) -> Transaction:
-        return self.transaction_repository.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)
+    async def get_transaction_by_uuid(self, db: AsyncSession, txn_uuid: str) -> Transaction:
+        return await self.transaction_repository.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)
     
 
-    def mark_transaction_rolled_back(self, db: Session, txn_uuid: str) -> Transaction:
-        return self.transaction_repository.mark_transaction_rolled_back(db=db, txn_uuid=txn_uuid)
-    
-    
-    def create_transaction_marked_rolledback(self, db: Session, transaction: str) -> Transaction:
-        return self.transaction_repository.create_transaction_marked_rolledback(db=db, transaction=transaction)
+    async def get_player_history(
+        self,
+        db: AsyncSession,
+        player_id: int,
+        limit: int,
+        after: Optional[int] = None,
+        descending: bool = False,
+        type: Optional[str] = None,
+        rolled_back: Optional[bool] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+    ) -> List[TransactionHistoryItem]:
+        rows = await self.transaction_repository.get_player_history(
+            db=db,
+            player_id=player_id,
+            limit=limit,
+            after=after,
+            descending=descending,
+            type=type,
+            rolled_back=rolled_back,
+            min_id=min_id,
+            max_id=max_id,
+        )
+        return [TransactionHistoryItem(
+            id=row.id,
+            txn_uuid=row.txn_uuid,
+            type=row.type,
+            value=to_major_units(row.value),
+            rolled_back=row.rolled_back) for row in rows]
 
 
-    def get_transactions_by_player_id(self, db: Session, player_id: int) -> List[Transaction]:
-        return self.transaction_repository.get_transactions_by_player_id(db=db, player_id=player_id)
\ No newline at end of file
+    def _to_dict(self, transaction) -> dict:
+        return {
+            "id": transaction.id,
+            "txn_uuid": transaction.txn_uuid,
+            "player_id": transaction.player_id,
+            "value_bet": to_major_units(transaction.value_bet),
+            "value_win": to_major_units(transaction.value_win),
+        }
+
+
+    def _to_response(self, transaction: Transaction) -> TransactionResponse:
+        return TransactionResponse(
+            id=transaction.id,
+            txn_uuid=transaction.txn_uuid,
+            player_id=transaction.player_id,
+            value_bet=to_major_units(transaction.value_bet),
+            value_win=to_major_units(transaction.value_win)
+        )
@@ -0,0 +1,567 @@
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config
+from app.repositories.wallet_repository import WalletRepository
+from app.player_locks import PlayerLocks, player_locks
+from app.money import to_major_units, to_minor_units
+from app.metrics import wallet_idempotent_replays
+from app.cache.balance_cache import BalanceCache, player_balance_cache
+from app.cache.idempotency_cache import IdempotencyCache, txn_idempotency_cache
+from app.exceptions.player_not_found_exception import PlayerNotFoundException
+from app.exceptions.insufficient_balance_exception import InsufficientBalanceException
+from app.exceptions.already_cancelled_exception import AlreadyCancelledException
+from app.exceptions.rollback_stored_exception import RollbackStoredException
+from app.exceptions.invalid_bet_exception import InvalidBetException
+from app.exceptions.invalid_win_exception import InvalidWinException
+from app.schemas.transaction_schema import (
+    TransactionCreate,
+    TransactionWin,
+    TransactionCancelled,
+    TransactionBalanceResponse,
+    TransactionBalanceUpdate,
+    TransactionBatchOperation,
+    TransactionBatchResult,
+)
+import logging
+
+
+CONCURRENCY_MODES = ("atomic", "row_lock", "optimistic", "local_lock")
+
+
+def ledger_entry(player_id: int, txn_uuid: str, entry_type: str, amount: int, balance: int) -> dict:
+    return {"player_id": player_id, "txn_uuid": txn_uuid, "entry_type": entry_type, "amount": amount, "balance": balance}
+
+
+def player_stats_changes(entries: List[dict]) -> List[dict]:
+    """Sums the ledger entries of bets, wins and rollbacks into one
+    ``player_stats`` change per player, in player id order.
+
+    Only bets of a positive amount are wagers, as in the backfill of
+    migration 005. A rollback refunds ``value_bet``, so the rollback of a win
+    or of a zero bet has a zero amount and changes nothing.
+    """
+    changes: Dict[int, dict] = {}
+    for entry in entries:
+        if entry["entry_type"] in ("bet", "rollback") and entry["amount"] == 0:
+            continue
+        change = changes.get(entry["player_id"])
+        if change is None:
+            change = changes[entry["player_id"]] = {
+                "player_id": entry["player_id"], "total_wagered": 0, "total_won": 0, "bet_count": 0, "net_ggr": 0
+            }
+        amount = entry["amount"]
+        if entry["entry_type"] == "bet":
+            change["total_wagered"] -= amount
+            change["bet_count"] += 1
+            change["net_ggr"] -= amount
+        elif entry["entry_type"] == "win":
+            change["total_won"] += amount
+            change["net_ggr"] -= amount
+        elif entry["entry_type"] == "rollback":
+            change["total_wagered"] -= amount
+            change["bet_count"] -= 1
+            change["net_ggr"] -= amount
+    return [changes[player_id] for player_id in sorted(changes)]
+
+
+class BatchPlan:
+    """Outcome of a batch computed in memory before anything is written.
+
+    ``results`` follow the request order; ``inserts`` holds one row per new
+    txn_uuid, ``rolled_back`` the stored txn_uuids to mark, ``deltas`` the
+    net balance change per player and ``entries`` the ledger entries, all
+    in integer minor units. ``replays`` lists the type of every operation
+    answered from an already stored txn_uuid.
+    """
+
+    def __init__(self):
+        self.results: List[dict] = []
+        self.inserts: Dict[str, dict] = {}
+        self.rolled_back = set()
+        self.deltas: Dict[int, int] = {}
+        self.entries: List[dict] = []
+        self.replays: List[str] = []
+
+    def add(
+        self,
+        operation: TransactionBatchOperation,
+        player_id: int,
+        balance: Optional[int] = None,
+        error: Optional[Exception] = None,
+        stored: bool = False,
+    ):
+        self.results.append({
+            "operation": operation,
+            "player_id": player_id,
+            "balance": balance,
+            "error": error,
+            "stored": stored,
+        })
+
+    def move(self, player_id: int, txn_uuid: str, entry_type: str, amount: int, balance: int):
+        self.deltas[player_id] = self.deltas.get(player_id, 0) + amount
+        self.entries.append(ledger_entry(player_id, txn_uuid, entry_type, amount, balance))
+
+
+class WalletService:
+    """Applies bets, wins and rollbacks as a single database transaction.
+
+    The balance change is a conditional ``UPDATE ... RETURNING`` and the
+    transaction row an ``INSERT ... ON CONFLICT DO NOTHING``, so concurrent
+    requests for the same player cannot overwrite each other and a retried
+    ``txn_uuid`` is detected by the unique constraint instead of a lookup.
+    Recently seen uuids are answered from the idempotency cache.
+
+    ``concurrency_mode`` picks how balance changes are serialized: the
+    default "atomic" update, or a balance computed in Python and guarded by
+    a row lock ("row_lock"), the player's version ("optimistic") or an
+    in-process per-player lock ("local_lock").
+    """
+
+    def __init__(
+        self,
+        wallet_repository: WalletRepository,
+        balance_cache: BalanceCache = player_balance_cache,
+        idempotency_cache: IdempotencyCache = txn_idempotency_cache,
+        concurrency_mode: str = config.WALLET_CONCURRENCY_MODE,
+        player_locks: PlayerLocks = player_locks,
+    ):
+        if concurrency_mode not in CONCURRENCY_MODES:
+            raise ValueError(f"Unknown wallet concurrency mode {concurrency_mode!r}, expected one of {CONCURRENCY_MODES}")
+        self.wallet_repository = wallet_repository
+        self.balance_cache = balance_cache
+        self.idempotency_cache = idempotency_cache
+        self.concurrency_mode = concurrency_mode
+        self.player_locks = player_locks
+
+    async def bet(self, db: AsyncSession, transaction: TransactionCreate) -> TransactionBalanceResponse:
+        async with self._serialized([transaction.player_id]):
+            return await self._bet(db=db, transaction=transaction)
+
+
+    async def win(self, db: AsyncSession, transaction: TransactionWin) -> TransactionBalanceResponse:
+        async with self._serialized([transaction.player_id]):
+            return await self._win(db=db, transaction=transaction)
+
+
+    async def rollback(self, db: AsyncSession, transaction: TransactionCancelled) -> TransactionBalanceUpdate:
+        while True:
+            player_ids = await self._players_to_lock(db=db, player_ids=[transaction.player_id], rollbacks=[transaction.txn_uuid])
+            async with self._serialized(player_ids):
+                result = await self._rollback(db=db, transaction=transaction, locked=player_ids)
+            if result is not None:
+                return result
+
+
+    async def _bet(self, db: AsyncSession, transaction: TransactionCreate) -> TransactionBalanceResponse:
+        try:
+            replay = await self._known_replay(db=db, txn_uuid=transaction.txn_uuid, player_id=transaction.player_id, operation="bet")
+            if replay is not None:
+                return replay
+
+            amount = to_minor_units(transaction.value_bet)
+            balance = await self._debit(db=db, player_id=transaction.player_id, amount=amount)
+            if balance is None:
+                await db.rollback()
+                replay = await self._replay(db=db, txn_uuid=transaction.txn_uuid, player_id=transaction.player_id, operation="bet")
+                if replay is None:
+                    raise InsufficientBalanceException(player_id=transaction.player_id)
+                return replay
+
+            transaction_id = await self.wallet_repository.insert_transaction(
+                db=db, values={"txn_uuid": transaction.txn_uuid, "player_id": transaction.player_id, "value_bet": amount}
+            )
+            if transaction_id is None:
+                await db.rollback()
+                return await self._replay(db=db, txn_uuid=transaction.txn_uuid, player_id=transaction.player_id, operation="bet")
+
+            await self._record(
+                db=db, entries=[ledger_entry(transaction.player_id, transaction.txn_uuid, "bet", -amount, balance)]
+            )
+
+            await db.commit()
+            self.balance_cache.update_balance(transaction.player_id, balance)
+            self.idempotency_cache.remember(transaction.txn_uuid, transaction_id, transaction.player_id, balance)
+        except (PlayerNotFoundException, InsufficientBalanceException) as e:
+            raise e
+        except Exception as e:
+            logging.error(f"Failed to apply bet {transaction.txn_uuid}: {str(e)}")
+            await db.rollback()
+            raise e
+
+        return TransactionBalanceResponse(
+            id=transaction_id,
+            player_id=transaction.player_id,
+            balance=to_major_units(balance),
+            txn_uuid=transaction.txn_uuid
+        )
+
+
+    async def _win(self, db: AsyncSession, transaction: TransactionWin) -> TransactionBalanceResponse:
+        try:
+            replay = await self._known_replay(db=db, txn_uuid=transaction.txn_uuid, player_id=transaction.player_id, operation="win")
+            if replay is not None:
+                return replay
+
+            amount = to_minor_units(transaction.value_win)
+            balance = await self._credit(db=db, player_id=transaction.player_id, amount=amount)
+            if balance is None:
+                await db.rollback()
+                raise PlayerNotFoundException(player_id=transaction.player_id)
+
+            transaction_id = await self.wallet_repository.insert_transaction(
+                db=db, values={"txn_uuid": transaction.txn_uuid, "player_id": transaction.player_id, "value_win": amount}
+            )
+            if transaction_id is None:
+                await db.rollback()
+                return await self._replay(db=db, txn_uuid=transaction.txn_uuid, player_id=transaction.player_id, operation="win")
+
+            await self._record(
+                db=db, entries=[ledger_entry(transaction.player_id, transaction.txn_uuid, "win", amount, balance)]
+            )
+
+            await db.commit()
+            self.balance_cache.update_balance(transaction.player_id, balance)
+            self.idempotency_cache.remember(transaction.txn_uuid, transaction_id, transaction.player_id, balance)
+        except PlayerNotFoundException as e:
+            raise e
+        except Exception as e:
+            logging.error(f"Failed to apply win {transaction.txn_uuid}: {str(e)}")
+            await db.rollback()
+            raise e
+
+        return TransactionBalanceResponse(
+            id=transaction_id,
+            player_id=transaction.player_id,
+            balance=to_major_units(balance),
+            txn_uuid=transaction.txn_uuid
+        )
+
+
+    async def _rollback(
+        self, db: AsyncSession, transaction: TransactionCancelled, locked: List[int]
+    ) -> Optional[TransactionBalanceUpdate]:
+        """Returns None, having written nothing, when local_lock mode holds
+        the wrong lock: the transaction was stored for another player after
+        the caller looked it up."""
+        try:
+            while True:
+                rolled_back = await self.wallet_repository.mark_rolled_back(db=db, txn_uuid=transaction.txn_uuid)
+                if rolled_back is not None:
+                    player_id, value_bet = rolled_back
+                    if self.concurrency_mode == "local_lock" and player_id not in locked:
+                        await db.rollback()
+                        return None
+                    balance = await self._credit(db=db, player_id=player_id, amount=value_bet)
+                    if balance is None:
+                        await db.rollback()
+                        raise PlayerNotFoundException(player_id=player_id)
+                    await self._record(
+                        db=db, entries=[ledger_entry(player_id, transaction.txn_uuid, "rollback", value_bet, balance)]
+                    )
+                    await db.commit()
+                    self.balance_cache.update_balance(player_id, balance)
+                    self.idempotency_cache.forget(transaction.txn_uuid)
+                    return TransactionBalanceUpdate(player_id=player_id, balance=to_major_units(balance))
+
+                if await self.wallet_repository.get_transaction_id(db=db, txn_uuid=transaction.txn_uuid) is not None:
+                    await db.rollback()
+                    raise AlreadyCancelledException(txn_uuid=transaction.txn_uuid)
+
+                values = {
+                    "txn_uuid": transaction.txn_uuid,
+                    "player_id": transaction.player_id,
+                    "value_bet": to_minor_units(transaction.value_bet),
+                    "rolled_back": True,
+                }
+                transaction_id = await self.wallet_repository.insert_transaction(db=db, values=values)
+                if transaction_id is not None:
+                    await db.commit()
+                    self.idempotency_cache.mark_seen(transaction.txn_uuid)
+                    raise RollbackStoredException(transaction_id=transaction_id)
+
+                # The original transaction was stored concurrently, roll it back.
+                await db.rollback()
+        except (PlayerNotFoundException, AlreadyCancelledException, RollbackStoredException) as e:
+            raise e
+        except Exception as e:
+            logging.error(f"Failed to roll back {transaction.txn_uuid}: {str(e)}")
+            await db.rollback()
+            raise e
+
+
+    async def _record(self, db: AsyncSession, entries: List[dict]):
+        """Appends the ledger entries of a change and adds them to the players' stats."""
+        await self.wallet_repository.insert_ledger_entries(db=db, entries=entries)
+        changes = player_stats_changes(entries)
+        if changes:
+            await self.wallet_repository.add_player_stats(db=db, rows=changes)
+
+
+    def _serialized(self, player_ids: Iterable[int]):
+        if self.concurrency_mode == "local_lock":
+            return self.player_locks.hold(player_ids)
+        return nullcontext()
+
+
+    async def _players_to_lock(self, db: AsyncSession, player_ids: List[int], rollbacks: List[str]) -> List[int]:
+        """``player_ids`` plus, in local_lock mode, the players stored on the
+        transactions of ``rollbacks``: a rollback refunds that player, whom the
+        request may not name. Callers check the stored players again once
+        holding the locks."""
+        if self.concurrency_mode != "local_lock" or not rollbacks:
+            return player_ids
+        stored = await self.wallet_repository.get_transaction_players(db=db, txn_uuids=rollbacks)
+        # Not left open while waiting for the locks.
+        await db.rollback()
+        return [*player_ids, *stored]
+
+
+
+
+    async def _debit(self, db: AsyncSession, player_id: int, amount: int) -> Optional[int]:
+        """Returns the new balance, or None if the player is missing or short of funds."""
+        if self.concurrency_mode == "atomic":
+            return await self.wallet_repository.debit_player(db=db, player_id=player_id, amount=amount)
+        return await self._write_balance(db=db, player_id=player_id, amount=-amount)
+
+
+    async def _credit(self, db: AsyncSession, player_id: int, amount: int) -> Optional[int]:
+        if self.concurrency_mode == "atomic":
+            return await self.wallet_repository.credit_player(db=db, player_id=player_id, amount=amount)
+        return await self._write_balance(db=db, player_id=player_id, amount=amount)
+
+
+    async def _write_balance(self, db: AsyncSession, player_id: int, amount: int) -> Optional[int]:
+        """Reads the balance, applies ``amount`` in Python and writes it back.
+
+        Optimistic writes that lose the race against another writer re-read
+        the player and try again.
+        """
+        while True:
+            row = await self.wallet_repository.get_player_balance_version(
+                db=db, player_id=player_id, for_update=self.concurrency_mode == "row_lock"
+            )
+            if row is None:
+                return None
+            balance, version = row
+            if balance + amount < 0:
+                return None
+
+            expected_version = version if self.concurrency_mode == "optimistic" else None
+            balance = await self.wallet_repository.set_player_balance(
+                db=db, player_id=player_id, balance=balance + amount, expected_version=expected_version
+            )
+            if balance is not None:
+                return balance
+
+
+    async def _known_replay(
+        self, db: AsyncSession, txn_uuid: str, player_id: int, operation: str
+    ) -> Optional[TransactionBalanceResponse]:
+        """Answers a retried ``txn_uuid`` before any write is attempted.
+
+        Uuids the bloom filter has never seen skip the lookup entirely.
+        """
+        result = self.idempotency_cache.get(txn_uuid)
+        if result is not None:
+            wallet_idempotent_replays.inc(operation)
+            return TransactionBalanceResponse(
+                id=result.transaction_id,
+                player_id=result.player_id,
+                balance=to_major_units(result.balance),
+                txn_uuid=txn_uuid
+            )
+
+        if not self.idempotency_cache.might_exist(txn_uuid):
+            return None
+
+        replay = await self._replay(db=db, txn_uuid=txn_uuid, player_id=player_id, operation=operation)
+        if replay is None:
+            self.idempotency_cache.record_false_positive()
+        return replay
+
+
+    async def _replay(
+        self, db: AsyncSession, txn_uuid: str, player_id: int, operation: str
+    ) -> Optional[TransactionBalanceResponse]:
+        cached = self.balance_cache.get(player_id)
+        if cached is not None:
+            balance = cached.balance
+        else:
+            balance = await self.wallet_repository.get_player_balance(db=db, player_id=player_id)
+            if balance is None:
+                raise PlayerNotFoundException(player_id=player_id)
+
+        transaction_id = await self.wallet_repository.get_transaction_id(db=db, txn_uuid=txn_uuid)
+        if transaction_id is None:
+            return None
+
+        wallet_idempotent_replays.inc(operation)
+        self.idempotency_cache.remember(txn_uuid, transaction_id, player_id, balance)
+        return TransactionBalanceResponse(
+            id=transaction_id,
+            player_id=player_id,
+            balance=to_major_units(balance),
+            txn_uuid=txn_uuid
+        )
+
+
+    async def batch(self, db: AsyncSession, operations: List[TransactionBatchOperation]) -> List[TransactionBatchResult]:
+        """Applies mixed bets, wins and rollbacks as one database transaction.
+
+        The referenced transactions and players are locked once, every
+        operation is planned in memory in request order, and the plan is
+        written with one multi-row insert, one rollback update and one grouped
+        balance update. Each item is answered like its single endpoint would.
+        """
+        try:
+            player_ids = [operation.player_id for operation in operations]
+            rollbacks = [operation.txn_uuid for operation in operations if operation.type == "rollback"]
+            stored = None
+            while stored is None:
+                locked = await self._players_to_lock(db=db, player_ids=player_ids, rollbacks=rollbacks)
+                async with self._serialized(locked):
+                    plan, known = await self._plan_batch(db=db, operations=operations)
+                    if self.concurrency_mode == "local_lock" and not set(plan.deltas) <= set(locked):
+                        # A rolled back txn_uuid was stored for another player
+                        # since the lookup, lock again.
+                        await db.rollback()
+                        continue
+                    stored = await self._write_batch(db=db, plan=plan)
+                    if stored is None:
+                        # A txn_uuid was stored or rolled back concurrently, plan again.
+                        await db.rollback()
+        except Exception as e:
+            logging.error(f"Failed to apply batch of {len(operations)} operations: {str(e)}")
+            await db.rollback()
+            raise e
+
+        for txn_uuid, transaction_id in stored.items():
+            known[txn_uuid]["id"] = transaction_id
+        for operation_type in plan.replays:
+            wallet_idempotent_replays.inc(operation_type)
+
+        results = []
+        for result in plan.results:
+            operation, error = result["operation"], result["error"]
+            transaction = known.get(operation.txn_uuid)
+            transaction_id = None
+            if result["stored"]:
+                transaction_id = transaction["id"]
+                error = RollbackStoredException(transaction_id=transaction_id)
+                self.idempotency_cache.mark_seen(operation.txn_uuid)
+            elif error is None:
+                transaction_id = transaction["id"]
+                if operation.type == "rollback":
+                    self.idempotency_cache.forget(operation.txn_uuid)
+                elif not transaction["rolled_back"]:
+                    self.idempotency_cache.remember(operation.txn_uuid, transaction_id, result["player_id"], result["balance"])
+
+            results.append(TransactionBatchResult(
+                txn_uuid=operation.txn_uuid,
+                type=operation.type,
+                status_code=200 if error is None else error.status_code,
+                player_id=result["player_id"],
+                id=transaction_id,
+                balance=None if result["balance"] is None else to_major_units(result["balance"]),
+                detail=None if error is None else str(error.detail)
+            ))
+        return results
+
+
+    async def _plan_batch(self, db: AsyncSession, operations: List[TransactionBatchOperation]):
+        rows = await self.wallet_repository.lock_transactions(db=db, txn_uuids=[op.txn_uuid for op in operations])
+        known = {
+            row.txn_uuid: {"id": row.id, "player_id": row.player_id, "value_bet": row.value_bet, "rolled_back": row.rolled_back}
+            for row in rows
+        }
+        player_ids = {op.player_id for op in operations} | {row.player_id for row in rows}
+        balances = await self.wallet_repository.lock_players(db=db, player_ids=player_ids)
+
+        plan = BatchPlan()
+        for operation in operations:
+            txn_uuid, player_id = operation.txn_uuid, operation.player_id
+            transaction = known.get(txn_uuid)
+
+            value_bet, value_win = to_minor_units(operation.value_bet), to_minor_units(operation.value_win)
+            if operation.type == "bet" and value_bet < 0:
+                plan.add(operation, player_id, error=InvalidBetException(value_bet=operation.value_bet))
+            elif operation.type == "win" and value_win < 0:
+                plan.add(operation, player_id, error=InvalidWinException(value_win=operation.value_win))
+            elif operation.type == "rollback" and value_bet == 0:
+                plan.add(operation, player_id, error=InvalidBetException(value_bet=operation.value_bet))
+            elif operation.type == "rollback" and transaction is not None:
+                if transaction["rolled_back"]:
+                    plan.add(operation, player_id, error=AlreadyCancelledException(txn_uuid=txn_uuid))
+                    continue
+                player_id = transaction["player_id"]
+                if player_id not in balances:
+                    plan.add(operation, player_id, error=PlayerNotFoundException(player_id=player_id))
+                    continue
+                transaction["rolled_back"] = True
+                if txn_uuid in plan.inserts:
+                    plan.inserts[txn_uuid]["rolled_back"] = True
+                else:
+                    plan.rolled_back.add(txn_uuid)
+                balances[player_id] += transaction["value_bet"]
+                plan.move(player_id, txn_uuid, "rollback", transaction["value_bet"], balances[player_id])
+                plan.add(operation, player_id, balance=balances[player_id])
+            elif player_id not in balances:
+                plan.add(operation, player_id, error=PlayerNotFoundException(player_id=player_id))
+            elif transaction is not None:
+                plan.replays.append(operation.type)
+                plan.add(operation, player_id, balance=balances[player_id])
+            elif operation.type == "bet" and balances[player_id] < value_bet:
+                plan.add(operation, player_id, error=InsufficientBalanceException(player_id=player_id))
+            else:
+                rolled_back = operation.type == "rollback"
+                if operation.type == "win":
+                    value_bet = 0
+                else:
+                    value_win = 0
+                plan.inserts[txn_uuid] = {
+                    "txn_uuid": txn_uuid,
+                    "player_id": player_id,
+                    "value_bet": value_bet,
+                    "value_win": value_win,
+                    "rolled_back": rolled_back,
+                }
+                known[txn_uuid] = {"id": None, "player_id": player_id, "value_bet": value_bet, "rolled_back": rolled_back}
+                if rolled_back:
+                    plan.add(operation, player_id, stored=True)
+                    continue
+                balances[player_id] += value_win - value_bet
+                plan.move(player_id, txn_uuid, operation.type, value_win - value_bet, balances[player_id])
+                plan.add(operation, player_id, balance=balances[player_id])
+
+        return plan, known
+
+
+    async def _write_batch(self, db: AsyncSession, plan: BatchPlan) -> Optional[Dict[str, int]]:
+        """Writes a plan and commits it, returning the ids of the new rows.
+
+        Returns None without committing when another request got to one of
+        the txn_uuids first.
+        """
+        stored = {}
+        if plan.inserts:
+            stored = await self.wallet_repository.insert_transactions(db=db, rows=list(plan.inserts.values()))
+            if len(stored) != len(plan.inserts):
+                return None
+
+        if plan.rolled_back:
+            marked = await self.wallet_repository.mark_many_rolled_back(db=db, txn_uuids=plan.rolled_back)
+            if len(marked) != len(plan.rolled_back):
+                return None
+
+        deltas = {player_id: delta for player_id, delta in plan.deltas.items() if delta}
+        balances = await self.wallet_repository.apply_balance_deltas(db=db, deltas=deltas) if deltas else {}
+        if plan.entries:
+            await self._record(db=db, entries=plan.entries)
+
+        await db.commit()
+        for player_id, balance in balances.items():
+            self.balance_cache.update_balance(player_id, balance)
+        return stored
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+from app import config
+from app.db import SessionLocal
+from app.services.wallet_service import WalletService
+from app.schemas.transaction_schema import TransactionBatchOperation, TransactionBatchResult
+
+
+class WalletWriterStats:
+
+    def __init__(self):
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.operations = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    def record(self, batch_size: int, flush_seconds: float):
+        self.flushes += 1
+        self.operations += batch_size
+        self.last_batch_size = batch_size
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+        self.flush_seconds_total += flush_seconds
+        self.flush_seconds_max = max(self.flush_seconds_max, flush_seconds)
+
+
+class WalletWriter:
+    """Background writer that group-commits concurrent wallet operations.
+
+    Callers queue an operation and wait on its future. The writer takes up
+    to ``max_batch`` queued operations, waiting at most ``max_delay_ms``
+    after the first one, applies them with :meth:`WalletService.batch` in a
+    single transaction and resolves every future once it has committed.
+    """
+
+    def __init__(
+        self,
+        wallet_service: WalletService,
+        session_factory=SessionLocal,
+        max_batch: int = config.GROUP_COMMIT_MAX_BATCH,
+        max_delay_ms: float = config.GROUP_COMMIT_MAX_DELAY_MS,
+    ):
+        self.wallet_service = wallet_service
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.stats = WalletWriterStats()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Applies everything queued so far, then stops the writer."""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.task = None
+
+    async def submit(self, operation: TransactionBatchOperation) -> TransactionBatchResult:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((operation, future))
+        return await future
+
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self.queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+
+    async def _flush(self, batch: List[Tuple[TransactionBatchOperation, asyncio.Future]]):
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                results = await self.wallet_service.batch(db=db, operations=[operation for operation, _ in batch])
+        except Exception as e:
+            self.stats.failed_flushes += 1
+            logging.error(f"Failed to group-commit {len(batch)} wallet operations: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats.record(len(batch), time.perf_counter() - started)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+    def metrics(self) -> dict:
+        stats = self.stats
+        return {
+            "enabled": self.task is not None,
+            "queue_depth": self.queue.qsize(),
+            "flushes": stats.flushes,
+            "failed_flushes": stats.failed_flushes,
+            "operations": stats.operations,
+            "batch_size_avg": stats.operations / stats.flushes if stats.flushes else 0.0,
+            "batch_size_last": stats.last_batch_size,
+            "batch_size_max": stats.max_batch_size,
+            "flush_latency_avg_ms": stats.flush_seconds_total / stats.flushes * 1000 if stats.flushes else 0.0,
+            "flush_latency_max_ms": stats.flush_seconds_max * 1000,
+        }
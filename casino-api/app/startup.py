@@ -0,0 +1,18 @@
+class StartupTimings:
+    """How long this worker took to import the application and to run the
+    startup half of its lifespan."""
+
+    def __init__(self):
+        self.import_seconds = 0.0
+        self.startup_seconds = 0.0
+        self.warmup_seconds = 0.0
+
+    def metrics(self) -> dict:
+        return {
+            "import_seconds": self.import_seconds,
+            "startup_seconds": self.startup_seconds,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+startup_timings = StartupTimings()
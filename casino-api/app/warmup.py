@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.db import engine, read_engine
+from app.repositories.balance_repository import BalanceRepository
+from app.repositories.player_repository import PlayerRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.wallet_repository import WalletRepository
+
+
+# Hot statements run once on every pooled connection, with keys no row has,
+# so the first requests find them compiled by SQLAlchemy and prepared by the
+# driver. Writes match nothing and are rolled back with the connection.
+WRITE_WARMUP_STATEMENTS: List[Tuple[object, dict]] = [
+    (PlayerRepository.player_by_id, {"player_key": 0}),
+    (TransactionRepository.transaction_by_uuid, {"uuid": ""}),
+    (WalletRepository.transaction_id_stmt, {"uuid": ""}),
+    (WalletRepository.player_balance_stmt, {"player_key": 0}),
+    (WalletRepository.debit_stmt, {"player_key": 0, "amount": 0}),
+    (WalletRepository.credit_stmt, {"player_key": 0, "amount": 0}),
+]
+READ_WARMUP_STATEMENTS: List[Tuple[object, dict]] = [
+    (BalanceRepository.balance_by_id, {"player_id": 0}),
+]
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int, statements: List[Tuple[object, dict]]):
+    """Checks out ``connections`` connections at once, so the pool opens that
+    many, and runs ``statements`` on each before returning it."""
+
+    async def prepare():
+        async with engine.connect() as conn:
+            for stmt, params in statements:
+                await conn.execute(stmt, params)
+
+    # Every checkout must finish before a failure is raised, or the failed
+    # warm-up would leave connections checked out past engine disposal.
+    results = await asyncio.gather(*(prepare() for _ in range(connections)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+async def warm_up():
+    """Fills the write and read pools before the worker takes traffic.
+
+    A failed warm-up is logged and never keeps the worker from starting;
+    the pools then open their connections on demand as usual.
+    """
+    try:
+        await asyncio.gather(
+            warm_up_pool(engine, engine.pool.size(), WRITE_WARMUP_STATEMENTS),
+            warm_up_pool(read_engine, read_engine.pool.size(), READ_WARMUP_STATEMENTS),
+        )
+    except Exception as e:
+        logging.warning(f"Startup warm-up failed: {str(e)}")
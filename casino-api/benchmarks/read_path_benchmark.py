@@ -0,0 +1,173 @@
+"""CPU and memory of listing players and transactions, ORM entities vs rows.
+
+Fills the players and transactions tables with ``--rows`` rows each (1M by
+default, reused on later runs) and reads every row twice: once loading ORM
+entities and building a response model per row, as the list endpoints used
+to, and once through the current row-tuple path of the services. Both JSON
+pages walked with the keyset cursor and the NDJSON stream are measured::
+
+    python -m benchmarks.read_path_benchmark --database sqlite+aiosqlite:///./read_bench.db
+
+CPU is process time, so it includes the database driver; peak memory is
+the largest amount of Python memory allocated during one pass, measured in
+a separate run under tracemalloc.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app import config
+from app.db import Base
+from app.models.player_model import Player
+from app.models.transaction_model import Transaction
+from app.money import to_major_units
+from app.repositories.player_repository import PlayerRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.schemas.player_schema import PlayerResponse, PlayersResponse
+from app.schemas.transaction_schema import TransactionResponse, TransactionsResponse
+from app.services.player_service import PlayerService
+from app.services.transaction_service import TransactionService
+
+
+SEED_CHUNK = 50_000
+
+player_service = PlayerService(PlayerRepository())
+transaction_service = TransactionService(TransactionRepository())
+
+
+async def seed(session_factory, rows: int):
+    async with session_factory() as db:
+        players = await db.scalar(select(func.count()).select_from(Player))
+        transactions = await db.scalar(select(func.count()).select_from(Transaction))
+        for start in range(players, rows, SEED_CHUNK):
+            await db.execute(insert(Player), [
+                {"name": f"Player {i}", "balance": 100_000 + i} for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+        for start in range(transactions, rows, SEED_CHUNK):
+            await db.execute(insert(Transaction), [
+                {"txn_uuid": f"txn-{i}", "player_id": i % rows + 1, "value_bet": 1_000, "value_win": 0}
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+        await db.commit()
+
+
+async def orm_players_pages(db: AsyncSession, page_size: int):
+    after = 0
+    while after is not None:
+        result = await db.execute(select(Player).where(Player.id > after).order_by(Player.id).limit(page_size))
+        players = [
+            PlayerResponse(id=player.id, name=player.name, balance=to_major_units(player.balance))
+            for player in result.scalars().all()
+        ]
+        after = players[-1].id if len(players) == page_size else None
+        PlayersResponse(players=players, next_after=after).model_dump_json()
+        db.expunge_all()
+
+
+async def row_players_pages(db: AsyncSession, page_size: int):
+    after = 0
+    while after is not None:
+        body = json.loads(await player_service.get_players_json(db=db, limit=page_size, after=after))
+        after = body["next_after"]
+
+
+async def orm_transactions_pages(db: AsyncSession, page_size: int):
+    after = 0
+    while after is not None:
+        result = await db.execute(
+            select(Transaction).where(Transaction.id > after).order_by(Transaction.id).limit(page_size)
+        )
+        transactions = [
+            TransactionResponse(
+                id=transaction.id,
+                txn_uuid=transaction.txn_uuid,
+                player_id=transaction.player_id,
+                value_bet=to_major_units(transaction.value_bet),
+                value_win=to_major_units(transaction.value_win),
+            )
+            for transaction in result.scalars().all()
+        ]
+        after = transactions[-1].id if len(transactions) == page_size else None
+        TransactionsResponse(transactions=transactions, next_after=after).model_dump_json()
+        db.expunge_all()
+
+
+async def row_transactions_pages(db: AsyncSession, page_size: int):
+    after = 0
+    while after is not None:
+        body = json.loads(await transaction_service.get_transactions_json(db=db, limit=page_size, after=after))
+        after = body["next_after"]
+
+
+async def orm_transactions_stream(db: AsyncSession, page_size: int):
+    stmt = select(Transaction).order_by(Transaction.id).execution_options(yield_per=config.STREAM_YIELD_PER)
+    async for transaction in await db.stream_scalars(stmt):
+        json.dumps({
+            "id": transaction.id,
+            "txn_uuid": transaction.txn_uuid,
+            "player_id": transaction.player_id,
+            "value_bet": to_major_units(transaction.value_bet),
+            "value_win": to_major_units(transaction.value_win),
+        }).encode()
+
+
+async def row_transactions_stream(db: AsyncSession, page_size: int):
+    async for line in transaction_service.stream_transactions(db=db):
+        pass
+
+
+SCENARIOS = [
+    ("players pages", orm_players_pages, row_players_pages),
+    ("transactions pages", orm_transactions_pages, row_transactions_pages),
+    ("transactions ndjson", orm_transactions_stream, row_transactions_stream),
+]
+
+
+async def measure(
+    session_factory, read: Callable[[AsyncSession, int], Awaitable], page_size: int, trace_memory: bool
+) -> Optional[float]:
+    async with session_factory() as db:
+        if trace_memory:
+            tracemalloc.start()
+            await read(db, page_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak / 1024 / 1024
+        started = time.process_time()
+        await read(db, page_size)
+        return time.process_time() - started
+
+
+async def run(database: str, rows: int, page_size: int):
+    engine = create_async_engine(database)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    await seed(session_factory, rows)
+
+    print(f"{rows} rows, pages of {page_size}")
+    print(f"{'scenario':<22} {'orm cpu s':>10} {'rows cpu s':>11} {'orm peak MB':>12} {'rows peak MB':>13}")
+    for name, orm_read, row_read in SCENARIOS:
+        orm_cpu = await measure(session_factory, orm_read, page_size, trace_memory=False)
+        row_cpu = await measure(session_factory, row_read, page_size, trace_memory=False)
+        orm_peak = await measure(session_factory, orm_read, page_size, trace_memory=True)
+        row_peak = await measure(session_factory, row_read, page_size, trace_memory=True)
+        print(f"{name:<22} {orm_cpu:>10.2f} {row_cpu:>11.2f} {orm_peak:>12.1f} {row_peak:>13.1f}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM vs row-tuple read path of the list endpoints.")
+    parser.add_argument("--database", default="sqlite+aiosqlite:///./read_bench.db", help="Async database URL to fill and read")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in each of the players and transactions tables")
+    parser.add_argument("--page-size", type=int, default=config.PAGE_SIZE_MAX, help="Rows per JSON page")
+    args = parser.parse_args()
+    asyncio.run(run(args.database, args.rows, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
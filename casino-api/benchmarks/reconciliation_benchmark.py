@@ -0,0 +1,83 @@
+"""Throughput and memory of the balance reconciliation job.
+
+Fills the ledger with ``--rows`` entries spread over ``--players`` players
+(reused on later runs), then times a full reconciliation and an incremental
+one that finds nothing new::
+
+    python -m benchmarks.reconciliation_benchmark --rows 10000000 --players 100000
+
+Peak memory is the largest amount of Python and NumPy memory allocated
+during a full run, measured in a separate run under tracemalloc; it should
+follow ``--players`` and ``--chunk-size``, not ``--rows``.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app import config
+from app.db import Base
+from app.jobs.reconciliation_job import reconcile_balances
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.player_model import Player
+import app.models.transaction_model  # mapped for Player.transactions
+
+
+SEED_CHUNK = 50_000
+
+
+async def seed(session_factory, rows: int, players: int):
+    async with session_factory() as db:
+        existing_players = await db.scalar(select(func.count()).select_from(Player))
+        existing_entries = await db.scalar(select(func.count()).select_from(LedgerEntry))
+        for start in range(existing_players, players, SEED_CHUNK):
+            # Every entry below credits 1, so a player's balance is its entry count.
+            await db.execute(insert(Player), [
+                {"name": f"Player {i}", "balance": rows // players + (i < rows % players)}
+                for i in range(start, min(start + SEED_CHUNK, players))
+            ])
+        for start in range(existing_entries, rows, SEED_CHUNK):
+            await db.execute(insert(LedgerEntry), [
+                {"player_id": i % players + 1, "entry_type": "adjustment", "amount": 1, "balance": 0}
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+        await db.commit()
+
+
+async def run(database: str, rows: int, players: int, chunk_size: int):
+    engine = create_async_engine(database)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    await seed(session_factory, rows, players)
+
+    def reconcile(full: bool):
+        return reconcile_balances(session_factory=session_factory, chunk_size=chunk_size, full=full)
+
+    print(f"{rows} ledger entries, {players} players, chunks of {chunk_size}")
+    report = await reconcile(full=True)
+    print(f"full run:        {report.seconds:>8.2f}s  {report.entries / report.seconds:>12,.0f} entries/s  {len(report.mismatches)} mismatches")
+    report = await reconcile(full=False)
+    print(f"incremental run: {report.seconds:>8.2f}s  {report.entries:>12} new entries")
+
+    tracemalloc.start()
+    await reconcile(full=True)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"full run peak memory: {peak / 1024 / 1024:.1f} MB")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and memory of the balance reconciliation job.")
+    parser.add_argument("--database", default="sqlite+aiosqlite:///./reconciliation_bench.db", help="Async database URL to fill and read")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Ledger entries")
+    parser.add_argument("--players", type=int, default=10_000, help="Players the entries are spread over")
+    parser.add_argument("--chunk-size", type=int, default=config.RECONCILIATION_CHUNK_SIZE, help="Rows fetched per chunk")
+    args = parser.parse_args()
+    asyncio.run(run(args.database, args.rows, args.players, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Micro-benchmark of the CPU spent encoding each high-traffic response.
+
+For the response of every hot route, the model is encoded the way FastAPI
+does it when a route returns it as is (validation against the route's
+``response_model``, ``jsonable_encoder``-style serialization and the stdlib
+``JSONResponse``) and through ``ModelResponse``. A full page of the list
+endpoints is encoded with the stdlib ``json`` module, as the services used
+to, and with orjson::
+
+    python -m benchmarks.serialization_benchmark --calls 20000
+
+Only serialization is timed; the database work is the same either way.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, List, Tuple
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from app import config
+from app.main import app
+from app.responses import ModelResponse
+from app.schemas.player_schema import PlayerResponse
+from app.schemas.transaction_schema import (
+    PlayerHistoryResponse,
+    TransactionBalanceResponse,
+    TransactionBalanceUpdate,
+    TransactionBatchResponse,
+    TransactionBatchResult,
+    TransactionHistoryItem,
+    TransactionResponse,
+)
+
+
+RESPONSES = [
+    ("POST", "/transactions/bet", TransactionBalanceResponse(id=1, player_id=1, balance=990.5, txn_uuid="txn-1")),
+    ("POST", "/transactions/win", TransactionBalanceResponse(id=2, player_id=1, balance=1010.5, txn_uuid="txn-2")),
+    ("POST", "/transactions/rollback", TransactionBalanceUpdate(player_id=1, balance=1000.5)),
+    ("POST", "/transactions/batch", TransactionBatchResponse(results=[
+        TransactionBatchResult(txn_uuid=f"txn-{i}", type="bet", status_code=200, player_id=1, id=i, balance=1000.0 - i)
+        for i in range(20)
+    ])),
+    ("GET", "/transactions/{txn_uuid}", TransactionResponse(id=1, txn_uuid="txn-1", player_id=1, value_bet=10.0, value_win=0.0)),
+    ("GET", "/players/{player_id}", PlayerResponse(id=1, name="Maria da Silva", balance=1000.0)),
+    ("GET", "/players/{player_id}/history", PlayerHistoryResponse(player=1, history=[
+        TransactionHistoryItem(id=i, txn_uuid=f"txn-{i}", type="bet", value=10.0, rolled_back=False)
+        for i in range(config.PAGE_SIZE_DEFAULT)
+    ], next_after=config.PAGE_SIZE_DEFAULT)),
+]
+
+
+def response_field(method: str, path: str):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path and method in route.methods:
+            return route.secure_cloned_response_field
+    raise LookupError(f"No route {method} {path}")
+
+
+async def time_calls(encode: Callable[[], Awaitable], calls: int) -> float:
+    for _ in range(min(calls, 200)):
+        await encode()
+    started = time.process_time()
+    for _ in range(calls):
+        await encode()
+    return (time.process_time() - started) / calls * 1_000_000
+
+
+def model_encoders(method: str, path: str, model) -> Tuple[Callable[[], Awaitable], Callable[[], Awaitable]]:
+    field = response_field(method, path)
+
+    async def validated():
+        content = await serialize_response(field=field, response_content=model, is_coroutine=True)
+        return JSONResponse(content).body
+
+    async def trusted():
+        return ModelResponse(model).body
+
+    return validated, trusted
+
+
+def page_encoders(rows: List[dict]) -> Tuple[Callable[[], Awaitable], Callable[[], Awaitable]]:
+    page = {"transactions": rows, "next_after": rows[-1]["id"]}
+
+    async def stdlib():
+        return json.dumps(page, separators=(",", ":")).encode()
+
+    async def fast():
+        return orjson.dumps(page)
+
+    return stdlib, fast
+
+
+async def run(calls: int):
+    rows = [
+        {"id": i, "txn_uuid": f"txn-{i}", "player_id": i % 100, "value_bet": 10.0, "value_win": 0.0}
+        for i in range(1, config.PAGE_SIZE_MAX + 1)
+    ]
+    cases = [(f"{method} {path}", *model_encoders(method, path, model)) for method, path, model in RESPONSES]
+    cases.append((f"GET /transactions page of {len(rows)}", *page_encoders(rows)))
+
+    print(f"{'response':<40} {'before us':>10} {'after us':>9} {'saved':>7}")
+    for name, before, after in cases:
+        page_calls = max(calls // 100, 10) if "page" in name else calls
+        before_us = await time_calls(before, page_calls)
+        after_us = await time_calls(after, page_calls)
+        print(f"{name:<40} {before_us:>10.1f} {after_us:>9.1f} {1 - after_us / before_us:>7.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization CPU of the high-traffic responses.")
+    parser.add_argument("--calls", type=int, default=20000, help="Encodings timed per response and variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
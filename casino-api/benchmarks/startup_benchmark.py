@@ -0,0 +1,135 @@
+"""Cold start time of an API worker, measured over fresh processes.
+
+Each run starts a new Python process that imports ``app.main``, runs the
+startup half of the lifespan and serves one request in-process, the way a
+new worker does before it can take traffic. The process reports the timings
+the app records itself (``GET /metrics/startup``); the parent adds the time
+from spawning the process until the request was answered::
+
+    python -m benchmarks.startup_benchmark --runs 10 --output startup.json
+    python -m benchmarks.startup_benchmark --baseline startup.json
+
+With ``--baseline`` the command exits with status 1 when the median of any
+timing grew by more than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+import httpx
+
+async def probe():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            timings = (await client.get("/metrics/startup")).json()
+    timings["ready_seconds"] = time.perf_counter() - started
+    print(json.dumps(timings), flush=True)
+
+asyncio.run(probe())
+"""
+
+SETUP = """
+import asyncio
+from app.db import Base, engine
+import app.container  # registers every model on Base
+
+async def setup():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+asyncio.run(setup())
+"""
+
+TIMINGS = ("cold_start_seconds", "ready_seconds", "import_seconds", "startup_seconds", "warmup_seconds")
+
+
+def run_probe(env: Dict[str, str]) -> dict:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", PROBE], cwd=PROJECT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    line = process.stdout.readline()
+    cold_start = time.perf_counter() - started
+    process.wait()
+    if process.returncode != 0 or not line:
+        raise RuntimeError(f"Startup probe failed with exit code {process.returncode}")
+    timings = json.loads(line)
+    timings["cold_start_seconds"] = cold_start
+    return timings
+
+
+def summarize(runs: List[dict]) -> dict:
+    return {
+        name: {
+            "median": round(statistics.median(run[name] for run in runs), 4),
+            "max": round(max(run[name] for run in runs), 4),
+        }
+        for name in TIMINGS
+    }
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Lists every timing whose median grew by more than ``tolerance``."""
+    regressions = []
+    for name, result in current["timings"].items():
+        before = baseline.get("timings", {}).get(name)
+        if before and result["median"] > before["median"] * (1 + tolerance):
+            regressions.append(f"{name}: median {before['median']}s -> {result['median']}s")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold start time of an API worker.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes started")
+    parser.add_argument(
+        "--database", default="sqlite+aiosqlite:///./startup_bench.db", help="DATABASE_URL the probed workers connect to"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="Allowed slowdown before a regression is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    env = dict(
+        os.environ, DATABASE_URL=args.database, READ_DATABASE_URL=args.database, SNAPSHOT_INTERVAL_SECONDS="0", ROLLUP_INTERVAL_SECONDS="0"
+    )
+    subprocess.run([sys.executable, "-c", SETUP], cwd=PROJECT_DIR, env=env, check=True, stderr=subprocess.DEVNULL)
+    runs = [run_probe(env) for _ in range(args.runs)]
+    results = {"runs": args.runs, "database": args.database, "timings": summarize(runs)}
+
+    print(f"{'timing':<20} {'median s':>9} {'max s':>9}")
+    for name, result in results["timings"].items():
+        print(f"{name:<20} {result['median']:>9.3f} {result['max']:>9.3f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
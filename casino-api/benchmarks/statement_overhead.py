@@ -0,0 +1,123 @@
+"""Micro-benchmark of the per-call cost of the hot repository lookups.
+
+Runs each lookup against an in-memory SQLite database, once with the
+statement built on every call (how the repositories used to do it) and once
+through the repository's prebuilt or lambda statement, and prints the
+average time per call::
+
+    python -m benchmarks.statement_overhead --calls 5000
+
+The database work is the same in both columns, so the difference is the
+Python overhead of building, cache-keying and compiling the statement.
+"""
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Tuple
+from sqlalchemy import and_, case, false, literal, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.db import Base
+from app.models.player_model import Player
+from app.models.transaction_model import Transaction
+from app.repositories.player_repository import PlayerRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.wallet_repository import WalletRepository
+
+
+async def get_player_per_call(db: AsyncSession):
+    return await db.get(Player, 1, populate_existing=True)
+
+
+async def get_transaction_by_uuid_per_call(db: AsyncSession):
+    result = await db.execute(select(Transaction).where(Transaction.txn_uuid == "txn-1"))
+    return result.scalars().first()
+
+
+async def debit_per_call(db: AsyncSession):
+    stmt = (
+        update(Player)
+        .where(Player.id == 1, Player.balance >= 0)
+        .values(balance=Player.balance - 0, version=Player.version + 1)
+        .returning(Player.balance)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def history_per_call(db: AsyncSession):
+    is_bet = and_(Transaction.value_bet > 0, Transaction.value_win == 0)
+    is_rolled_back = and_(is_bet, Transaction.rolled_back.is_(True))
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.txn_uuid,
+            case((is_bet, literal("bet")), else_=literal("win")).label("type"),
+            case((is_bet, Transaction.value_bet), else_=Transaction.value_win).label("value"),
+            case((is_rolled_back, true()), else_=false()).label("rolled_back"),
+        )
+        .where(Transaction.player_id == 1, Transaction.id > 0)
+        .order_by(Transaction.id)
+        .limit(50)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+player_repository = PlayerRepository()
+transaction_repository = TransactionRepository()
+wallet_repository = WalletRepository()
+
+LOOKUPS: List[Tuple[str, Callable[[AsyncSession], Awaitable], Callable[[AsyncSession], Awaitable]]] = [
+    ("get_player", get_player_per_call, lambda db: player_repository.get_player(db=db, player_id=1)),
+    (
+        "get_transaction_by_uuid",
+        get_transaction_by_uuid_per_call,
+        lambda db: transaction_repository.get_transaction_by_uuid(db=db, txn_uuid="txn-1"),
+    ),
+    ("debit_player", debit_per_call, lambda db: wallet_repository.debit_player(db=db, player_id=1, amount=0)),
+    (
+        "get_player_history",
+        history_per_call,
+        lambda db: transaction_repository.get_player_history(db=db, player_id=1, limit=50, after=0),
+    ),
+]
+
+
+async def time_calls(db: AsyncSession, call: Callable[[AsyncSession], Awaitable], calls: int) -> float:
+    for _ in range(min(calls, 200)):
+        await call(db)
+    started = time.perf_counter()
+    for _ in range(calls):
+        await call(db)
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def run(calls: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(Player(id=1, name="Benchmark", balance=1000))
+        db.add_all(Transaction(txn_uuid=f"txn-{i}", player_id=1, value_bet=1) for i in range(100))
+        await db.commit()
+
+        print(f"{'lookup':<24} {'per call us':>12} {'cached us':>10} {'saved':>7}")
+        for name, before, after in LOOKUPS:
+            before_us = await time_calls(db, before, calls)
+            after_us = await time_calls(db, after, calls)
+            print(f"{name:<24} {before_us:>12.1f} {after_us:>10.1f} {1 - after_us / before_us:>7.0%}")
+        await db.rollback()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of the hot repository lookups.")
+    parser.add_argument("--calls", type=int, default=5000, help="Calls timed per lookup and variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Load test of the wallet endpoints.
+
+Drives bets, wins, rollbacks, balance reads and history reads with a fixed
+number of concurrent clients, sends most of the traffic to a small set of hot
+players, and reports requests per second and latency percentiles per
+endpoint. Results are written as JSON and can be compared with a previous run
+to catch regressions between releases::
+
+    python -m benchmarks.wallet_benchmark --url http://localhost:8000 --output bench.json
+    python -m benchmarks.wallet_benchmark --url http://localhost:8000 --baseline bench.json
+
+Without ``--url`` the application is served in-process against
+``DATABASE_URL`` (e.g. ``sqlite+aiosqlite:///./bench.db``), creating the
+tables if needed.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+import httpx
+
+
+OPERATIONS = ("bet", "win", "rollback", "balance", "history")
+DEFAULT_MIX = "bet=50,win=20,rollback=5,balance=20,history=5"
+
+
+@dataclass
+class BenchmarkSettings:
+    requests: int = 5000
+    concurrency: int = 50
+    players: int = 1000
+    hot_players: float = 0.01
+    hot_share: float = 0.8
+    mix: Dict[str, int] = field(default_factory=lambda: parse_mix(DEFAULT_MIX))
+    initial_balance: float = 1_000_000.0
+    value_bet: float = 1.0
+    value_win: float = 1.0
+    history_limit: int = 50
+    seed: Optional[int] = None
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parses ``"bet=50,win=20"`` into relative weights per operation."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {', '.join(OPERATIONS)}")
+        weights[name] = int(weight)
+    if sum(weights.values()) <= 0:
+        raise ValueError("The operation mix needs at least one positive weight")
+    return weights
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(latencies_ms: List[float], statuses: Dict[str, int], elapsed: float) -> dict:
+    errors = sum(count for status, count in statuses.items() if status == "error" or status.startswith("5"))
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "status_codes": dict(sorted(statuses.items())),
+        "rps": round(len(latencies_ms) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        "max_ms": round(max(latencies_ms, default=0.0), 3),
+    }
+
+
+class WalletLoad:
+    """Shared state of one benchmark run: the seeded players, the bets that can
+    still be rolled back and the latency samples of every request."""
+
+    def __init__(self, client: httpx.AsyncClient, settings: BenchmarkSettings, player_ids: List[int]):
+        self.client = client
+        self.settings = settings
+        self.player_ids = player_ids
+        hot_count = max(1, int(len(player_ids) * settings.hot_players))
+        self.hot_player_ids = player_ids[:hot_count]
+        self.random = random.Random(settings.seed)
+        self.operations = list(settings.mix.keys())
+        self.weights = list(settings.mix.values())
+        self.open_bets: Deque[Tuple[int, str]] = deque()
+        self.latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        self.statuses: Dict[str, Dict[str, int]] = {name: {} for name in OPERATIONS}
+        self.remaining = settings.requests
+
+    def pick_player(self) -> int:
+        if self.random.random() < self.settings.hot_share:
+            return self.random.choice(self.hot_player_ids)
+        return self.random.choice(self.player_ids)
+
+    def pick_operation(self) -> str:
+        operation = self.random.choices(self.operations, weights=self.weights)[0]
+        if operation == "rollback" and not self.open_bets:
+            return "bet"
+        return operation
+
+    async def request(self, operation: str) -> httpx.Response:
+        settings = self.settings
+        if operation == "rollback":
+            player_id, txn_uuid = self.open_bets.popleft()
+            return await self.client.post(
+                "/transactions/rollback",
+                json={"player_id": player_id, "txn_uuid": txn_uuid, "value_bet": settings.value_bet},
+            )
+
+        player_id = self.pick_player()
+        if operation == "bet":
+            txn_uuid = str(uuid.uuid4())
+            response = await self.client.post(
+                "/transactions/bet",
+                json={"player_id": player_id, "txn_uuid": txn_uuid, "value_bet": settings.value_bet},
+            )
+            if response.status_code == 200:
+                self.open_bets.append((player_id, txn_uuid))
+            return response
+        if operation == "win":
+            return await self.client.post(
+                "/transactions/win",
+                json={"player_id": player_id, "txn_uuid": str(uuid.uuid4()), "value_win": settings.value_win},
+            )
+        if operation == "balance":
+            return await self.client.get("/balance", params={"player": player_id})
+        return await self.client.get(f"/players/{player_id}/history", params={"limit": settings.history_limit})
+
+    async def worker(self):
+        while self.remaining > 0:
+            self.remaining -= 1
+            operation = self.pick_operation()
+            started = time.perf_counter()
+            try:
+                response = await self.request(operation)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            self.latencies[operation].append((time.perf_counter() - started) * 1000)
+            statuses = self.statuses[operation]
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def run(self) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(self.worker() for _ in range(self.settings.concurrency)))
+        return time.perf_counter() - started
+
+
+async def seed_players(client: httpx.AsyncClient, settings: BenchmarkSettings) -> List[int]:
+    semaphore = asyncio.Semaphore(settings.concurrency)
+
+    async def create(i: int) -> int:
+        async with semaphore:
+            response = await client.post(
+                "/players", json={"name": f"Benchmark {i}", "balance": settings.initial_balance}
+            )
+            response.raise_for_status()
+            return response.json()["id"]
+
+    return list(await asyncio.gather(*(create(i) for i in range(settings.players))))
+
+
+async def run_benchmark(client: httpx.AsyncClient, settings: BenchmarkSettings, target: str = "") -> dict:
+    """Seeds the players, runs the load and returns the JSON-ready results."""
+    player_ids = await seed_players(client, settings)
+    load = WalletLoad(client, settings, player_ids)
+    elapsed = await load.run()
+
+    all_latencies = [sample for samples in load.latencies.values() for sample in samples]
+    all_statuses: Dict[str, int] = {}
+    for statuses in load.statuses.values():
+        for status, count in statuses.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": target,
+        "python": platform.python_version(),
+        "settings": asdict(settings),
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize(all_latencies, all_statuses, elapsed),
+        "endpoints": {
+            name: summarize(load.latencies[name], load.statuses[name], elapsed)
+            for name in OPERATIONS
+            if load.latencies[name]
+        },
+    }
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Lists every endpoint whose throughput dropped or p99 grew by more than
+    ``tolerance`` (a fraction) compared with ``baseline``."""
+    regressions = []
+    sections = {"overall": (baseline.get("overall"), current.get("overall"))}
+    for name, result in current.get("endpoints", {}).items():
+        sections[name] = (baseline.get("endpoints", {}).get(name), result)
+
+    for name, (before, after) in sections.items():
+        if not before or not after:
+            continue
+        if after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {after['rps']}")
+        if after["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {before['p99_ms']}ms -> {after['p99_ms']}ms")
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(results["endpoints"].items()) + [("overall", results["overall"])]
+    for name, result in rows:
+        print(
+            f"{name:<10} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+
+
+async def run_in_process(settings: BenchmarkSettings) -> dict:
+    from app import config
+    from app.db import Base, engine, read_engine
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            results = await run_benchmark(client, settings, target=f"in-process {engine.url.render_as_string()}")
+    await engine.dispose()
+    await read_engine.dispose()
+    results["settings"]["wallet_concurrency_mode"] = config.WALLET_CONCURRENCY_MODE
+    results["settings"]["wallet_group_commit"] = config.WALLET_GROUP_COMMIT
+    return results
+
+
+async def run_against_url(settings: BenchmarkSettings, url: str) -> dict:
+    limits = httpx.Limits(max_connections=settings.concurrency, max_keepalive_connections=settings.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        return await run_benchmark(client, settings, target=url)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test of the casino wallet endpoints.")
+    parser.add_argument("--url", help="Base URL of a running API; served in-process from DATABASE_URL when omitted")
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests sent after seeding")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at any time")
+    parser.add_argument("--players", type=int, default=1000, help="Players created before the run")
+    parser.add_argument("--hot-players", type=float, default=0.01, help="Fraction of players that are hot")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Fraction of requests sent to hot players")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Relative weight of each operation")
+    parser.add_argument("--seed", type=int, help="Random seed for a repeatable request sequence")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before a regression is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    settings = BenchmarkSettings(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        players=args.players,
+        hot_players=args.hot_players,
+        hot_share=args.hot_share,
+        mix=parse_mix(args.mix),
+        seed=args.seed,
+    )
+    if args.url:
+        results = asyncio.run(run_against_url(settings, args.url))
+    else:
+        results = asyncio.run(run_in_process(settings))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
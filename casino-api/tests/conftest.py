@@ -0,0 +1,16 @@
+import pytest
+from app import config
+from app.cache.balance_cache import player_balance_cache
+from app.cache.idempotency_cache import txn_idempotency_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    player_balance_cache.clear()
+    txn_idempotency_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(monkeypatch):
+    monkeypatch.setattr(config, "QUERY_GUARD_MODE", "raise")
@@ -0,0 +1,61 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import config
+from app.db import Base, get_read_db_connection
+from app.db_pool import InstrumentedAsyncPool
+from app.main import app
+from app.models.player_model import Player
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+read_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db", poolclass=InstrumentedAsyncPool, isolation_level="AUTOCOMMIT"
+)
+
+REQUESTS = 500
+P99_BUDGET_MS = 25.0
+
+async def override_get_read_db():
+    async with read_engine.connect() as conn:
+        yield conn
+
+@pytest.fixture(scope="function")
+def balance_client(monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOT_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(config, "ROLLUP_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(config, "STARTUP_WARMUP", False)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Player.__table__.insert(), [{"name": f"Player {i}", "balance": 1000} for i in range(100)])
+    previous_override = app.dependency_overrides.get(get_read_db_connection)
+    app.dependency_overrides[get_read_db_connection] = override_get_read_db
+    with TestClient(app) as client:
+        yield client
+    if previous_override is None:
+        app.dependency_overrides.pop(get_read_db_connection)
+    else:
+        app.dependency_overrides[get_read_db_connection] = previous_override
+    Base.metadata.drop_all(bind=engine)
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+@pytest.mark.benchmark
+def test_get_balance_p99_latency(balance_client):
+    for player_id in range(1, 21):
+        balance_client.get(f"/balance?player={player_id}")
+
+    samples = []
+    for i in range(REQUESTS):
+        start = time.perf_counter()
+        response = balance_client.get(f"/balance?player={i % 100 + 1}")
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+
+    p50, p99 = percentile(samples, 0.50), percentile(samples, 0.99)
+    print(f"GET /balance over {REQUESTS} requests: p50={p50:.2f}ms p99={p99:.2f}ms")
+    assert p99 < P99_BUDGET_MS
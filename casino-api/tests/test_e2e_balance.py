@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db import Base, get_db_session, get_read_db_connection
+from app.main import app
+from app.cache.balance_cache import player_balance_cache
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+read_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+Base.metadata.create_all(bind=engine)
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+async def override_get_read_db():
+    async with read_engine.connect() as conn:
+        yield conn
+
+app.dependency_overrides[get_db_session] = override_get_db
+app.dependency_overrides[get_read_db_connection] = override_get_read_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def test_get_balance(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    response = client.get("/balance?player=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"id": 1, "name": "Maria da Silva", "balance": 1000.0}
+
+def test_get_balance_after_bet(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.post("/transactions/bet", json={"player_id": 1, "value_bet": 250, "txn_uuid": "balance-bet"})
+    response = client.get("/balance?player=1")
+    assert response.status_code == 200
+    assert response.json()["balance"] == 750.0
+
+def test_get_balance_player_not_found(test_db):
+    response = client.get("/balance?player=999")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Player with id 999 not found."}
+
+def test_get_balance_missing_player_parameter(test_db):
+    response = client.get("/balance")
+    assert response.status_code == 422
+
+def test_get_balance_is_cached_and_updated_by_wallet_operations(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.get("/balance?player=1")
+    hits = player_balance_cache.hits
+
+    client.post("/transactions/win", json={"player_id": 1, "value_win": 500, "txn_uuid": "cached-win"})
+    response = client.get("/balance?player=1")
+
+    assert response.json()["balance"] == 1500.0
+    assert player_balance_cache.hits == hits + 1
+
+def test_get_balance_after_delete_is_not_served_from_cache(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.get("/balance?player=1")
+    client.delete("/players/1")
+
+    response = client.get("/balance?player=1")
+    assert response.status_code == 404
+
+def test_balance_cache_metrics(test_db):
+    response = client.get("/metrics/balance-cache")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["max_size"] == 10000
+    assert {"hits", "misses", "evictions", "hit_ratio"} <= data.keys()
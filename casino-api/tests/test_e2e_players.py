@@ -1,22 +1,28 @@
+import asyncio
+import json
 import pytest
+from pathlib import Path
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app import config
 from app.db import Base, get_db_session
+from app.jobs.player_bulk_job import export_file, import_file
 from app.main import app
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base.metadata.create_all(bind=engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db_session] = override_get_db
 
@@ -122,4 +128,244 @@ def test_get_player_transaction_history_player_not_found(test_db):
     response = client.get("/players/999/history")
 
     assert response.status_code == 404
-    assert response.json() == {"detail": "Player with id 999 not found."}
\ No newline at end of file
+    assert response.json() == {"detail": "Player with id 999 not found."}
+
+def test_read_players_paginated(test_db):
+    for name in ["Maria da Silva", "Pedro da Silva", "Jane Doe"]:
+        client.post("/players", json={"name": name, "balance": 1000})
+
+    response = client.get("/players?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [player["name"] for player in data["players"]] == ["Maria da Silva", "Pedro da Silva"]
+    assert data["next_after"] == 2
+
+    response = client.get(f"/players?limit=2&after={data['next_after']}")
+    data = response.json()
+    assert [player["name"] for player in data["players"]] == ["Jane Doe"]
+    assert data["next_after"] is None
+
+
+def test_read_players_ndjson(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.post("/players", json={"name": "Pedro da Silva", "balance": 2000})
+
+    response = client.get("/players?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"id": 1, "name": "Maria da Silva", "balance": 1000.0},
+        {"id": 2, "name": "Pedro da Silva", "balance": 2000.0},
+    ]
+
+
+def test_read_players_invalid_limit(test_db):
+    response = client.get("/players?limit=0")
+    assert response.status_code == 422
+
+
+def seed_history():
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.post("/transactions/bet", json={"player_id": 1, "value_bet": 5, "txn_uuid": "bet-1"})
+    client.post("/transactions/win", json={"player_id": 1, "value_win": 50, "txn_uuid": "win-1"})
+    client.post("/transactions/bet", json={"player_id": 1, "value_bet": 10, "txn_uuid": "bet-2"})
+    client.post("/transactions/rollback", json={"player_id": 1, "value_bet": 10, "txn_uuid": "bet-2"})
+    client.post("/transactions/bet", json={"player_id": 1, "value_bet": 15, "txn_uuid": "bet-3"})
+
+
+def test_get_player_transaction_history_paginated(test_db):
+    seed_history()
+
+    response = client.get("/players/1/history?limit=3&order=desc")
+    assert response.status_code == 200
+    data = response.json()
+    assert [entry["txn_uuid"] for entry in data["history"]] == ["bet-3", "bet-2", "win-1"]
+    assert data["next_after"] == data["history"][-1]["id"]
+
+    response = client.get(f"/players/1/history?limit=3&order=desc&after={data['next_after']}")
+    data = response.json()
+    assert [entry["txn_uuid"] for entry in data["history"]] == ["bet-1"]
+    assert data["next_after"] is None
+
+
+def test_get_player_transaction_history_filters(test_db):
+    seed_history()
+
+    response = client.get("/players/1/history?type=bet")
+    assert [entry["txn_uuid"] for entry in response.json()["history"]] == ["bet-1", "bet-2", "bet-3"]
+
+    response = client.get("/players/1/history?type=win")
+    assert [entry["value"] for entry in response.json()["history"]] == [50]
+
+    response = client.get("/players/1/history?rolled_back=true")
+    assert [entry["txn_uuid"] for entry in response.json()["history"]] == ["bet-2"]
+
+    response = client.get("/players/1/history?min_id=2&max_id=3")
+    assert [entry["txn_uuid"] for entry in response.json()["history"]] == ["win-1", "bet-2"]
+
+
+def test_get_player_transaction_history_invalid_type(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+
+    response = client.get("/players/1/history?type=rollback")
+    assert response.status_code == 422
+
+
+def test_get_player_stats(test_db):
+    seed_history()
+
+    response = client.get("/players/1/stats")
+    assert response.status_code == 200
+    assert response.json() == {"player_id": 1, "total_wagered": 20, "total_won": 50, "bet_count": 2, "net_ggr": -30}
+
+
+def test_get_player_stats_after_rolled_back_win(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.post("/transactions/win", json={"player_id": 1, "value_win": 50, "txn_uuid": "win-1"})
+    client.post("/transactions/rollback", json={"player_id": 1, "value_bet": 1, "txn_uuid": "win-1"})
+    client.post("/transactions/batch", json={"operations": [
+        {"type": "win", "player_id": 1, "value_win": 20, "txn_uuid": "win-2"},
+        {"type": "rollback", "player_id": 1, "value_bet": 1, "txn_uuid": "win-2"},
+    ]})
+
+    response = client.get("/players/1/stats")
+    assert response.json() == {"player_id": 1, "total_wagered": 0, "total_won": 70, "bet_count": 0, "net_ggr": -70}
+
+
+def test_get_player_stats_matches_the_backfill(test_db):
+    seed_history()
+    client.post("/transactions/bet", json={"player_id": 1, "value_bet": 0, "txn_uuid": "bet-4"})
+    client.post("/transactions/rollback", json={"player_id": 1, "value_bet": 1, "txn_uuid": "win-1"})
+    live = client.get("/players/1/stats").json()
+
+    migration = (Path(__file__).parents[2] / "migrations" / "005_player_stats.sql").read_text()
+    backfill = migration[migration.index("INSERT INTO player_stats"):]
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM player_stats"))
+        connection.execute(text(backfill[:backfill.index(";")]))
+
+    assert client.get("/players/1/stats").json() == live
+
+
+def test_get_player_stats_without_bets(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+
+    response = client.get("/players/1/stats")
+    assert response.status_code == 200
+    assert response.json() == {"player_id": 1, "total_wagered": 0, "total_won": 0, "bet_count": 0, "net_ggr": 0}
+
+
+def test_get_player_stats_not_found(test_db):
+    response = client.get("/players/999/stats")
+    assert response.status_code == 404
+
+
+def test_get_leaderboard(test_db):
+    seed_history()
+    client.post("/players", json={"name": "Pedro da Silva", "balance": 1000})
+    client.post("/transactions/bet", json={"player_id": 2, "value_bet": 100, "txn_uuid": "bet-4"})
+
+    response = client.get("/players/leaderboard?metric=total_wagered&limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metric"] == "total_wagered"
+    assert [(entry["rank"], entry["name"], entry["total_wagered"]) for entry in data["players"]] == [(1, "Pedro da Silva", 100)]
+
+    response = client.get("/players/leaderboard")
+    assert [entry["player_id"] for entry in response.json()["players"]] == [2, 1]
+
+
+def test_get_leaderboard_invalid_metric(test_db):
+    response = client.get("/players/leaderboard?metric=balance")
+    assert response.status_code == 422
+
+
+def test_import_players_csv(test_db):
+    body = "name,balance\nMaria da Silva,1000\n\nPedro da Silva,-5\nJoana,abc\nAna,\"12.5\"\nBroken\n"
+
+    response = client.post("/players/import?format=csv", content=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["imported"], data["rejected"]) == (2, 3)
+    assert [error["line"] for error in data["errors"]] == [4, 5, 7]
+    assert "not valid" in data["errors"][0]["error"]
+
+    players = client.get("/players").json()["players"]
+    assert [(player["name"], player["balance"]) for player in players] == [("Maria da Silva", 1000), ("Ana", 12.5)]
+
+
+def test_import_players_ndjson_in_batches(test_db, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_BATCH_SIZE", 2)
+    lines = [json.dumps({"name": f"Player {i}", "balance": i}) for i in range(5)] + ["[1, 2]", "{"]
+
+    response = client.post("/players/import?format=ndjson", content="\n".join(lines))
+    data = response.json()
+    assert (data["imported"], data["rejected"]) == (5, 2)
+    assert data["errors"] == [
+        {"line": 6, "error": "Line is not a JSON object."},
+        {"line": 7, "error": "Line is not valid JSON."},
+    ]
+    assert client.get("/players/5").json()["balance"] == 4
+
+
+def test_import_players_without_header(test_db):
+    response = client.post("/players/import?format=csv", content="Maria da Silva,1000\n")
+    assert response.status_code == 422
+
+
+def test_export_players(test_db):
+    client.post("/players", json={"name": "Maria da Silva", "balance": 1000})
+    client.post("/players", json={"name": "Silva, Pedro", "balance": 20.5})
+
+    response = client.get("/players/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == 'id,name,balance\n1,Maria da Silva,1000.00\n2,"Silva, Pedro",20.50\n'
+
+    response = client.get("/players/export?format=ndjson")
+    assert [json.loads(line)["balance"] for line in response.text.splitlines()] == [1000, 20.5]
+
+    exported = client.get("/players/export?format=csv").text
+    assert client.post("/players/import?format=csv", content=exported).json()["imported"] == 2
+
+
+def test_export_and_import_players_with_multiline_names(test_db):
+    client.post("/players", json={"name": "Maria\nda \"Silva\"", "balance": 1000})
+    client.post("/players", json={"name": "Pedro", "balance": 20.5})
+
+    exported = client.get("/players/export?format=csv").text
+    client.delete("/players/1")
+    client.delete("/players/2")
+
+    response = client.post("/players/import?format=csv", content=exported)
+    assert response.json() == {"imported": 2, "rejected": 0, "errors": []}
+    players = client.get("/players").json()["players"]
+    assert [(player["name"], player["balance"]) for player in players] == [("Maria\nda \"Silva\"", 1000), ("Pedro", 20.5)]
+
+
+def test_import_players_rejects_long_rows(test_db, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_MAX_ROW_BYTES", 32)
+    body = "name,balance\n" + "x" * 100 + ",1\n\"Ana\n\"\"Silva\"\"\",12\nPedro,-5\nJoana,5\n"
+
+    response = client.post("/players/import?format=csv", content=body)
+    data = response.json()
+    assert (data["imported"], data["rejected"]) == (2, 2)
+    assert [error["line"] for error in data["errors"]] == [2, 5]
+    assert data["errors"][0]["error"] == "Row is longer than 32 bytes."
+    assert [player["name"] for player in client.get("/players").json()["players"]] == ["Ana\n\"Silva\"", "Joana"]
+
+
+def test_import_and_export_player_files(test_db, tmp_path):
+    source = tmp_path / "players.csv"
+    source.write_text("name,balance\nAlice,100\nBob,0.5\n")
+
+    report = asyncio.run(import_file(source, "csv", session_factory=TestingAsyncSessionLocal))
+    assert (report.imported, report.rejected) == (2, 0)
+
+    target = tmp_path / "players.ndjson"
+    asyncio.run(export_file(target, "ndjson", session_factory=TestingAsyncSessionLocal))
+    assert target.read_text().splitlines() == [
+        '{"id":1,"name":"Alice","balance":100.0}',
+        '{"id":2,"name":"Bob","balance":0.5}',
+    ]
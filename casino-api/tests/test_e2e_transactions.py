@@ -1,7 +1,10 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from app.db import Base, get_db_session
 from app.main import app
 import logging
@@ -10,15 +13,14 @@ import logging
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base.metadata.create_all(bind=engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db_session] = override_get_db
 
@@ -104,6 +106,20 @@ def test_negative_bet_value(test_db):
     assert response.status_code == 422
     assert response.json()["detail"] == "Bet value must be positive, not -100.0."
 
+def test_sub_cent_amounts_are_rejected(test_db):
+    player_id = create_player("Alice", 1000.0)
+    response = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 0.004, "txn_uuid": "sub-cent-bet"})
+    assert response.status_code == 422
+
+    response = client.post("/transactions/rollback", json={"player_id": player_id, "value_bet": 0.001, "txn_uuid": "sub-cent-bet"})
+    assert response.status_code == 422
+
+    response = client.post("/transactions/batch", json={"operations": [
+        {"type": "win", "player_id": player_id, "value_win": 1.005, "txn_uuid": "sub-cent-win"},
+    ]})
+    assert response.status_code == 422
+    assert client.get(f"/players/{player_id}/history").json()["history"] == []
+
 def test_duplicate_transaction_uuid(test_db):
     player_id = create_player("Alice", 1000.0)
     txn_uuid = "duplicate-uuid"
@@ -133,3 +149,141 @@ def test_rollback_transaction(test_db):
     data = response_rollback.json()
     assert data["player_id"] == player_id
     assert data["balance"] == 1000.0
+
+def test_rollback_already_cancelled(test_db):
+    player_id = create_player("Alice", 1000.0)
+    txn_uuid = "rollback-twice"
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": txn_uuid})
+    client.post("/transactions/rollback", json={"txn_uuid": txn_uuid, "value_bet": 100.0, "player_id": player_id})
+
+    response = client.post("/transactions/rollback", json={"txn_uuid": txn_uuid, "value_bet": 100.0, "player_id": player_id})
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Error while processing. The transaction {txn_uuid} is already cancelled (rolled_back)."
+
+    response = client.get(f"/players/{player_id}")
+    assert response.status_code == 200
+    assert response.json()["balance"] == 1000.0
+
+def test_duplicate_bet_with_insufficient_balance_is_replayed(test_db):
+    player_id = create_player("Alice", 100.0)
+    response1 = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "all-in"})
+    assert response1.status_code == 200
+
+    response2 = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "all-in"})
+    assert response2.status_code == 200
+    assert response2.json()["id"] == response1.json()["id"]
+    assert response2.json()["balance"] == 0.0
+
+def test_win_nonexistent_player(test_db):
+    response = client.post("/transactions/win", json={"player_id": 999, "value_win": 100.0, "txn_uuid": "ghost-win"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Player with id 999 not found."
+
+def test_retried_bet_is_counted_by_idempotency_metrics(test_db):
+    player_id = create_player("Alice", 1000.0)
+    before = client.get("/metrics/idempotency").json()
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "retried"})
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "retried"})
+
+    response = client.get("/metrics/idempotency")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] == before["hits"] + 1
+    assert data["bloom_negatives"] == before["bloom_negatives"] + 1
+
+def test_retried_bet_and_win_are_counted_as_replays(test_db):
+    player_id = create_player("Alice", 1000.0)
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "replayed-bet"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 50.0, "txn_uuid": "replayed-win"})
+    before = client.get("/metrics").text
+
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 100.0, "txn_uuid": "replayed-bet"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 50.0, "txn_uuid": "replayed-win"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 50.0, "txn_uuid": "replayed-win"})
+    after = client.get("/metrics").text
+
+    def replays(metrics: str, operation: str) -> float:
+        prefix = f'wallet_idempotent_replays_total{{operation="{operation}"}} '
+        return next((float(line[len(prefix):]) for line in metrics.splitlines() if line.startswith(prefix)), 0.0)
+
+    assert replays(after, "bet") == replays(before, "bet") + 1
+    assert replays(after, "win") == replays(before, "win") + 2
+
+def test_read_transactions_paginated(test_db):
+    player_id = create_player("Alice", 1000.0)
+    for i in range(3):
+        client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 10.0, "txn_uuid": f"page-{i}"})
+
+    response = client.get("/transactions?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [transaction["txn_uuid"] for transaction in data["transactions"]] == ["page-0", "page-1"]
+
+    response = client.get(f"/transactions?limit=2&after={data['next_after']}")
+    data = response.json()
+    assert [transaction["txn_uuid"] for transaction in data["transactions"]] == ["page-2"]
+    assert data["next_after"] is None
+
+def test_read_transactions_ndjson(test_db):
+    player_id = create_player("Alice", 1000.0)
+    for i in range(3):
+        client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 10.0, "txn_uuid": f"export-{i}"})
+
+    response = client.get("/transactions?format=ndjson&after=1")
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["txn_uuid"] for line in lines] == ["export-1", "export-2"]
+    assert lines[0]["value_bet"] == 10.0
+
+def test_batch_transactions(test_db):
+    player_id = create_player("Alice", 100.0)
+    operations = [
+        {"type": "bet", "txn_uuid": "batch-bet-1", "player_id": player_id, "value_bet": 30.0},
+        {"type": "win", "txn_uuid": "batch-win-1", "player_id": player_id, "value_win": 5.0},
+        {"type": "bet", "txn_uuid": "batch-bet-2", "player_id": player_id, "value_bet": 500.0},
+        {"type": "rollback", "txn_uuid": "batch-bet-1", "player_id": player_id, "value_bet": 30.0},
+        {"type": "rollback", "txn_uuid": "batch-missing", "player_id": player_id, "value_bet": 10.0},
+        {"type": "bet", "txn_uuid": "batch-bet-3", "player_id": 999, "value_bet": 1.0},
+    ]
+
+    response = client.post("/transactions/batch", json={"operations": operations})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [200, 200, 400, 200, 404, 404]
+    assert [result["balance"] for result in results[:4]] == [70.0, 75.0, None, 105.0]
+    assert results[3]["id"] == results[0]["id"]
+    assert results[4]["detail"] == f"Transaction not found, but stored with id: {results[4]['id']}"
+
+    response = client.get(f"/players/{player_id}")
+    assert response.json()["balance"] == 105.0
+
+def test_batch_transactions_replayed(test_db):
+    player_id = create_player("Alice", 100.0)
+    operations = [
+        {"type": "bet", "txn_uuid": "replay-bet", "player_id": player_id, "value_bet": 40.0},
+        {"type": "win", "txn_uuid": "replay-win", "player_id": player_id, "value_win": 10.0},
+    ]
+    first = client.post("/transactions/batch", json={"operations": operations}).json()["results"]
+    second = client.post("/transactions/batch", json={"operations": operations}).json()["results"]
+
+    assert [result["id"] for result in second] == [result["id"] for result in first]
+    assert [result["status_code"] for result in second] == [200, 200]
+    assert client.get(f"/players/{player_id}").json()["balance"] == 70.0
+
+    response = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 40.0, "txn_uuid": "replay-bet"})
+    assert response.json()["id"] == first[0]["id"]
+    assert response.json()["balance"] == 70.0
+
+def test_batch_transactions_empty(test_db):
+    response = client.post("/transactions/batch", json={"operations": []})
+    assert response.status_code == 422
+
+def test_balance_arithmetic_is_exact(test_db):
+    player_id = create_player("Alice", 0.3)
+    for i in range(3):
+        response = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 0.1, "txn_uuid": f"cents-{i}"})
+        assert response.status_code == 200
+
+    assert response.json()["balance"] == 0.0
+    response = client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 0.01, "txn_uuid": "cents-3"})
+    assert response.status_code == 400
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db import Base, get_db_session
+from app.main import app
+from app.jobs.snapshot_job import take_balance_snapshots
+from app.models.balance_snapshot_model import BalanceSnapshot
+from app.models.ledger_entry_model import LedgerEntry
+from app.repositories.ledger_repository import LedgerRepository
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+Base.metadata.create_all(bind=engine)
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_db_session] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def ledger_entries(player_id: int):
+    with TestingSessionLocal() as db:
+        return db.execute(
+            select(LedgerEntry.entry_type, LedgerEntry.amount, LedgerEntry.balance)
+            .where(LedgerEntry.player_id == player_id)
+            .order_by(LedgerEntry.id)
+        ).all()
+
+async def replay_balance(player_id: int):
+    async with TestingAsyncSessionLocal() as db:
+        return await LedgerRepository().replay_balance(db=db, player_id=player_id)
+
+def test_wallet_operations_are_recorded_in_the_ledger(test_db):
+    player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 30, "txn_uuid": "ledger-bet"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 5, "txn_uuid": "ledger-win"})
+    client.post("/transactions/rollback", json={"player_id": player_id, "value_bet": 30, "txn_uuid": "ledger-bet"})
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 30, "txn_uuid": "ledger-bet"})
+    client.put(f"/players/{player_id}", json={"name": "Alice", "balance": 200})
+
+    assert ledger_entries(player_id) == [
+        ("adjustment", 10000, 10000),
+        ("bet", -3000, 7000),
+        ("win", 500, 7500),
+        ("rollback", 3000, 10500),
+        ("adjustment", 9500, 20000),
+    ]
+
+def test_batch_is_recorded_in_the_ledger(test_db):
+    player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    client.post("/transactions/batch", json={"operations": [
+        {"type": "bet", "txn_uuid": "ledger-batch-bet", "player_id": player_id, "value_bet": 40},
+        {"type": "win", "txn_uuid": "ledger-batch-win", "player_id": player_id, "value_win": 10},
+        {"type": "bet", "txn_uuid": "ledger-batch-short", "player_id": player_id, "value_bet": 500},
+    ]})
+
+    assert ledger_entries(player_id)[1:] == [("bet", -4000, 6000), ("win", 1000, 7000)]
+
+def test_balance_is_replayed_from_snapshot_and_tail(test_db):
+    player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 10, "txn_uuid": "snap-1"})
+
+    assert asyncio.run(take_balance_snapshots(session_factory=TestingAsyncSessionLocal)) == 1
+    with TestingSessionLocal() as db:
+        snapshot = db.get(BalanceSnapshot, player_id)
+        assert snapshot.balance == 9000
+
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 15, "txn_uuid": "snap-2"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 50, "txn_uuid": "snap-3"})
+
+    balance = client.get(f"/players/{player_id}").json()["balance"]
+    assert balance == 125
+    assert asyncio.run(replay_balance(player_id)) == 12500
+
+    assert asyncio.run(take_balance_snapshots(session_factory=TestingAsyncSessionLocal)) == 1
+    assert asyncio.run(take_balance_snapshots(session_factory=TestingAsyncSessionLocal)) == 0
+    assert asyncio.run(replay_balance(player_id)) == 12500
+
+def test_replay_balance_without_history(test_db):
+    assert asyncio.run(replay_balance(999)) is None
@@ -0,0 +1,123 @@
+import asyncio
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db import Base, get_db_session
+from app.main import app
+from app.jobs.player_bulk_job import import_file
+from app.jobs.reconciliation_job import BalanceTotals, group_sums, reconcile_balances
+from app.models.ledger_entry_model import LedgerEntry
+from app.models.player_model import Player
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+Base.metadata.create_all(bind=engine)
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_db_session] = override_get_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def reconcile(**kwargs):
+    return asyncio.run(reconcile_balances(session_factory=TestingAsyncSessionLocal, chunk_size=2, **kwargs))
+
+def set_balance(player_id: int, balance: int):
+    with TestingSessionLocal() as db:
+        db.execute(update(Player).where(Player.id == player_id).values(balance=balance))
+        db.commit()
+
+def test_group_sums_are_exact_per_player():
+    player_ids = np.array([3, 1, 3, 2, 1], dtype=np.int64)
+    amounts = np.array([2**60, -5, 1, 7, 10], dtype=np.int64)
+
+    ids, sums = group_sums(player_ids, amounts)
+
+    assert ids.tolist() == [1, 2, 3]
+    assert sums.tolist() == [5, 7, 2**60 + 1]
+
+def test_balance_totals_grow_with_player_ids():
+    totals = BalanceTotals()
+    totals.add(np.array([2, 2], dtype=np.int64), np.array([100, -30], dtype=np.int64))
+    totals.add(np.array([40], dtype=np.int64), np.array([5], dtype=np.int64))
+
+    assert totals.get(np.array([2, 40, 41, 1000], dtype=np.int64)).tolist() == [70, 5, 0, 0]
+    assert np.flatnonzero(totals.touched).tolist() == [2, 40]
+
+def test_balances_match_the_ledger(test_db):
+    alice = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    bob = client.post("/players", json={"name": "Bob", "balance": 50}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": alice, "value_bet": 30, "txn_uuid": "rec-bet"})
+    client.post("/transactions/win", json={"player_id": alice, "value_win": 5, "txn_uuid": "rec-win"})
+    client.post("/transactions/rollback", json={"player_id": alice, "value_bet": 30, "txn_uuid": "rec-bet"})
+    client.put(f"/players/{bob}", json={"name": "Bob", "balance": 20})
+
+    report = reconcile()
+
+    assert (report.players, report.entries, report.mismatches) == (2, 6, [])
+
+def test_drift_is_reported(test_db):
+    alice = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": alice, "value_bet": 30, "txn_uuid": "rec-bet"})
+    set_balance(alice, 9000)
+
+    assert reconcile().mismatches == [(alice, 9000, 7000)]
+
+def test_incremental_runs_read_new_entries_only(test_db):
+    alice = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": alice, "value_bet": 30, "txn_uuid": "rec-bet-1"})
+    assert reconcile().entries == 2
+
+    client.post("/transactions/bet", json={"player_id": alice, "value_bet": 10, "txn_uuid": "rec-bet-2"})
+    report = reconcile()
+    assert (report.entries, report.mismatches) == (1, [])
+
+    set_balance(alice, 0)
+    assert reconcile().mismatches == [(alice, 0, 6000)]
+    assert reconcile(full=True).entries == 3
+
+def add_entry(ledger_id: int, player_id: int, amount: int):
+    """Commits a ledger entry with a chosen id, as a slow writer would."""
+    with TestingSessionLocal() as db:
+        player = db.get(Player, player_id)
+        player.balance += amount
+        db.add(LedgerEntry(id=ledger_id, player_id=player_id, entry_type="adjustment", amount=amount, balance=player.balance))
+        db.commit()
+
+def test_entries_committed_below_the_checkpoint_are_read(test_db):
+    alice = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    add_entry(3, alice, 500)
+    report = reconcile()
+    assert (report.position, report.entries, report.mismatches) == (3, 2, [])
+
+    add_entry(2, alice, -200)
+    report = reconcile()
+    assert (report.position, report.entries, report.mismatches) == (3, 1, [])
+    assert reconcile().entries == 0
+
+    set_balance(alice, 0)
+    assert reconcile().mismatches == [(alice, 0, 10300)]
+
+def test_imported_players_match_the_ledger(test_db, tmp_path):
+    source = tmp_path / "players.csv"
+    source.write_text("name,balance\nAlice,100\nBob,0.5\n")
+
+    report = asyncio.run(import_file(source, "csv", session_factory=TestingAsyncSessionLocal))
+    assert (report.imported, report.rejected) == (2, 0)
+    assert reconcile().mismatches == []
@@ -0,0 +1,137 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db import Base, get_db_session, get_read_db_connection
+from app.main import app
+from app.jobs.rollup_job import roll_up_ggr, rollup_rows, skipped_ids
+from app.models.ledger_entry_model import LedgerEntry
+from app.rollups import bucket_start
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+read_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool, isolation_level="AUTOCOMMIT")
+
+Base.metadata.create_all(bind=engine)
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+async def override_get_read_db():
+    async with read_engine.connect() as conn:
+        yield conn
+
+app.dependency_overrides[get_db_session] = override_get_db
+app.dependency_overrides[get_read_db_connection] = override_get_read_db
+
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+Entry = namedtuple("Entry", "player_id entry_type amount created_at")
+
+def roll_up(batch_size: int = 100):
+    return asyncio.run(roll_up_ggr(session_factory=TestingAsyncSessionLocal, batch_size=batch_size))
+
+def report_totals(buckets, *columns):
+    # Requests made around a bucket boundary land in two buckets.
+    return tuple(sum(bucket[column] for bucket in buckets) for column in columns)
+
+def report_window():
+    now = datetime.now(timezone.utc)
+    return {"from": (now - timedelta(days=1)).isoformat(), "to": (now + timedelta(days=1)).isoformat()}
+
+def test_bucket_start_truncates_to_utc():
+    moment = datetime(2024, 5, 1, 13, 45, 30, tzinfo=timezone(timedelta(hours=-3)))
+
+    assert bucket_start(moment, "minute") == datetime(2024, 5, 1, 16, 45, tzinfo=timezone.utc)
+    assert bucket_start(moment, "hour") == datetime(2024, 5, 1, 16, tzinfo=timezone.utc)
+    assert bucket_start(moment, "day") == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+def test_rollup_rows_sum_per_player_and_for_all_players():
+    at = datetime(2024, 5, 1, 16, 45, 30)
+    rows = rollup_rows([
+        Entry(1, "adjustment", 10000, at),
+        Entry(1, "bet", -3000, at),
+        Entry(2, "bet", -1000, at + timedelta(minutes=1)),
+        Entry(1, "rollback", 3000, at),
+        Entry(2, "win", 500, at + timedelta(minutes=1)),
+    ])
+
+    by_key = {(row["granularity"], row["player_id"], row["bucket_start"].minute): row for row in rows}
+    assert len(rows) == 2 * 3 + 2 * 2
+    assert by_key[("hour", 0, 0)] == {
+        "granularity": "hour", "player_id": 0, "bucket_start": datetime(2024, 5, 1, 16, tzinfo=timezone.utc),
+        "bet_sum": 4000, "win_sum": 500, "rollback_sum": 3000, "bet_count": 2, "win_count": 1, "rollback_count": 1,
+    }
+    assert by_key[("minute", 0, 46)]["bet_sum"] == 1000
+    assert by_key[("minute", 1, 45)]["rollback_sum"] == 3000
+
+def test_skipped_ids_are_the_holes_in_the_ids_read():
+    assert skipped_ids(3, [4, 7, 8, 10]) == [5, 6, 9]
+    assert skipped_ids(0, [3]) == [1, 2]
+    assert skipped_ids(5, []) == []
+
+def test_ggr_report_is_answered_from_rollups(test_db):
+    player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    other_id = client.post("/players", json={"name": "Bob", "balance": 100}).json()["id"]
+    client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 30, "txn_uuid": "ggr-bet-1"})
+    client.post("/transactions/win", json={"player_id": player_id, "value_win": 5, "txn_uuid": "ggr-win-1"})
+    client.post("/transactions/bet", json={"player_id": other_id, "value_bet": 20, "txn_uuid": "ggr-bet-2"})
+    client.post("/transactions/rollback", json={"player_id": other_id, "value_bet": 20, "txn_uuid": "ggr-bet-2"})
+
+    assert roll_up(batch_size=2) == 6
+    assert roll_up() == 0
+
+    response = client.get("/reports/ggr", params={**report_window(), "granularity": "day"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["granularity"] == "day"
+    assert report_totals(data["buckets"], "bet_sum", "win_sum", "rollback_sum", "ggr", "bet_count") == (50, 5, 20, 25, 2)
+
+    response = client.get("/reports/ggr", params={**report_window(), "granularity": "hour", "player_id": player_id})
+    assert report_totals(response.json()["buckets"], "bet_sum", "win_sum", "ggr") == (30, 5, 25)
+
+def add_bet(ledger_id: int, player_id: int, amount: int):
+    """Commits a bet's ledger entry with a chosen id, as a slow writer would."""
+    with TestingSessionLocal() as db:
+        db.add(LedgerEntry(id=ledger_id, player_id=player_id, entry_type="bet", amount=-amount, balance=0))
+        db.commit()
+
+def test_entries_committed_below_the_checkpoint_are_rolled_up(test_db):
+    player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+    add_bet(4, player_id, 3000)
+    assert roll_up() == 2
+
+    add_bet(3, player_id, 1000)
+    add_bet(5, player_id, 500)
+    assert roll_up(batch_size=1) == 2
+    assert roll_up() == 0
+
+    response = client.get("/reports/ggr", params={**report_window(), "granularity": "day", "player_id": player_id})
+    assert report_totals(response.json()["buckets"], "bet_sum", "bet_count") == (45, 3)
+
+def test_ggr_report_rejects_invalid_ranges(test_db):
+    now = datetime.now(timezone.utc)
+
+    response = client.get("/reports/ggr", params={"from": now.isoformat(), "to": (now - timedelta(hours=1)).isoformat()})
+    assert response.status_code == 422
+
+    response = client.get("/reports/ggr", params={**report_window(), "granularity": "minute"})
+    assert response.status_code == 422
+
+    response = client.get("/reports/ggr", params={**report_window(), "granularity": "week"})
+    assert response.status_code == 422
@@ -2,23 +2,25 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from app.db import Base, get_db_session
 from app.main import app
 from app.models.player_model import Player
 from app.models.transaction_model import Transaction
+from app.money import to_minor_units
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 Base.metadata.create_all(bind=engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 app.dependency_overrides[get_db_session] = override_get_db
 
@@ -31,14 +33,14 @@ def test_db():
     Base.metadata.drop_all(bind=engine)
 
 def create_player(test_db, name: str, balance: float) -> Player:
-    player = Player(name=name, balance=balance)
+    player = Player(name=name, balance=to_minor_units(balance))
     test_db.add(player)
     test_db.commit()
     test_db.refresh(player)
     return player
 
 def create_transaction(test_db, player_id: int, value_bet: float, txn_uuid: str) -> Transaction:
-    transaction = Transaction(player_id=player_id, value_bet=value_bet, txn_uuid=txn_uuid)
+    transaction = Transaction(player_id=player_id, value_bet=to_minor_units(value_bet), txn_uuid=txn_uuid)
     test_db.add(transaction)
     test_db.commit()
     test_db.refresh(transaction)
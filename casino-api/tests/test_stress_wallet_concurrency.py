@@ -0,0 +1,134 @@
+import time
+import anyio
+import httpx
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app import config
+from app.db import Base, get_db_session
+from app.main import app
+from app.player_locks import PlayerLocks
+from app.repositories.wallet_repository import WalletRepository
+from app.container import get_wallet_service, get_wallet_writer
+from app.services.wallet_service import CONCURRENCY_MODES, WalletService
+from app.services.wallet_writer import WalletWriter
+
+
+pytestmark = pytest.mark.anyio
+
+PARALLEL_BETS = 20
+VALUE_BET = 10.0
+INITIAL_BALANCE = 150.0
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+# SQLite ignores FOR UPDATE; taking the write lock when the transaction begins
+# keeps concurrent read-then-write transactions from failing on lock upgrades.
+@event.listens_for(async_engine.sync_engine, "connect")
+def disable_pysqlite_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(async_engine.sync_engine, "begin")
+def begin_immediate(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def stress_db(monkeypatch):
+    # Retries under contention legitimately repeat queries.
+    monkeypatch.setattr(config, "QUERY_GUARD_MODE", "warn")
+    Base.metadata.create_all(bind=engine)
+    previous = app.dependency_overrides.get(get_db_session)
+    app.dependency_overrides[get_db_session] = override_get_db
+    yield
+    if previous is None:
+        app.dependency_overrides.pop(get_db_session, None)
+    else:
+        app.dependency_overrides[get_db_session] = previous
+    app.dependency_overrides.pop(get_wallet_service, None)
+    app.dependency_overrides.pop(get_wallet_writer, None)
+    Base.metadata.drop_all(bind=engine)
+
+
+async def place_parallel_bets(mode: str):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/players", json={"name": "Alice", "balance": INITIAL_BALANCE})
+        player_id = response.json()["id"]
+        statuses = []
+
+        async def place_bet(i: int):
+            response = await client.post(
+                "/transactions/bet",
+                json={"player_id": player_id, "value_bet": VALUE_BET, "txn_uuid": f"{mode}-{i}"},
+            )
+            statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        async with anyio.create_task_group() as tg:
+            for i in range(PARALLEL_BETS):
+                tg.start_soon(place_bet, i)
+        elapsed = time.perf_counter() - started
+
+        balance = (await client.get(f"/players/{player_id}")).json()["balance"]
+    return statuses, balance, elapsed
+
+
+def assert_consistent(statuses, balance):
+    accepted = int(INITIAL_BALANCE // VALUE_BET)
+    assert statuses.count(200) == accepted
+    assert statuses.count(400) == PARALLEL_BETS - accepted
+    assert balance == INITIAL_BALANCE - accepted * VALUE_BET
+
+
+@pytest.mark.parametrize("mode", CONCURRENCY_MODES)
+async def test_parallel_bets_keep_balance_consistent(stress_db, monkeypatch, capsys, mode):
+    wallet_service = WalletService(WalletRepository(), concurrency_mode=mode, player_locks=PlayerLocks(stripes=64))
+    app.dependency_overrides[get_wallet_service] = lambda: wallet_service
+    statuses, balance, elapsed = await place_parallel_bets(mode)
+    assert_consistent(statuses, balance)
+
+    with capsys.disabled():
+        print(f"\n{mode}: {PARALLEL_BETS} parallel bets in {elapsed * 1000:.1f}ms ({PARALLEL_BETS / elapsed:.0f} bets/s)")
+
+
+async def test_group_commit_keeps_balance_consistent(stress_db, monkeypatch, capsys):
+    writer = WalletWriter(
+        WalletService(WalletRepository()),
+        session_factory=TestingAsyncSessionLocal,
+        max_batch=PARALLEL_BETS,
+        max_delay_ms=20,
+    )
+    monkeypatch.setattr(config, "WALLET_GROUP_COMMIT", True)
+    app.dependency_overrides[get_wallet_writer] = lambda: writer
+
+    statuses, balance, elapsed = await place_parallel_bets("group-commit")
+    await writer.stop()
+    assert_consistent(statuses, balance)
+
+    metrics = writer.metrics()
+    assert metrics["operations"] == PARALLEL_BETS
+    assert metrics["flushes"] < PARALLEL_BETS
+
+    with capsys.disabled():
+        print(
+            f"\ngroup-commit: {PARALLEL_BETS} parallel bets in {elapsed * 1000:.1f}ms "
+            f"({metrics['flushes']} flushes, avg batch {metrics['batch_size_avg']:.1f})"
+        )
@@ -0,0 +1,115 @@
+import pytest
+from app.cache.balance_cache import BalanceCache, CachedBalance
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def balance_cache(clock):
+    return BalanceCache(max_size=2, ttl_seconds=10, clock=clock)
+
+
+def test_get_miss_then_hit(balance_cache):
+    assert balance_cache.get(1) is None
+
+    balance_cache.put(1, "Maria da Silva", 1000)
+    entry = balance_cache.get(1)
+
+    assert entry.name == "Maria da Silva"
+    assert entry.balance == 1000
+    assert balance_cache.hits == 1
+    assert balance_cache.misses == 1
+
+
+def test_least_recently_used_entry_is_evicted(balance_cache):
+    balance_cache.put(1, "Maria da Silva", 1000)
+    balance_cache.put(2, "Pedro da Silva", 2000)
+    balance_cache.get(1)
+    balance_cache.put(3, "Jane Doe", 3000)
+
+    assert balance_cache.get(2) is None
+    assert balance_cache.get(1) is not None
+    assert balance_cache.get(3) is not None
+    assert balance_cache.evictions == 1
+    assert balance_cache.metrics()["size"] == 2
+
+
+def test_entries_expire_after_ttl(balance_cache, clock):
+    balance_cache.put(1, "Maria da Silva", 1000)
+    clock.now = 10
+
+    assert balance_cache.get(1) is None
+    assert balance_cache.expirations == 1
+
+
+def test_update_balance_only_refreshes_cached_players(balance_cache):
+    balance_cache.put(1, "Maria da Silva", 1000)
+    balance_cache.update_balance(1, 900)
+    balance_cache.update_balance(2, 500)
+
+    assert balance_cache.get(1).balance == 900
+    assert balance_cache.get(2) is None
+
+
+def test_invalidate(balance_cache):
+    balance_cache.put(1, "Maria da Silva", 1000)
+    balance_cache.invalidate(1)
+
+    assert balance_cache.get(1) is None
+
+
+def test_zero_size_disables_cache(clock):
+    balance_cache = BalanceCache(max_size=0, ttl_seconds=10, clock=clock)
+    balance_cache.put(1, "Maria da Silva", 1000)
+
+    assert balance_cache.get(1) is None
+
+
+def test_fill_caches_the_row_read(balance_cache):
+    generation = balance_cache.begin_fill(1)
+    balance_cache.fill(1, generation, CachedBalance("Maria da Silva", 1000, 0))
+
+    assert balance_cache.get(1).balance == 1000
+
+
+def test_fill_skips_a_row_written_during_the_read(balance_cache):
+    generation = balance_cache.begin_fill(1)
+    balance_cache.update_balance(1, 900)
+    balance_cache.fill(1, generation, CachedBalance("Maria da Silva", 1000, 0))
+
+    assert balance_cache.get(1) is None
+
+
+def test_fill_is_not_affected_by_writes_to_other_players(balance_cache):
+    generation = balance_cache.begin_fill(1)
+    balance_cache.update_balance(2, 900)
+    balance_cache.fill(1, generation, CachedBalance("Maria da Silva", 1000, 0))
+
+    assert balance_cache.get(1).balance == 1000
+
+
+def test_writes_are_forgotten_once_no_fill_is_in_progress(balance_cache):
+    first = balance_cache.begin_fill(1)
+    second = balance_cache.begin_fill(1)
+    balance_cache.invalidate(1)
+    balance_cache.fill(1, first)
+    balance_cache.fill(1, second, CachedBalance("Maria da Silva", 1000, 0))
+
+    assert balance_cache.get(1) is None
+
+    generation = balance_cache.begin_fill(1)
+    balance_cache.fill(1, generation, CachedBalance("Maria da Silva", 900, 0))
+
+    assert balance_cache.get(1).balance == 900
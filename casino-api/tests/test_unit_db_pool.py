@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.db_pool import InstrumentedAsyncPool
+from app.main import app
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def pool_engine():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///./test.db",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    await engine.dispose()
+
+
+async def test_metrics_track_checked_out_and_idle(pool_engine):
+    async with pool_engine.connect():
+        metrics = pool_engine.pool.metrics()
+        assert metrics["checked_out"] == 1
+        assert metrics["pool_size"] == 1
+
+    metrics = pool_engine.pool.metrics()
+    assert metrics["checked_out"] == 0
+    assert metrics["idle"] == 1
+    assert metrics["overflow"] == 0
+    assert metrics["checkouts"] == 1
+
+
+async def test_metrics_record_checkout_wait_and_timeout(pool_engine):
+    async with pool_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            async with pool_engine.connect():
+                pass
+
+    metrics = pool_engine.pool.metrics()
+    assert metrics["checkout_timeouts"] == 1
+    assert metrics["checkout_wait_max_ms"] >= 50
+
+
+def test_db_pool_metrics_endpoint():
+    response = TestClient(app).get("/metrics/db-pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pool_size"] == 5
+    assert data["max_overflow"] == 10
+    assert "checkout_wait_avg_ms" in data
+
+
+def test_read_db_pool_metrics_endpoint():
+    response = TestClient(app).get("/metrics/db-pool/read")
+    assert response.status_code == 200
+    assert response.json()["pool_size"] == 5
@@ -0,0 +1,76 @@
+import pytest
+from app.cache.idempotency_cache import BloomFilter, IdempotencyCache
+
+
+@pytest.fixture
+def idempotency_cache():
+    return IdempotencyCache(max_size=2, bloom_capacity=1000, bloom_error_rate=0.01)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"txn-{i}")
+
+    assert all(f"txn-{i}" in bloom for i in range(1000))
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"txn-{i}")
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives / 10000 < 0.03
+
+
+def test_bloom_filter_starts_over_when_full():
+    bloom = BloomFilter(capacity=10, error_rate=0.01)
+    for i in range(11):
+        bloom.add(f"txn-{i}")
+
+    assert bloom.count == 1
+    assert "txn-10" in bloom
+
+
+def test_remember_then_get(idempotency_cache):
+    idempotency_cache.remember("abcd", transaction_id=1, player_id=2, balance=900)
+
+    result = idempotency_cache.get("abcd")
+
+    assert result.transaction_id == 1
+    assert result.player_id == 2
+    assert result.balance == 900
+    assert idempotency_cache.hits == 1
+
+
+def test_unseen_uuid_skips_lookup(idempotency_cache):
+    assert idempotency_cache.get("abcd") is None
+    assert idempotency_cache.might_exist("abcd") is False
+    assert idempotency_cache.metrics()["bloom_negatives"] == 1
+
+
+def test_evicted_uuid_still_might_exist(idempotency_cache):
+    idempotency_cache.remember("a", 1, 1, 100)
+    idempotency_cache.remember("b", 2, 1, 100)
+    idempotency_cache.remember("c", 3, 1, 100)
+
+    assert idempotency_cache.get("a") is None
+    assert idempotency_cache.might_exist("a") is True
+
+
+def test_false_positive_rate(idempotency_cache):
+    idempotency_cache.mark_seen("abcd")
+    idempotency_cache.might_exist("abcd")
+    idempotency_cache.record_false_positive()
+
+    metrics = idempotency_cache.metrics()
+    assert metrics["bloom_positives"] == 1
+    assert metrics["false_positive_rate"] == 1.0
+
+
+def test_forget(idempotency_cache):
+    idempotency_cache.remember("abcd", 1, 1, 100)
+    idempotency_cache.forget("abcd")
+
+    assert idempotency_cache.get("abcd") is None
@@ -0,0 +1,102 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.main import app
+from app.metrics import (
+    MetricsRegistry,
+    RequestDbStats,
+    db_commits,
+    db_queries,
+    http_request_duration,
+    instrument_engine,
+    request_db_stats,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def metrics_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine, "unit-test")
+    yield engine
+    await engine.dispose()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3.0, "/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 3.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counters_escape_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("name",))
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+
+    assert 'events_total{name="say \\"hi\\""} 3' in registry.render()
+
+
+def test_collectors_expose_numeric_values_as_gauges():
+    registry = MetricsRegistry()
+    registry.register_collector("cache", "Cache usage.", ("pool",), lambda: {("main",): {"size": 3, "name": "lru"}})
+
+    assert registry.render().splitlines() == [
+        "# HELP cache_size Cache usage.",
+        "# TYPE cache_size gauge",
+        'cache_size{pool="main"} 3.0',
+    ]
+
+
+async def test_engine_queries_are_added_to_the_request_stats(metrics_engine):
+    queries, commits = db_queries.get("unit-test"), db_commits.get("unit-test")
+    stats = RequestDbStats()
+    token = request_db_stats.set(stats)
+    try:
+        async with metrics_engine.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    finally:
+        request_db_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.seconds > 0
+    assert db_queries.get("unit-test") == queries + 2
+    assert db_commits.get("unit-test") == commits + 1
+
+
+def test_requests_are_labelled_with_the_route_template():
+    client = TestClient(app)
+    before = http_request_duration.count("GET", "/players/{player_id}", "422")
+    unmatched = http_request_duration.count("GET", "unmatched", "404")
+
+    client.get("/players/not-a-number")
+    client.get("/no-such-route")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert http_request_duration.count("GET", "/players/{player_id}", "422") == before + 1
+    assert http_request_duration.count("GET", "unmatched", "404") == unmatched + 1
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'db_pool_checked_out{pool="write"}' in response.text
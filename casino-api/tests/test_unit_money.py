@@ -0,0 +1,28 @@
+import pytest
+from app.money import to_major_units, to_minor_units
+
+
+def test_to_minor_units():
+    assert to_minor_units(10.5) == 1050
+    assert to_minor_units(0.29) == 29
+    assert to_minor_units(0) == 0
+    assert to_minor_units(-1.25) == -125
+
+
+def test_to_major_units():
+    assert to_major_units(1050) == 10.5
+    assert to_major_units(29) == 0.29
+
+
+def test_round_trip_has_no_drift():
+    balance = to_minor_units(0.3)
+    for _ in range(3):
+        balance -= to_minor_units(0.1)
+    assert balance == 0
+    assert to_major_units(balance) == 0.0
+
+
+def test_to_minor_units_rejects_fractions_of_a_cent():
+    for value in (0.004, 0.001, -1.255, float("inf"), float("nan")):
+        with pytest.raises(ValueError):
+            to_minor_units(value)
@@ -1,6 +1,7 @@
+import json
 import pytest
-from unittest.mock import MagicMock
-from sqlalchemy.orm import Session
+from unittest.mock import AsyncMock
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.player_service import PlayerService
 from app.exceptions.player_not_found_exception import PlayerNotFoundException
 from app.schemas.player_schema import (
@@ -11,9 +12,17 @@ from app.schemas.player_schema import (
 )
 
 
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
 @pytest.fixture
 def mock_player_repository():
-    return MagicMock()
+    return AsyncMock()
 
 
 @pytest.fixture
@@ -21,46 +30,46 @@ def player_service(mock_player_repository):
     return PlayerService(mock_player_repository)
 
 
-def test_create_player(player_service, mock_player_repository):
+async def test_create_player(player_service, mock_player_repository):
     player_create_data = PlayerCreate(name="Maria da Silva", balance=1000)
-    mock_db_session = MagicMock(spec=Session)
+    mock_db_session = AsyncMock(spec=AsyncSession)
 
-    mock_player_repository.create_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=1000)
+    mock_player_repository.create_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=100000)
 
-    created_player = player_service.create_player(db=mock_db_session, player=player_create_data)
+    created_player = await player_service.create_player(db=mock_db_session, player=player_create_data)
 
     assert created_player.id == 1
     assert created_player.name == "Maria da Silva"
     assert created_player.balance == 1000
 
 
-def test_get_player(player_service, mock_player_repository):
-    mock_player_repository.get_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=1000)
+async def test_get_player(player_service, mock_player_repository):
+    mock_player_repository.get_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=100000)
 
-    found_player = player_service.get_player(db=MagicMock(), player_id=1)
+    found_player = await player_service.get_player(db=AsyncMock(), player_id=1)
 
     assert found_player.id == 1
     assert found_player.name == "Maria da Silva"
     assert found_player.balance == 1000
 
 
-def test_delete_player(player_service, mock_player_repository):
-    mock_player_repository.delete_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=1000)
+async def test_delete_player(player_service, mock_player_repository):
+    mock_player_repository.delete_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=100000)
 
-    deleted_player = player_service.delete_player(db=MagicMock(), player_id=1)
+    deleted_player = await player_service.delete_player(db=AsyncMock(), player_id=1)
 
     assert deleted_player.id == 1
     assert deleted_player.name == "Maria da Silva"
     assert deleted_player.balance == 1000
 
 
-def test_get_players(player_service, mock_player_repository):
+async def test_get_players(player_service, mock_player_repository):
     mock_player_repository.get_players.return_value = [
-        PlayerResponse(id=1, name="Maria da Silva", balance=1000),
-        PlayerResponse(id=2, name="Jane Doe", balance=2000)
+        PlayerResponse(id=1, name="Maria da Silva", balance=100000),
+        PlayerResponse(id=2, name="Jane Doe", balance=200000)
     ]
 
-    players = player_service.get_players(db=MagicMock())
+    players = await player_service.get_players(db=AsyncMock())
 
     assert len(players) == 2
     assert players[0].id == 1
@@ -71,32 +80,49 @@ def test_get_players(player_service, mock_player_repository):
     assert players[1].balance == 2000
 
 
-def test_get_player_not_found(player_service, mock_player_repository):
+async def test_get_players_json(player_service, mock_player_repository):
+    mock_player_repository.get_players.return_value = [
+        PlayerResponse(id=1, name="Maria da Silva", balance=100000),
+        PlayerResponse(id=2, name="Jane Doe", balance=200000)
+    ]
+
+    body = json.loads(await player_service.get_players_json(db=AsyncMock(), limit=2))
+
+    assert body == {
+        "players": [
+            {"id": 1, "name": "Maria da Silva", "balance": 1000},
+            {"id": 2, "name": "Jane Doe", "balance": 2000},
+        ],
+        "next_after": 2,
+    }
+
+
+async def test_get_player_not_found(player_service, mock_player_repository):
     mock_player_repository.get_player.side_effect = PlayerNotFoundException(player_id=1)
 
     with pytest.raises(PlayerNotFoundException):
-        player_service.get_player(db=MagicMock(), player_id=1)
+        await player_service.get_player(db=AsyncMock(), player_id=1)
 
 
-def test_update_player(player_service, mock_player_repository):
+async def test_update_player(player_service, mock_player_repository):
     player_update_data = PlayerUpdateRequest(name="Maria da Silva Updated", balance=1500)
-    mock_db_session = MagicMock(spec=Session)
+    mock_db_session = AsyncMock(spec=AsyncSession)
     
-    mock_player_repository.get_player.return_value = PlayerResponse(id=1, name="Maria da Silva", balance=1000)
-    mock_player_repository.update_player.return_value = PlayerUpdateResponse(id=1, name="Maria da Silva Updated", balance=1500)
+    mock_player_repository.update_player.return_value = PlayerUpdateResponse(id=1, name="Maria da Silva Updated", balance=150000)
     
-    updated_player = player_service.update_player(db=mock_db_session, player_id=1, player=player_update_data)
+    updated_player = await player_service.update_player(db=mock_db_session, player_id=1, player=player_update_data)
     
     assert updated_player.id == 1
     assert updated_player.name == "Maria da Silva Updated"
     assert updated_player.balance == 1500
+    mock_player_repository.get_player.assert_not_awaited()
 
 
-def test_update_player_not_found(player_service, mock_player_repository):
+async def test_update_player_not_found(player_service, mock_player_repository):
     player_update_data = PlayerUpdateRequest(name="Maria da Silva Updated", balance=1500)
-    mock_db_session = MagicMock(spec=Session)
+    mock_db_session = AsyncMock(spec=AsyncSession)
     
-    mock_player_repository.get_player.side_effect = PlayerNotFoundException(player_id=1)
+    mock_player_repository.update_player.side_effect = PlayerNotFoundException(player_id=1)
     
     with pytest.raises(PlayerNotFoundException):
-        player_service.update_player(db=mock_db_session, player_id=1, player=player_update_data)
+        await player_service.update_player(db=mock_db_session, player_id=1, player=player_update_data)
@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app import query_guard
+from app.db import Base, get_db_session
+from app.main import app
+from app.query_guard import QueryGuardViolation, QueryLog, capture_queries, record_queries
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_db_session, override_get_db)
+    Base.metadata.create_all(bind=engine)
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_identical_queries_are_reported_as_duplicates():
+    with capture_queries() as log:
+        with TestingSessionLocal() as db:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT :value"), {"value": 1})
+            db.execute(text("SELECT :value"), {"value": 2})
+            db.execute(text("SELECT 1"))
+
+    assert log.count == 4
+    assert log.duplicates() == {("SELECT 1", "()"): 2}
+
+
+def test_rollback_resets_duplicate_detection():
+    log = QueryLog("POST", "/transactions/bet")
+    log.record("SELECT balance FROM players WHERE id = ?", (1,))
+    log.record("ROLLBACK", ())
+    log.rollbacks.append(1)
+    log.record("SELECT balance FROM players WHERE id = ?", (1,))
+
+    assert log.count == 2
+    assert log.duplicates() == {}
+    assert log.problems() == []
+
+
+def test_queries_over_budget_are_reported():
+    log = QueryLog("GET", "/balance")
+    log.record("SELECT 1", ())
+    log.record("SELECT 2", ())
+
+    assert log.problems() == ["GET /balance ran 2 queries, budget is 1"]
+    assert log.problems(budget=2) == []
+
+
+def test_wallet_endpoints_stay_within_their_query_budget(client):
+    with record_queries() as logs:
+        player_id = client.post("/players", json={"name": "Alice", "balance": 100}).json()["id"]
+        client.post("/transactions/bet", json={"player_id": player_id, "value_bet": 10, "txn_uuid": "budget-bet"})
+        client.post("/transactions/win", json={"player_id": player_id, "value_win": 5, "txn_uuid": "budget-win"})
+        client.post("/transactions/rollback", json={"player_id": player_id, "value_bet": 10, "txn_uuid": "budget-bet"})
+        client.put(f"/players/{player_id}", json={"name": "Alice", "balance": 50})
+
+    assert [(log.endpoint, log.count) for log in logs] == [
+        ("POST /players", 2),
+        ("POST /transactions/bet", 4),
+        ("POST /transactions/win", 4),
+        ("POST /transactions/rollback", 4),
+        ("PUT /players/{player_id}", 4),
+    ]
+    assert all(log.duplicates() == {} for log in logs)
+
+
+def test_request_over_budget_fails_in_raise_mode(client, monkeypatch):
+    monkeypatch.setitem(query_guard.QUERY_BUDGETS, "POST /players", 1)
+
+    with pytest.raises(QueryGuardViolation, match="POST /players ran 2 queries, budget is 1"):
+        client.post("/players", json={"name": "Alice", "balance": 100})
+
+
+def test_request_over_budget_gets_an_error_response_in_raise_mode(client, monkeypatch):
+    monkeypatch.setitem(query_guard.QUERY_BUDGETS, "POST /players", 1)
+
+    response = TestClient(app, raise_server_exceptions=False).post("/players", json={"name": "Alice", "balance": 100})
+
+    assert response.status_code == 500
+
+
+def test_bulk_endpoints_are_not_checked():
+    log = QueryLog("POST", "/players/import")
+    log.record("INSERT INTO players (name, balance) VALUES (?, ?)", ())
+    log.record("INSERT INTO players (name, balance) VALUES (?, ?)", ())
+
+    assert log.problems(budget=1) == []
@@ -0,0 +1,26 @@
+import json
+from app.responses import ModelResponse
+from app.schemas.transaction_schema import TransactionBalanceResponse, TransactionBatchResponse, TransactionBatchResult
+
+
+def test_model_response_encodes_model():
+    response = ModelResponse(TransactionBalanceResponse(id=1, player_id=2, balance=10.5, txn_uuid="txn-1"))
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"id": 1, "player_id": 2, "balance": 10.5, "txn_uuid": "txn-1"}
+
+
+def test_model_response_encodes_nested_models():
+    response = ModelResponse(TransactionBatchResponse(results=[
+        TransactionBatchResult(txn_uuid="txn-1", type="bet", status_code=402, player_id=2, detail="Insufficient balance"),
+    ]))
+
+    assert json.loads(response.body) == {"results": [{
+        "txn_uuid": "txn-1",
+        "type": "bet",
+        "status_code": 402,
+        "player_id": 2,
+        "id": None,
+        "balance": None,
+        "detail": "Insufficient balance",
+    }]}
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import config
+from app.db import Base
+from app.db_pool import InstrumentedAsyncPool
+from app.server import cgroup_cpu_limit, server_options, worker_count
+from app.warmup import WRITE_WARMUP_STATEMENTS, warm_up_pool
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_cgroup_cpu_limit_rounds_quota_up(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert cgroup_cpu_limit(str(cpu_max)) == 2
+
+    cpu_max.write_text("max 100000\n")
+    assert cgroup_cpu_limit(str(cpu_max)) is None
+
+    assert cgroup_cpu_limit(str(tmp_path / "missing")) is None
+
+
+def test_worker_count_uses_web_concurrency(monkeypatch):
+    monkeypatch.setattr(config, "WALLET_CONCURRENCY_MODE", "atomic")
+    monkeypatch.setattr(config, "WEB_CONCURRENCY", 3)
+    assert worker_count() == 3
+
+    monkeypatch.setattr(config, "WEB_CONCURRENCY", 0)
+    assert worker_count() >= 1
+
+
+def test_local_lock_mode_runs_a_single_worker(monkeypatch):
+    monkeypatch.setattr(config, "WALLET_CONCURRENCY_MODE", "local_lock")
+    monkeypatch.setattr(config, "WEB_CONCURRENCY", 4)
+    assert worker_count() == 1
+
+
+def test_server_options_use_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(config, "WEB_CONCURRENCY", 2)
+    options = server_options()
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["timeout_graceful_shutdown"] == config.SERVER_GRACEFUL_SHUTDOWN_SECONDS
+
+
+@pytest.mark.anyio
+async def test_warm_up_pool_opens_every_connection(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warmup.db'}", poolclass=InstrumentedAsyncPool, pool_size=3, max_overflow=0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    await warm_up_pool(engine, 3, WRITE_WARMUP_STATEMENTS)
+
+    metrics = engine.pool.metrics()
+    assert metrics["idle"] == 3
+    assert metrics["checked_out"] == 0
+    await engine.dispose()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from app.container import get_container, get_wallet_service
+from app.main import app
+from benchmarks.startup_benchmark import compare_results, summarize
+
+
+def test_container_is_built_once():
+    container = get_container()
+
+    assert get_container() is container
+    assert container.wallet_writer.wallet_service is container.wallet_service
+
+
+def test_routes_resolve_services_from_the_container():
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/transactions/bet")
+    dependencies = {dependency.call for dependency in route.dependant.dependencies}
+
+    assert get_wallet_service in dependencies
+
+
+def test_optional_modules_are_not_imported_with_the_app():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(sorted({'app.jobs.snapshot_job', 'app.jobs.rollup_job', 'app.warmup'} & set(sys.modules)))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_container_imports_services_on_first_use():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.container; print(sorted(m for m in sys.modules if m.startswith('app.services')))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_startup_metrics_report_import_time():
+    response = TestClient(app).get("/metrics/startup")
+
+    assert response.status_code == 200
+    assert response.json()["import_seconds"] > 0
+
+
+def test_compare_results_flags_slower_startup():
+    baseline = {"timings": summarize([{"cold_start_seconds": 1.0, "ready_seconds": 0.9, "import_seconds": 0.5,
+                                       "startup_seconds": 0.1, "warmup_seconds": 0.05}])}
+    current = {"timings": summarize([{"cold_start_seconds": 1.5, "ready_seconds": 0.95, "import_seconds": 0.5,
+                                      "startup_seconds": 0.1, "warmup_seconds": 0.05}])}
+
+    assert compare_results(baseline, current, tolerance=0.2) == ["cold_start_seconds: median 1.0s -> 1.5s"]
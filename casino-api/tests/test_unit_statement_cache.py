@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.db import Base
+from app.models.player_model import Player
+from app.models.transaction_model import Transaction
+from app.repositories.player_repository import PlayerRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.wallet_repository import WalletRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def cache_engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all([Player(id=1, name="Alice", balance=1000), Player(id=2, name="Bob", balance=500)])
+        db.add_all(Transaction(txn_uuid=f"txn-{i}", player_id=i % 2 + 1, value_bet=10) for i in range(6))
+        await db.commit()
+    yield engine, session_factory
+    await engine.dispose()
+
+
+async def test_hot_lookups_compile_once_for_any_value(cache_engine):
+    engine, session_factory = cache_engine
+    players, transactions, wallet = PlayerRepository(), TransactionRepository(), WalletRepository()
+
+    async def lookups(db, player_id: int, txn_uuid: str, after: int):
+        return (
+            (await players.get_player(db=db, player_id=player_id)).name,
+            (await transactions.get_transaction_by_uuid(db=db, txn_uuid=txn_uuid)).player_id,
+            await wallet.debit_player(db=db, player_id=player_id, amount=1),
+            [row.id for row in await transactions.get_player_history(db=db, player_id=player_id, limit=2, after=after)],
+        )
+
+    async with session_factory() as db:
+        assert await lookups(db, 1, "txn-0", 0) == ("Alice", 1, 999, [1, 3])
+        compiled = len(engine.sync_engine._compiled_cache)
+        assert await lookups(db, 2, "txn-3", 2) == ("Bob", 2, 499, [4, 6])
+        await db.rollback()
+
+    assert len(engine.sync_engine._compiled_cache) == compiled
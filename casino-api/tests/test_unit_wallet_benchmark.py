@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app import config
+from app.db import Base, get_db_session, get_read_db_connection
+from app.main import app
+from benchmarks.wallet_benchmark import (
+    BenchmarkSettings,
+    WalletLoad,
+    compare_results,
+    parse_mix,
+    percentile,
+    run_benchmark,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+async def override_get_read_db():
+    async with async_engine.connect() as conn:
+        yield conn
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def benchmark_db(monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOT_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(config, "ROLLUP_INTERVAL_SECONDS", 0)
+    monkeypatch.setitem(app.dependency_overrides, get_db_session, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, get_read_db_connection, override_get_read_db)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def result(rps: float, p99_ms: float) -> dict:
+    return {"rps": rps, "p99_ms": p99_ms}
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 0.50) == 51.0
+    assert percentile(samples, 0.99) == 100.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_parse_mix_rejects_unknown_operations():
+    assert parse_mix("bet=3, balance=1") == {"bet": 3, "balance": 1}
+    with pytest.raises(ValueError):
+        parse_mix("deposit=1")
+
+
+def test_compare_results_reports_slower_endpoints():
+    baseline = {"overall": result(1000, 10), "endpoints": {"bet": result(500, 10), "balance": result(500, 2)}}
+    current = {"overall": result(950, 10.5), "endpoints": {"bet": result(300, 10), "balance": result(500, 5)}}
+
+    assert compare_results(baseline, current, tolerance=0.10) == [
+        "bet: rps 500 -> 300",
+        "balance: p99 2ms -> 5ms",
+    ]
+
+
+def test_hot_players_receive_most_of_the_traffic():
+    settings = BenchmarkSettings(hot_players=0.1, hot_share=0.9, seed=7)
+    load = WalletLoad(client=None, settings=settings, player_ids=list(range(1, 101)))
+
+    picks = [load.pick_player() for _ in range(1000)]
+
+    assert sum(1 for player_id in picks if player_id <= 10) > 850
+
+
+async def test_run_benchmark_reports_every_operation(benchmark_db):
+    settings = BenchmarkSettings(requests=60, concurrency=1, players=3, seed=1)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results = await run_benchmark(client, settings)
+
+    assert results["overall"]["requests"] == 60
+    assert results["overall"]["errors"] == 0
+    assert set(results["endpoints"]) == {"bet", "win", "rollback", "balance", "history"}
+    assert all(endpoint["p99_ms"] >= endpoint["p50_ms"] for endpoint in results["endpoints"].values())
@@ -0,0 +1,274 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.wallet_service import WalletService, ledger_entry, player_stats_changes
+from app.cache.balance_cache import BalanceCache
+from app.cache.idempotency_cache import IdempotencyCache
+from app.player_locks import PlayerLocks
+from app.exceptions.player_not_found_exception import PlayerNotFoundException
+from app.exceptions.insufficient_balance_exception import InsufficientBalanceException
+from app.exceptions.already_cancelled_exception import AlreadyCancelledException
+from app.exceptions.rollback_stored_exception import RollbackStoredException
+from app.schemas.transaction_schema import (
+    TransactionCreate,
+    TransactionWin,
+    TransactionCancelled,
+    TransactionBatchOperation,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mock_wallet_repository():
+    return AsyncMock()
+
+
+@pytest.fixture
+def wallet_service(mock_wallet_repository):
+    return WalletService(
+        mock_wallet_repository,
+        BalanceCache(max_size=100, ttl_seconds=60),
+        IdempotencyCache(max_size=100, bloom_capacity=1000, bloom_error_rate=0.01),
+    )
+
+
+async def test_bet(wallet_service, mock_wallet_repository):
+    mock_db_session = AsyncMock(spec=AsyncSession)
+    mock_wallet_repository.debit_player.return_value = 90000
+    mock_wallet_repository.insert_transaction.return_value = 1
+
+    response = await wallet_service.bet(db=mock_db_session, transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    assert response.id == 1
+    assert response.player_id == 1
+    assert response.balance == 900
+    assert response.txn_uuid == "1234"
+    mock_db_session.commit.assert_awaited_once()
+
+
+async def test_bet_replay(wallet_service, mock_wallet_repository):
+    mock_db_session = AsyncMock(spec=AsyncSession)
+    mock_wallet_repository.debit_player.return_value = 80000
+    mock_wallet_repository.insert_transaction.return_value = None
+    mock_wallet_repository.get_player_balance.return_value = 90000
+    mock_wallet_repository.get_transaction_id.return_value = 1
+
+    response = await wallet_service.bet(db=mock_db_session, transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    assert response.id == 1
+    assert response.balance == 900
+    mock_db_session.rollback.assert_awaited_once()
+    mock_db_session.commit.assert_not_awaited()
+
+
+async def test_bet_insufficient_balance(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.debit_player.return_value = None
+    mock_wallet_repository.get_player_balance.return_value = 5000
+    mock_wallet_repository.get_transaction_id.return_value = None
+
+    with pytest.raises(InsufficientBalanceException):
+        await wallet_service.bet(db=AsyncMock(), transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+
+async def test_bet_player_not_found(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.debit_player.return_value = None
+    mock_wallet_repository.get_player_balance.return_value = None
+
+    with pytest.raises(PlayerNotFoundException):
+        await wallet_service.bet(db=AsyncMock(), transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+
+async def test_win(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.credit_player.return_value = 150000
+    mock_wallet_repository.insert_transaction.return_value = 2
+
+    response = await wallet_service.win(db=AsyncMock(), transaction=TransactionWin(player_id=1, value_win=500, txn_uuid="5678"))
+
+    assert response.id == 2
+    assert response.balance == 1500
+
+
+async def test_win_player_not_found(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.credit_player.return_value = None
+
+    with pytest.raises(PlayerNotFoundException):
+        await wallet_service.win(db=AsyncMock(), transaction=TransactionWin(player_id=1, value_win=500, txn_uuid="5678"))
+
+
+async def test_rollback(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.mark_rolled_back.return_value = (1, 10000)
+    mock_wallet_repository.credit_player.return_value = 100000
+
+    response = await wallet_service.rollback(db=AsyncMock(), transaction=TransactionCancelled(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    assert response.player_id == 1
+    assert response.balance == 1000
+    mock_wallet_repository.credit_player.assert_called_once()
+
+
+async def test_rollback_already_cancelled(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.mark_rolled_back.return_value = None
+    mock_wallet_repository.get_transaction_id.return_value = 1
+
+    with pytest.raises(AlreadyCancelledException):
+        await wallet_service.rollback(db=AsyncMock(), transaction=TransactionCancelled(player_id=1, value_bet=100, txn_uuid="1234"))
+
+
+async def test_rollback_not_found_is_stored(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.mark_rolled_back.return_value = None
+    mock_wallet_repository.get_transaction_id.return_value = None
+    mock_wallet_repository.insert_transaction.return_value = 7
+
+    with pytest.raises(RollbackStoredException) as e:
+        await wallet_service.rollback(db=AsyncMock(), transaction=TransactionCancelled(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    assert e.value.detail == "Transaction not found, but stored with id: 7"
+
+
+async def test_first_attempt_skips_idempotency_lookup(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.debit_player.return_value = 90000
+    mock_wallet_repository.insert_transaction.return_value = 1
+
+    await wallet_service.bet(db=AsyncMock(), transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    mock_wallet_repository.get_transaction_id.assert_not_awaited()
+
+
+async def test_retry_is_answered_without_database(wallet_service, mock_wallet_repository):
+    mock_wallet_repository.debit_player.return_value = 90000
+    mock_wallet_repository.insert_transaction.return_value = 1
+    transaction = TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234")
+    await wallet_service.bet(db=AsyncMock(), transaction=transaction)
+    mock_wallet_repository.reset_mock()
+
+    response = await wallet_service.bet(db=AsyncMock(), transaction=transaction)
+
+    assert response.id == 1
+    assert response.balance == 900
+    assert mock_wallet_repository.mock_calls == []
+
+
+def make_wallet_service(mock_wallet_repository, concurrency_mode, **kwargs):
+    return WalletService(
+        mock_wallet_repository,
+        BalanceCache(max_size=100, ttl_seconds=60),
+        IdempotencyCache(max_size=100, bloom_capacity=1000, bloom_error_rate=0.01),
+        concurrency_mode=concurrency_mode,
+        **kwargs,
+    )
+
+
+async def test_bet_optimistic_retries_on_version_conflict(mock_wallet_repository):
+    wallet_service = make_wallet_service(mock_wallet_repository, "optimistic")
+    mock_db_session = AsyncMock(spec=AsyncSession)
+    mock_wallet_repository.get_player_balance_version.side_effect = [(100000, 1), (95000, 2)]
+    mock_wallet_repository.set_player_balance.side_effect = [None, 85000]
+    mock_wallet_repository.insert_transaction.return_value = 1
+
+    response = await wallet_service.bet(db=mock_db_session, transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    assert response.balance == 850
+    mock_wallet_repository.set_player_balance.assert_awaited_with(db=mock_db_session, player_id=1, balance=85000, expected_version=2)
+    mock_wallet_repository.debit_player.assert_not_awaited()
+
+
+async def test_bet_row_lock_insufficient_balance(mock_wallet_repository):
+    wallet_service = make_wallet_service(mock_wallet_repository, "row_lock")
+    mock_db_session = AsyncMock(spec=AsyncSession)
+    mock_wallet_repository.get_player_balance_version.return_value = (5000, 1)
+    mock_wallet_repository.get_player_balance.return_value = 5000
+    mock_wallet_repository.get_transaction_id.return_value = None
+
+    with pytest.raises(InsufficientBalanceException):
+        await wallet_service.bet(db=mock_db_session, transaction=TransactionCreate(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    mock_wallet_repository.get_player_balance_version.assert_awaited_with(db=mock_db_session, player_id=1, for_update=True)
+    mock_wallet_repository.set_player_balance.assert_not_awaited()
+
+
+def test_unknown_concurrency_mode(mock_wallet_repository):
+    with pytest.raises(ValueError):
+        make_wallet_service(mock_wallet_repository, "pessimistic")
+
+
+class RecordingLocks(PlayerLocks):
+
+    def __init__(self):
+        super().__init__(stripes=16)
+        self.held = []
+
+    def hold(self, player_ids):
+        self.held.append(sorted(set(player_ids)))
+        return super().hold(player_ids)
+
+
+async def test_rollback_local_lock_holds_the_stored_player(mock_wallet_repository):
+    locks = RecordingLocks()
+    wallet_service = make_wallet_service(mock_wallet_repository, "local_lock", player_locks=locks)
+    mock_wallet_repository.get_transaction_players.side_effect = [[], [2]]
+    mock_wallet_repository.mark_rolled_back.return_value = (2, 10000)
+    mock_wallet_repository.get_player_balance_version.return_value = (90000, 1)
+    mock_wallet_repository.set_player_balance.return_value = 100000
+
+    response = await wallet_service.rollback(db=AsyncMock(), transaction=TransactionCancelled(player_id=1, value_bet=100, txn_uuid="1234"))
+
+    # The first attempt found the transaction stored for player 2 only once
+    # holding player 1's lock, so it wrote nothing and locked again.
+    assert locks.held == [[1], [1, 2]]
+    assert response.player_id == 2
+    mock_wallet_repository.set_player_balance.assert_awaited_once()
+
+
+async def test_batch_rollback_local_lock_holds_the_stored_player(mock_wallet_repository):
+    locks = RecordingLocks()
+    wallet_service = make_wallet_service(mock_wallet_repository, "local_lock", player_locks=locks)
+    mock_wallet_repository.get_transaction_players.side_effect = [[], [2]]
+    mock_wallet_repository.lock_transactions.return_value = [
+        SimpleNamespace(id=5, txn_uuid="1234", player_id=2, value_bet=10000, rolled_back=False)
+    ]
+    mock_wallet_repository.lock_players.side_effect = lambda **kwargs: {1: 0, 2: 90000}
+    mock_wallet_repository.mark_many_rolled_back.return_value = ["1234"]
+    mock_wallet_repository.apply_balance_deltas.return_value = {2: 100000}
+
+    results = await wallet_service.batch(db=AsyncMock(), operations=[
+        TransactionBatchOperation(type="rollback", player_id=1, value_bet=100, txn_uuid="1234")
+    ])
+
+    assert locks.held == [[1], [1, 2]]
+    assert (results[0].player_id, results[0].balance) == (2, 1000)
+    mock_wallet_repository.apply_balance_deltas.assert_awaited_once()
+
+
+def test_player_stats_changes_sum_entries_per_player():
+    entries = [
+        ledger_entry(2, "bet-1", "bet", -1000, 0),
+        ledger_entry(1, "bet-2", "bet", -500, 0),
+        ledger_entry(1, "win-1", "win", 2000, 0),
+        ledger_entry(1, "bet-2", "rollback", 500, 0),
+    ]
+
+    assert player_stats_changes(entries) == [
+        {"player_id": 1, "total_wagered": 0, "total_won": 2000, "bet_count": 0, "net_ggr": -2000},
+        {"player_id": 2, "total_wagered": 1000, "total_won": 0, "bet_count": 1, "net_ggr": 1000},
+    ]
+
+
+def test_player_stats_changes_skip_zero_bets_and_rolled_back_wins():
+    entries = [
+        ledger_entry(1, "bet-1", "bet", 0, 0),
+        ledger_entry(1, "win-1", "win", 2000, 0),
+        ledger_entry(1, "win-1", "rollback", 0, 0),
+        ledger_entry(2, "bet-1", "rollback", 0, 0),
+    ]
+
+    assert player_stats_changes(entries) == [
+        {"player_id": 1, "total_wagered": 0, "total_won": 2000, "bet_count": 0, "net_ggr": -2000},
+    ]
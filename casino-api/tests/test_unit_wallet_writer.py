@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from app.services.wallet_writer import WalletWriter
+from app.schemas.transaction_schema import TransactionBatchOperation, TransactionBatchResult
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@asynccontextmanager
+async def fake_session_factory():
+    yield AsyncMock()
+
+
+def operation(i: int) -> TransactionBatchOperation:
+    return TransactionBatchOperation(type="bet", txn_uuid=f"uuid-{i}", player_id=1, value_bet=1)
+
+
+async def apply_batch(db, operations):
+    return [
+        TransactionBatchResult(txn_uuid=op.txn_uuid, type=op.type, status_code=200, player_id=op.player_id, id=i)
+        for i, op in enumerate(operations)
+    ]
+
+
+async def test_concurrent_operations_share_a_flush():
+    wallet_service = AsyncMock()
+    wallet_service.batch.side_effect = apply_batch
+    writer = WalletWriter(wallet_service, session_factory=fake_session_factory, max_batch=3, max_delay_ms=50)
+
+    results = await asyncio.gather(*(writer.submit(operation(i)) for i in range(5)))
+    await writer.stop()
+
+    assert [result.txn_uuid for result in results] == [f"uuid-{i}" for i in range(5)]
+    assert [len(call.kwargs["operations"]) for call in wallet_service.batch.await_args_list] == [3, 2]
+    metrics = writer.metrics()
+    assert metrics["flushes"] == 2
+    assert metrics["operations"] == 5
+    assert metrics["batch_size_max"] == 3
+    assert metrics["queue_depth"] == 0
+    assert metrics["enabled"] is False
+
+
+async def test_failed_flush_fails_every_caller():
+    wallet_service = AsyncMock()
+    wallet_service.batch.side_effect = RuntimeError("database is down")
+    writer = WalletWriter(wallet_service, session_factory=fake_session_factory, max_batch=10, max_delay_ms=10)
+
+    results = await asyncio.gather(*(writer.submit(operation(i)) for i in range(2)), return_exceptions=True)
+    await writer.stop()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert writer.metrics()["failed_flushes"] == 1
+
+
+async def test_stop_applies_queued_operations():
+    wallet_service = AsyncMock()
+    wallet_service.batch.side_effect = apply_batch
+    writer = WalletWriter(wallet_service, session_factory=fake_session_factory, max_batch=10, max_delay_ms=1000)
+
+    pending = asyncio.ensure_future(writer.submit(operation(1)))
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    assert (await pending).txn_uuid == "uuid-1"
@@ -1,10 +1,12 @@
 \c casino;
 
 
+-- Money columns hold integer minor units (cents).
 CREATE TABLE players (
     id SERIAL PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
-    balance FLOAT DEFAULT 0.0
+    balance BIGINT DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
 );
 
 
@@ -12,7 +14,107 @@ CREATE TABLE transactions (
     id SERIAL PRIMARY KEY,
     txn_uuid VARCHAR(255) UNIQUE NOT NULL,
     player_id INTEGER NOT NULL REFERENCES players(id),
-    value_bet FLOAT DEFAULT 0.0,
-	value_win FLOAT DEFAULT 0.0,
-    rolled_back BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+    value_bet BIGINT DEFAULT 0,
+	value_win BIGINT DEFAULT 0,
+    rolled_back BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX ix_transactions_player_id_id ON transactions (player_id, id DESC);
+
+
+-- Append-only record of every balance change, partitioned by month. The
+-- snapshot job creates upcoming partitions; the default one only catches
+-- rows for months it has not created yet.
+CREATE TABLE ledger_entries (
+    id BIGSERIAL,
+    player_id INTEGER NOT NULL,
+    txn_uuid VARCHAR(255),
+    entry_type VARCHAR(16) NOT NULL,
+    amount BIGINT NOT NULL,
+    balance BIGINT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX ix_ledger_entries_player_id_id ON ledger_entries (player_id, id);
+
+CREATE TABLE ledger_entries_default PARTITION OF ledger_entries DEFAULT;
+
+DO $$
+DECLARE
+    month DATE := date_trunc('month', now());
+BEGIN
+    FOR i IN 0..2 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS ledger_entries_y%sm%s PARTITION OF ledger_entries FOR VALUES FROM (%L) TO (%L)',
+            to_char(month, 'YYYY'), to_char(month, 'MM'), month, month + INTERVAL '1 month'
+        );
+        month := month + INTERVAL '1 month';
+    END LOOP;
+END $$;
+
+
+-- Latest checkpoint of each player's balance in the ledger.
+CREATE TABLE balance_snapshots (
+    player_id INTEGER PRIMARY KEY,
+    balance BIGINT NOT NULL,
+    ledger_entry_id BIGINT NOT NULL,
+    taken_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+
+-- Running totals kept up to date by every bet, win and rollback. Money
+-- totals are minor units; net_ggr is wagered minus won.
+CREATE TABLE player_stats (
+    player_id INTEGER PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+    total_wagered BIGINT NOT NULL DEFAULT 0,
+    total_won BIGINT NOT NULL DEFAULT 0,
+    bet_count INTEGER NOT NULL DEFAULT 0,
+    net_ggr BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX ix_player_stats_total_wagered ON player_stats (total_wagered DESC, player_id);
+CREATE INDEX ix_player_stats_total_won ON player_stats (total_won DESC, player_id);
+CREATE INDEX ix_player_stats_bet_count ON player_stats (bet_count DESC, player_id);
+CREATE INDEX ix_player_stats_net_ggr ON player_stats (net_ggr DESC, player_id);
+
+
+-- Sums per granularity (minute, hour, day), player (0 for all players) and
+-- bucket, in minor units. GGR is bet_sum - win_sum - rollback_sum.
+CREATE TABLE ggr_rollups (
+    granularity VARCHAR(8) NOT NULL,
+    player_id INTEGER NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    bet_sum BIGINT NOT NULL DEFAULT 0,
+    win_sum BIGINT NOT NULL DEFAULT 0,
+    rollback_sum BIGINT NOT NULL DEFAULT 0,
+    bet_count INTEGER NOT NULL DEFAULT 0,
+    win_count INTEGER NOT NULL DEFAULT 0,
+    rollback_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, player_id, bucket_start)
+);
+
+
+-- Last ledger entry each background job has processed.
+CREATE TABLE job_checkpoints (
+    name VARCHAR(64) PRIMARY KEY,
+    position BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+
+-- Ledger ids missing below a job's checkpoint, read once they commit.
+CREATE TABLE ledger_gaps (
+    job VARCHAR(64) NOT NULL,
+    ledger_id BIGINT NOT NULL,
+    seen_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (job, ledger_id)
+);
+
+
+-- Sum of each player's ledger amounts up to the reconciliation checkpoint.
+CREATE TABLE reconciled_balances (
+    player_id INTEGER PRIMARY KEY,
+    balance BIGINT NOT NULL
+);
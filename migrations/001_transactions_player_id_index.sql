@@ -0,0 +1,3 @@
+-- Serves GET /players/{player_id}/history without scanning the whole table.
+-- CONCURRENTLY cannot run inside a transaction block; apply with psql directly.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_player_id_id ON transactions (player_id, id DESC);
@@ -0,0 +1,2 @@
+-- Version counter checked by WALLET_CONCURRENCY_MODE=optimistic.
+ALTER TABLE players ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
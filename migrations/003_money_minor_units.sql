@@ -0,0 +1,19 @@
+-- Stores money as BIGINT minor units (cents) instead of FLOAT.
+-- Rewrites both tables under an exclusive lock: stop the API, apply this
+-- migration and start the version that reads minor units.
+BEGIN;
+
+ALTER TABLE players
+    ALTER COLUMN balance DROP DEFAULT,
+    ALTER COLUMN balance TYPE BIGINT USING round(balance * 100)::BIGINT,
+    ALTER COLUMN balance SET DEFAULT 0;
+
+ALTER TABLE transactions
+    ALTER COLUMN value_bet DROP DEFAULT,
+    ALTER COLUMN value_bet TYPE BIGINT USING round(value_bet * 100)::BIGINT,
+    ALTER COLUMN value_bet SET DEFAULT 0,
+    ALTER COLUMN value_win DROP DEFAULT,
+    ALTER COLUMN value_win TYPE BIGINT USING round(value_win * 100)::BIGINT,
+    ALTER COLUMN value_win SET DEFAULT 0;
+
+COMMIT;
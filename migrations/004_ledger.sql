@@ -0,0 +1,48 @@
+-- Adds the append-only ledger and balance snapshots. Existing balances
+-- are seeded as one adjustment entry per player so the ledger sums to them.
+BEGIN;
+
+-- Append-only record of every balance change, partitioned by month. The
+-- snapshot job creates upcoming partitions; the default one only catches
+-- rows for months it has not created yet.
+CREATE TABLE ledger_entries (
+    id BIGSERIAL,
+    player_id INTEGER NOT NULL,
+    txn_uuid VARCHAR(255),
+    entry_type VARCHAR(16) NOT NULL,
+    amount BIGINT NOT NULL,
+    balance BIGINT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX ix_ledger_entries_player_id_id ON ledger_entries (player_id, id);
+
+CREATE TABLE ledger_entries_default PARTITION OF ledger_entries DEFAULT;
+
+DO $$
+DECLARE
+    month DATE := date_trunc('month', now());
+BEGIN
+    FOR i IN 0..2 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS ledger_entries_y%sm%s PARTITION OF ledger_entries FOR VALUES FROM (%L) TO (%L)',
+            to_char(month, 'YYYY'), to_char(month, 'MM'), month, month + INTERVAL '1 month'
+        );
+        month := month + INTERVAL '1 month';
+    END LOOP;
+END $$;
+
+
+-- Latest checkpoint of each player's balance in the ledger.
+CREATE TABLE balance_snapshots (
+    player_id INTEGER PRIMARY KEY,
+    balance BIGINT NOT NULL,
+    ledger_entry_id BIGINT NOT NULL,
+    taken_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO ledger_entries (player_id, entry_type, amount, balance)
+SELECT id, 'adjustment', balance, balance FROM players;
+
+COMMIT;
@@ -0,0 +1,31 @@
+-- Adds the per-player wagering totals behind /players/{id}/stats and the
+-- leaderboards, backfilled from the transactions recorded so far.
+BEGIN;
+
+-- Running totals kept up to date by every bet, win and rollback. Money
+-- totals are minor units; net_ggr is wagered minus won.
+CREATE TABLE player_stats (
+    player_id INTEGER PRIMARY KEY REFERENCES players(id) ON DELETE CASCADE,
+    total_wagered BIGINT NOT NULL DEFAULT 0,
+    total_won BIGINT NOT NULL DEFAULT 0,
+    bet_count INTEGER NOT NULL DEFAULT 0,
+    net_ggr BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX ix_player_stats_total_wagered ON player_stats (total_wagered DESC, player_id);
+CREATE INDEX ix_player_stats_total_won ON player_stats (total_won DESC, player_id);
+CREATE INDEX ix_player_stats_bet_count ON player_stats (bet_count DESC, player_id);
+CREATE INDEX ix_player_stats_net_ggr ON player_stats (net_ggr DESC, player_id);
+
+-- Rolled back bets no longer count as wagered.
+INSERT INTO player_stats (player_id, total_wagered, total_won, bet_count, net_ggr)
+SELECT
+    player_id,
+    sum(CASE WHEN rolled_back THEN 0 ELSE value_bet END),
+    sum(value_win),
+    count(*) FILTER (WHERE value_bet > 0 AND NOT rolled_back),
+    sum(CASE WHEN rolled_back THEN 0 ELSE value_bet END) - sum(value_win)
+FROM transactions
+GROUP BY player_id;
+
+COMMIT;
@@ -0,0 +1,37 @@
+-- Timestamps transactions and adds the time-bucketed GGR rollups behind
+-- /reports/ggr. The rollup job fills the buckets from the whole ledger on
+-- its first run; bets and wins older than the ledger are not rolled up.
+BEGIN;
+
+-- Existing rows take the time of their ledger entry, or of this migration
+-- when they predate the ledger.
+ALTER TABLE transactions ADD COLUMN created_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+UPDATE transactions t
+SET created_at = l.created_at
+FROM ledger_entries l
+WHERE l.txn_uuid = t.txn_uuid AND l.entry_type IN ('bet', 'win');
+
+-- Sums per granularity (minute, hour, day), player (0 for all players) and
+-- bucket, in minor units. GGR is bet_sum - win_sum - rollback_sum.
+CREATE TABLE ggr_rollups (
+    granularity VARCHAR(8) NOT NULL,
+    player_id INTEGER NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    bet_sum BIGINT NOT NULL DEFAULT 0,
+    win_sum BIGINT NOT NULL DEFAULT 0,
+    rollback_sum BIGINT NOT NULL DEFAULT 0,
+    bet_count INTEGER NOT NULL DEFAULT 0,
+    win_count INTEGER NOT NULL DEFAULT 0,
+    rollback_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, player_id, bucket_start)
+);
+
+-- Last ledger entry each background job has processed.
+CREATE TABLE job_checkpoints (
+    name VARCHAR(64) PRIMARY KEY,
+    position BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMIT;
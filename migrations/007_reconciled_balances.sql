@@ -0,0 +1,11 @@
+-- Adds the per-player ledger sums saved by the balance reconciliation job
+-- (python -m app.jobs.reconciliation_job). Its first run sums the whole
+-- ledger; later runs start from these sums and its checkpoint.
+BEGIN;
+
+CREATE TABLE reconciled_balances (
+    player_id INTEGER PRIMARY KEY,
+    balance BIGINT NOT NULL
+);
+
+COMMIT;
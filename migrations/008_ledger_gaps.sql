@@ -0,0 +1,14 @@
+-- Adds the ledger ids the incremental jobs found missing below their
+-- checkpoints, so an entry committed after a newer one is still read. Entries
+-- skipped before this migration are only counted again by a full run
+-- (python -m app.jobs.reconciliation_job --full).
+BEGIN;
+
+CREATE TABLE ledger_gaps (
+    job VARCHAR(64) NOT NULL,
+    ledger_id BIGINT NOT NULL,
+    seen_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (job, ledger_id)
+);
+
+COMMIT;